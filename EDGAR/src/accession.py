@@ -0,0 +1,38 @@
+import re
+
+# <filer agent CIK>-<YY>-<sequence>, e.g. 0001045810-25-000023
+ACCESSION_PATTERN = re.compile(r'(\d{10})-(\d{2})-(\d{6})')
+
+def accession_order(accession):
+    """
+    Sort key for accession numbers. The filer agent varies between a company's filings, so
+    order by year, then sequence.
+
+    Args:
+        accession (str): Accession number, e.g. "0001045810-25-000023"
+
+    Returns:
+        tuple: (year, sequence), or (0, 0) for a string not shaped like an accession number
+    """
+    match = ACCESSION_PATTERN.fullmatch(accession)
+    if match is None:
+        return (0, 0)
+    # EDGAR accession numbers start in the 1990s
+    year = int(match.group(2))
+    return (1900 + year if year >= 90 else 2000 + year, int(match.group(3)))
+
+def filing_order(accession, filing_date=None):
+    """
+    Sort key putting a company's filings in filing order. Sequences are counted per filer
+    agent, so they only order filings within a year when nothing better is known: filings are
+    ordered by filing date, and a filing without one sorts at the start of its accession year.
+
+    Args:
+        accession (str): Accession number
+        filing_date (str, optional): Filing date, "YYYY-MM-DD"
+
+    Returns:
+        tuple: (filing date or accession year, year, sequence)
+    """
+    order = accession_order(accession)
+    return (filing_date or f"{order[0]:04d}",) + order
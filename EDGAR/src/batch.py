@@ -0,0 +1,220 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from extraction_cache import ExtractionCache
+try:
+    from instrumentation import METRICS, collect
+except ModuleNotFoundError:
+    # Run as a script from this directory; the copilot CLI puts the repository root on the path
+    sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, os.pardir))
+    from instrumentation import METRICS, collect
+from prod import extract_financial_tables, extractor_version
+
+MANIFEST_NAME = "manifest.jsonl"
+
+def discover_filings(root, forms=None):
+    """
+    Find every filing document under a sec-edgar-filings tree.
+
+    Args:
+        root (str): Either the sec-edgar-filings directory or a directory containing it
+        forms (list, optional): Form types to include, e.g. ["10-K"]. All forms when omitted
+
+    Returns:
+        list: Dicts with key ("TICKER/FORM/ACCESSION"), ticker, form, accession and path of
+            each filing's primary document, sorted by key
+    """
+    if os.path.isdir(os.path.join(root, "sec-edgar-filings")):
+        root = os.path.join(root, "sec-edgar-filings")
+    if not os.path.isdir(root):
+        raise FileNotFoundError(f"Filings directory not found: {root}")
+
+    filings = []
+    for ticker in sorted(os.listdir(root)):
+        ticker_dir = os.path.join(root, ticker)
+        if not os.path.isdir(ticker_dir):
+            continue
+
+        for form in sorted(os.listdir(ticker_dir)):
+            form_dir = os.path.join(ticker_dir, form)
+            if not os.path.isdir(form_dir) or (forms and form not in forms):
+                continue
+
+            for accession in sorted(os.listdir(form_dir)):
+                path = primary_document(os.path.join(form_dir, accession))
+                if path:
+                    filings.append({"key": f"{ticker}/{form}/{accession}", "ticker": ticker, "form": form,
+                                    "accession": accession, "path": path})
+
+    return filings
+
+def primary_document(accession_dir):
+    """
+    Pick the HTML document to extract from an accession directory.
+
+    Args:
+        accession_dir (str): Directory holding one accession's files
+
+    Returns:
+        str: Path of the file named like *primary-document.html, otherwise the largest .html
+            file, or None if the directory has no HTML documents
+    """
+    if not os.path.isdir(accession_dir):
+        return None
+
+    documents = [os.path.join(accession_dir, name) for name in os.listdir(accession_dir)
+                 if name.lower().endswith((".html", ".htm"))]
+    if not documents:
+        return None
+
+    primary = [path for path in documents if os.path.basename(path).endswith("primary-document.html")]
+    return sorted(primary)[0] if primary else max(documents, key=os.path.getsize)
+
+def load_manifest(manifest_path):
+    """
+    Read the latest record for every filing from a batch manifest.
+
+    Args:
+        manifest_path (str): Path to the JSON lines manifest
+
+    Returns:
+        dict: Latest manifest record keyed by filing key
+    """
+    records = {}
+    if not os.path.exists(manifest_path):
+        return records
+
+    with open(manifest_path, 'r', encoding='utf-8') as file:
+        for line in file:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # A crash mid-write can leave a truncated last line
+                continue
+            records[record["key"]] = record
+
+    return records
+
+def process_filing(filing, output_root, streaming=True, cache=None, output_formats=("csv",)):
+    """
+    Extract one filing's financial statements into its own output directory.
+    Runs in a worker process and never raises, so one bad filing cannot abort the batch.
+
+    Args:
+        filing (dict): Filing as returned by discover_filings
+        output_root (str): Root directory for per-accession results
+        streaming (bool): Passed through to extract_financial_tables
+        cache (ExtractionCache, optional): Passed through to extract_financial_tables
+        output_formats (tuple): Passed through to extract_financial_tables
+
+    Returns:
+        dict: Manifest record with status, timing and either the statements found or the error
+    """
+    output_dir = os.path.join(output_root, filing["ticker"], filing["form"], filing["accession"])
+    record = dict(filing, output_dir=output_dir)
+    start_time = time.time()
+
+    try:
+        # Keep per-table progress output from interleaving across workers
+        with contextlib.redirect_stdout(io.StringIO()):
+            financials = extract_financial_tables(filing["path"], output_dir=output_dir, streaming=streaming, cache=cache,
+                                                  output_formats=output_formats)
+        record.update(status="ok", statements=sorted(financials))
+    except Exception as e:
+        record.update(status="failed", error=f"{type(e).__name__}: {e}", traceback=traceback.format_exc())
+
+    record["seconds"] = round(time.time() - start_time, 3)
+    return record
+
+def run_batch(root, output_root, workers=None, forms=None, streaming=True, retry_failed=False, cache=None,
+              output_formats=("csv",)):
+    """
+    Extract every filing under root across a process pool, resuming from the manifest.
+
+    Args:
+        root (str): sec-edgar-filings directory (or its parent) to scan
+        output_root (str): Directory for per-accession results and the manifest
+        workers (int, optional): Number of worker processes, defaults to the CPU count
+        forms (list, optional): Form types to include
+        streaming (bool): Use the streaming table scanner
+        retry_failed (bool): Re-run filings the manifest records as failed
+        cache (ExtractionCache, optional): Extraction cache shared by the workers. Entries from
+            older extractor versions are dropped before the run
+        output_formats (tuple): Statement formats to write, "csv" and/or "parquet"
+
+    Returns:
+        list: Manifest records written during this run
+    """
+    os.makedirs(output_root, exist_ok=True)
+    manifest_path = os.path.join(output_root, MANIFEST_NAME)
+    done = load_manifest(manifest_path)
+
+    filings = discover_filings(root, forms)
+    skip = {"ok"} if retry_failed else {"ok", "failed"}
+    pending = [filing for filing in filings if done.get(filing["key"], {}).get("status") not in skip]
+    print(f"Found {len(filings)} filings, {len(filings) - len(pending)} skipped from manifest, {len(pending)} to process")
+
+    if cache:
+        cache.invalidate(keep_version=extractor_version())
+
+    records = []
+    start_time = time.time()
+
+    with open(manifest_path, 'a', encoding='utf-8') as manifest, ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(collect, process_filing, filing, output_root, streaming, cache, output_formats): filing
+                   for filing in pending}
+
+        for future in as_completed(futures):
+            try:
+                record, metrics = future.result()
+                METRICS.merge(metrics)
+            except Exception as e:
+                # The worker process itself died (e.g. out of memory)
+                record = dict(futures[future], status="failed", error=f"{type(e).__name__}: {e}", seconds=None)
+
+            # Flush each record so a crashed run resumes after the last finished filing
+            manifest.write(json.dumps(record) + "\n")
+            manifest.flush()
+            records.append(record)
+
+            if record["status"] == "ok":
+                print(f"[{len(records)}/{len(pending)}] {record['key']} "
+                      f"{record['seconds']:.2f}s: {', '.join(record['statements']) or 'no statements found'}")
+            else:
+                print(f"[{len(records)}/{len(pending)}] {record['key']} FAILED: {record['error']}")
+
+    failed = [record for record in records if record["status"] != "ok"]
+    print(f"\nProcessed {len(records)} filings in {time.time() - start_time:.2f} seconds, {len(failed)} failed")
+    for record in failed:
+        print(f"- {record['path']}: {record['error']}")
+
+    return records
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Extract financial statements from every filing under a sec-edgar-filings tree")
+    parser.add_argument("root", help="sec-edgar-filings directory, or a directory containing it")
+    parser.add_argument("--output-dir", default="batch_output", help="Directory for per-accession results and the manifest")
+    parser.add_argument("--workers", type=int, default=None, help="Number of worker processes (default: CPU count)")
+    parser.add_argument("--form", action="append", dest="forms", help="Form type to include, may be repeated (default: all)")
+    parser.add_argument("--no-streaming", action="store_false", dest="streaming", help="Build a full BeautifulSoup tree per filing")
+    parser.add_argument("--retry-failed", action="store_true", help="Re-run filings the manifest records as failed")
+    parser.add_argument("--format", action="append", dest="output_formats", choices=["csv", "parquet"],
+                        help="Statement output format, may be repeated (default: csv)")
+    parser.add_argument("--cache-dir", help="Reuse extraction results for unchanged filings from this directory")
+    parser.add_argument("--cache-max-mb", type=int, default=512, help="Size the extraction cache is trimmed to (default: 512)")
+    args = parser.parse_args(argv)
+
+    cache = ExtractionCache(args.cache_dir, max_bytes=args.cache_max_mb * 1024 * 1024) if args.cache_dir else None
+    return run_batch(args.root, args.output_dir, workers=args.workers, forms=args.forms,
+                     streaming=args.streaming, retry_failed=args.retry_failed, cache=cache,
+                     output_formats=tuple(args.output_formats or ["csv"]))
+
+if __name__ == "__main__":
+    main()
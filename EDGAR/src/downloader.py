@@ -0,0 +1,359 @@
+import argparse
+import collections
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from accession import ACCESSION_PATTERN, accession_order
+from batch import primary_document
+
+# SEC fair access policy: no more than 10 requests per second per user
+MAX_REQUESTS_PER_SECOND = 10
+
+SEC_WWW_URL = "https://www.sec.gov"
+SEC_DATA_URL = "https://data.sec.gov"
+
+# Responses worth retrying after a pause; SEC answers 429 or 403 when a client goes too fast
+RETRY_STATUSES = {403, 429, 500, 502, 503, 504}
+
+DOWNLOAD_CHUNK_SIZE = 256 * 1024
+
+class RateLimiter:
+    """
+    Sliding-window limit shared by every thread of a downloader: no window of window seconds
+    holds more than rate * window requests, so SEC's per-second limit holds over any second,
+    including right after an idle spell.
+    """
+
+    def __init__(self, rate, window=1.0):
+        """
+        Args:
+            rate (float): Requests allowed per second
+            window (float): Length in seconds of the window the limit is enforced over
+        """
+        self.rate = rate
+        self.limit = int(rate * window)
+        self.window = window
+        if self.limit < 1:
+            # Under one request per window: one request per 1 / rate seconds instead
+            self.limit, self.window = 1, 1 / rate
+        self.sent = collections.deque()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a request may be sent"""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                while self.sent and now - self.sent[0] >= self.window:
+                    self.sent.popleft()
+                if len(self.sent) < self.limit:
+                    self.sent.append(now)
+                    return
+                wait = self.window - (now - self.sent[0])
+            time.sleep(wait)
+
+class EdgarDownloader:
+    """
+    Downloads filings from EDGAR for many tickers and form types concurrently into a local
+    mirror laid out like sec-edgar-downloader's (sec-edgar-filings/<TICKER>/<FORM>/<accession>/),
+    staying under SEC's request rate. Accessions already in the mirror are skipped and
+    interrupted downloads resume from their partial file.
+    """
+
+    def __init__(self, company_name, email, download_dir="../filings", max_workers=4,
+                 rate=MAX_REQUESTS_PER_SECOND, www_url=SEC_WWW_URL, data_url=SEC_DATA_URL, session=None,
+                 timeout=30, max_retries=3):
+        """
+        Args:
+            company_name (str): Company named in the User-Agent SEC requires
+            email (str): Contact address named in the User-Agent
+            download_dir (str): Directory holding (or to hold) sec-edgar-filings
+            max_workers (int): Number of requests in flight at once
+            rate (float): Requests per second across all workers
+            www_url (str): Base URL for company_tickers.json and the Archives
+            data_url (str): Base URL for the submissions API
+            session (requests.Session, optional): Session to reuse, otherwise one is created
+                with a connection pool sized to max_workers
+            timeout (float): Timeout in seconds for each request
+            max_retries (int): Retries of a request refused for rate or server errors
+        """
+        self.root = os.path.join(download_dir, "sec-edgar-filings")
+        self.max_workers = max_workers
+        self.www_url = www_url.rstrip("/")
+        self.data_url = data_url.rstrip("/")
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.limiter = RateLimiter(rate)
+
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+        session.headers.update({"User-Agent": f"{company_name} {email}", "Accept-Encoding": "gzip, deflate"})
+        self.session = session
+
+        self._ciks = None
+        self._tickers = None
+        self._ciks_lock = threading.Lock()
+
+    def _get(self, url, **kwargs):
+        """Send a rate-limited GET, backing off and retrying when SEC pushes back"""
+        for attempt in range(self.max_retries + 1):
+            self.limiter.acquire()
+            response = self.session.get(url, timeout=self.timeout, **kwargs)
+            if response.status_code not in RETRY_STATUSES or attempt == self.max_retries:
+                break
+
+            retry_after = response.headers.get("Retry-After", "")
+            response.close()
+            time.sleep(float(retry_after) if retry_after.isdigit() else 2 ** attempt)
+
+        response.raise_for_status()
+        return response
+
+    def _load_tickers(self):
+        with self._ciks_lock:
+            if self._ciks is None:
+                companies = self._get(f"{self.www_url}/files/company_tickers.json").json()
+                self._ciks = {company["ticker"].upper(): f"{int(company['cik_str']):010d}"
+                              for company in companies.values()}
+                # The first ticker listed for a CIK is its primary listing
+                self._tickers = {}
+                for ticker, cik in self._ciks.items():
+                    self._tickers.setdefault(cik, ticker)
+        return self._ciks
+
+    def cik_for(self, ticker):
+        """
+        Args:
+            ticker (str): Company ticker
+
+        Returns:
+            str: The company's CIK, zero-padded to 10 digits
+        """
+        ciks = self._load_tickers()
+        if ticker.upper() not in ciks:
+            raise ValueError(f"Unknown ticker: {ticker}")
+        return ciks[ticker.upper()]
+
+    def ticker_for(self, cik):
+        """
+        Args:
+            cik (str): Company CIK, with or without zero padding
+
+        Returns:
+            str: The company's primary ticker, or None for filers without a listed ticker
+        """
+        self._load_tickers()
+        return self._tickers.get(f"{int(cik):010d}")
+
+    def _recent_filings(self, cik, ticker):
+        """Yield every recent filing in a company's submissions, newest first"""
+        recent = self._get(f"{self.data_url}/submissions/CIK{cik}.json").json()["filings"]["recent"]
+        for accession, form, document, filing_date in zip(recent["accessionNumber"], recent["form"],
+                                                          recent["primaryDocument"], recent["filingDate"]):
+            yield {"key": f"{ticker.upper()}/{form}/{accession}", "ticker": ticker.upper(), "form": form,
+                   "cik": cik, "accession": accession, "document": document, "filing_date": filing_date}
+
+    def list_filings(self, ticker, form, limit=None):
+        """
+        List a company's recent filings of one form type, newest first.
+
+        Args:
+            ticker (str): Company ticker
+            form (str): Form type, e.g. "10-K"
+            limit (int, optional): Most filings to return
+
+        Returns:
+            list: Dicts with key, ticker, form, cik, accession, document and filing_date
+        """
+        filings = []
+        for filing in self._recent_filings(self.cik_for(ticker), ticker):
+            if filing["form"] != form:
+                continue
+            filings.append(filing)
+            if limit and len(filings) >= limit:
+                break
+
+        return filings
+
+    def filing_for(self, cik, accession, ticker):
+        """
+        Look up one filing in a company's recent submissions.
+
+        Args:
+            cik (str): Company CIK
+            accession (str): Accession number
+            ticker (str): Directory name of the company in the mirror, usually its ticker
+
+        Returns:
+            dict: Filing as returned by list_filings, or None if the submissions do not list
+                the accession yet
+        """
+        for filing in self._recent_filings(f"{int(cik):010d}", ticker):
+            if filing["accession"] == accession:
+                return filing
+        return None
+
+    def document_url(self, filing):
+        """Return the Archives URL of a filing's primary document"""
+        return (f"{self.www_url}/Archives/edgar/data/{int(filing['cik'])}/"
+                f"{filing['accession'].replace('-', '')}/{filing['document']}")
+
+    def accession_dir(self, filing):
+        """Return the mirror directory of a filing"""
+        return os.path.join(self.root, filing["ticker"], filing["form"], filing["accession"])
+
+    def download_filing(self, filing):
+        """
+        Download a filing's primary document into the mirror, unless it is already there.
+        An interrupted download is resumed from its .part file with a Range request.
+
+        Args:
+            filing (dict): Filing as returned by list_filings
+
+        Returns:
+            dict: The filing with status ("downloaded", "skipped" or "failed"), path, and
+                error when it failed
+        """
+        record = dict(filing)
+        extension = os.path.splitext(filing["document"])[1] or ".html"
+        path = os.path.join(self.accession_dir(filing), f"primary-document{extension}")
+        if os.path.exists(path):
+            return dict(record, status="skipped", path=path)
+
+        part_path = f"{path}.part"
+        os.makedirs(self.accession_dir(filing), exist_ok=True)
+
+        try:
+            offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+            # The .part file holds decoded bytes, so the document is fetched unencoded for its
+            # length to match the byte offsets a Range request refers to
+            headers = {"Accept-Encoding": "identity"}
+            if offset:
+                headers["Range"] = f"bytes={offset}-"
+            with self._get(self.document_url(filing), headers=headers, stream=True) as response:
+                # A server that ignores the Range header sends the whole document again
+                mode = 'ab' if offset and response.status_code == 206 else 'wb'
+                with open(part_path, mode) as file:
+                    for chunk in response.iter_content(DOWNLOAD_CHUNK_SIZE):
+                        file.write(chunk)
+            os.replace(part_path, path)
+        except requests.HTTPError as e:
+            # 416: the partial file already holds the whole document
+            if not (offset and e.response is not None and e.response.status_code == 416):
+                return dict(record, status="failed", path=None, error=f"{type(e).__name__}: {e}")
+            os.replace(part_path, path)
+        except Exception as e:
+            return dict(record, status="failed", path=None, error=f"{type(e).__name__}: {e}")
+
+        return dict(record, status="downloaded", path=path)
+
+    def download(self, tickers, forms=("10-K",), limit=None):
+        """
+        Download the latest filings of every ticker and form type concurrently.
+
+        Args:
+            tickers (list): Company tickers
+            forms (tuple): Form types to download
+            limit (int, optional): Most filings per ticker and form
+
+        Returns:
+            list: download_filing results, plus a failed record for each ticker and form
+                whose filing list could not be fetched
+        """
+        results = []
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            listings = {executor.submit(self.list_filings, ticker, form, limit): (ticker, form)
+                        for ticker in tickers for form in forms}
+
+            downloads = []
+            for future in as_completed(listings):
+                ticker, form = listings[future]
+                try:
+                    filings = future.result()
+                except Exception as e:
+                    results.append({"key": f"{ticker.upper()}/{form}", "ticker": ticker.upper(), "form": form,
+                                    "status": "failed", "path": None, "error": f"{type(e).__name__}: {e}"})
+                    print(f"{ticker.upper()}/{form} FAILED: {type(e).__name__}: {e}")
+                    continue
+                downloads.extend(executor.submit(self.download_filing, filing) for filing in filings)
+
+            for future in as_completed(downloads):
+                record = future.result()
+                results.append(record)
+                print(f"{record['key']} {record['status']}" + (f": {record['error']}" if record["status"] == "failed" else ""))
+
+        return results
+
+    def close(self):
+        """Close the session's connections"""
+        self.session.close()
+
+def mirrored_filing(ticker, form="10-K", accession=None, download_dir="../filings"):
+    """
+    Find a filing's primary document in the local mirror.
+
+    Args:
+        ticker (str): Company ticker
+        form (str): Form type
+        accession (str, optional): Accession number, defaults to the latest one mirrored
+        download_dir (str): Directory holding sec-edgar-filings
+
+    Returns:
+        str: Path of the primary document, or None if it is not mirrored
+    """
+    form_dir = os.path.join(download_dir, "sec-edgar-filings", ticker.upper(), form)
+    if accession is None:
+        if not os.path.isdir(form_dir):
+            return None
+        accessions = sorted((name for name in os.listdir(form_dir) if ACCESSION_PATTERN.fullmatch(name)),
+                            key=accession_order)
+        for accession in reversed(accessions):
+            path = primary_document(os.path.join(form_dir, accession))
+            if path:
+                return path
+        return None
+
+    return primary_document(os.path.join(form_dir, accession))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mirror EDGAR filings into a sec-edgar-filings tree")
+    parser.add_argument("tickers", nargs="+", help="Company tickers")
+    parser.add_argument("--form", action="append", dest="forms", help="Form type, may be repeated (default: 10-K)")
+    parser.add_argument("--limit", type=int, default=1, help="Most filings per ticker and form (default: 1)")
+    parser.add_argument("--download-dir", default="../filings", help="Directory holding sec-edgar-filings")
+    parser.add_argument("--company", required=True, help="Company name for the SEC User-Agent")
+    parser.add_argument("--email", required=True, help="Contact email for the SEC User-Agent")
+    parser.add_argument("--workers", type=int, default=4, help="Requests in flight at once (default: 4)")
+    parser.add_argument("--rate", type=float, default=MAX_REQUESTS_PER_SECOND, help="Requests per second (default: 10)")
+    parser.add_argument("--www-url", default=SEC_WWW_URL, help="Base URL for tickers and the Archives")
+    parser.add_argument("--data-url", default=SEC_DATA_URL, help="Base URL for the submissions API")
+    parser.add_argument("--output", help="Write the download results as JSON to this file")
+    args = parser.parse_args(argv)
+
+    downloader = EdgarDownloader(args.company, args.email, download_dir=args.download_dir, max_workers=args.workers,
+                                 rate=args.rate, www_url=args.www_url, data_url=args.data_url)
+    start_time = time.time()
+    results = downloader.download(args.tickers, forms=tuple(args.forms or ["10-K"]), limit=args.limit)
+    downloader.close()
+
+    counts = {status: sum(result["status"] == status for result in results) for status in ("downloaded", "skipped", "failed")}
+    print(f"\n{counts['downloaded']} downloaded, {counts['skipped']} skipped, {counts['failed']} failed "
+          f"in {time.time() - start_time:.2f} seconds")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            json.dump(results, file, indent=2)
+
+    return results
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+import argparse
+import datetime
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from html import escape
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from batch import discover_filings
+
+ARCHIVES_PATTERN = re.compile(r'^/Archives/edgar/data/(\d+)/(\d{18})/([^/]+)$')
+SUBMISSIONS_PATTERN = re.compile(r'^/submissions/CIK(\d{10})\.json$')
+
+class StandInEdgar:
+    """
+    The parts of EDGAR the downloader and the watcher use, served from a local
+    sec-edgar-filings tree: the latest-filings Atom feeds (with ETags, so polls can get a 304),
+    company_tickers.json, the submissions API and the Archives. Lets the watcher be run end
+    to end without touching sec.gov.
+
+    Each filing's CIK is taken from its accession number, as it is for self-filed filings.
+    """
+
+    def __init__(self, root, submissions_lag=0.0):
+        """
+        Args:
+            root (str): sec-edgar-filings directory, or a directory containing it, to serve
+            submissions_lag (float): Seconds after start before the submissions API lists a
+                filing, as EDGAR's lags its feeds by a few minutes
+        """
+        self.filings = [dict(filing, cik=filing["accession"].split("-")[0],
+                             document=os.path.basename(filing["path"]),
+                             filing_date=datetime.date.fromtimestamp(os.path.getmtime(filing["path"])).isoformat())
+                        for filing in discover_filings(root)]
+        self.submissions_lag = submissions_lag
+        self.started = time.time()
+        self.requests = []
+        self._lock = threading.Lock()
+
+    def feed(self, form):
+        """Atom feed of the served filings of one form type, newest first"""
+        entries = []
+        for filing in sorted(self.filings, key=lambda filing: filing["filing_date"], reverse=True):
+            if filing["form"] != form:
+                continue
+            link = f"/Archives/edgar/data/{int(filing['cik'])}/{filing['accession'].replace('-', '')}/"
+            entries.append(
+                f"<entry><title>{escape(filing['form'])} - {escape(filing['ticker'])} ({filing['cik']}) (Filer)</title>"
+                f"<link rel=\"alternate\" type=\"text/html\" href=\"{link}\"/>"
+                f"<summary type=\"html\">Filed: {filing['filing_date']}</summary>"
+                f"<updated>{filing['filing_date']}T00:00:00-04:00</updated>"
+                f"<category scheme=\"https://www.sec.gov/\" label=\"form type\" term=\"{escape(filing['form'])}\"/>"
+                f"<id>urn:tag:sec.gov,2008:accession-number={filing['accession']}</id></entry>")
+        return ("<?xml version=\"1.0\" encoding=\"ISO-8859-1\" ?>"
+                "<feed xmlns=\"http://www.w3.org/2005/Atom\"><title>Latest Filings</title>"
+                + "".join(entries) + "</feed>")
+
+    def company_tickers(self):
+        companies = {}
+        for filing in self.filings:
+            companies.setdefault(filing["cik"], {"cik_str": int(filing["cik"]), "ticker": filing["ticker"],
+                                                 "title": filing["ticker"]})
+        return {str(number): company for number, company in enumerate(companies.values())}
+
+    def submissions(self, cik):
+        """Submissions JSON of one company, listing nothing until submissions_lag has passed"""
+        listed = time.time() - self.started >= self.submissions_lag
+        filings = [filing for filing in self.filings if filing["cik"] == cik and listed]
+        return {"cik": cik, "filings": {"recent": {
+            "accessionNumber": [filing["accession"] for filing in filings],
+            "form": [filing["form"] for filing in filings],
+            "primaryDocument": [filing["document"] for filing in filings],
+            "filingDate": [filing["filing_date"] for filing in filings],
+        }}}
+
+    def document(self, cik, accession, name):
+        """Return the path of a served filing's primary document, or None"""
+        for filing in self.filings:
+            if (int(filing["cik"]) == int(cik) and filing["accession"].replace("-", "") == accession
+                    and filing["document"] == name):
+                return filing["path"]
+        return None
+
+    def log(self, path, status):
+        with self._lock:
+            self.requests.append((path, status))
+
+    def handler(self):
+        """Return a request handler class serving this stand-in"""
+        edgar = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def send(self, status, body=b"", content_type="application/json", headers=None):
+                edgar.log(self.path, status)
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                url = urlsplit(self.path)
+                if url.path == "/cgi-bin/browse-edgar":
+                    body = edgar.feed(parse_qs(url.query).get("type", [""])[0]).encode("iso-8859-1")
+                    etag = f'"{hashlib.sha1(body).hexdigest()}"'
+                    if self.headers.get("If-None-Match") == etag:
+                        return self.send(304, headers={"ETag": etag})
+                    return self.send(200, body, "application/atom+xml", {"ETag": etag})
+
+                if url.path == "/files/company_tickers.json":
+                    return self.send(200, json.dumps(edgar.company_tickers()).encode("utf-8"))
+
+                match = SUBMISSIONS_PATTERN.match(url.path)
+                if match:
+                    return self.send(200, json.dumps(edgar.submissions(match.group(1))).encode("utf-8"))
+
+                match = ARCHIVES_PATTERN.match(url.path)
+                path = match and edgar.document(*match.groups())
+                if not path:
+                    return self.send(404)
+                with open(path, 'rb') as file:
+                    body = file.read()
+                offset = re.match(r'^bytes=(\d+)-$', self.headers.get("Range", ""))
+                if offset is None:
+                    return self.send(200, body, "text/html")
+                start = int(offset.group(1))
+                if start >= len(body):
+                    return self.send(416)
+                return self.send(206, body[start:], "text/html",
+                                 {"Content-Range": f"bytes {start}-{len(body) - 1}/{len(body)}"})
+
+        return Handler
+
+    def serve(self, host="127.0.0.1", port=0):
+        """
+        Start serving in a background thread.
+
+        Args:
+            host (str): Address to bind
+            port (int): Port to bind, any free port when 0
+
+        Returns:
+            ThreadingHTTPServer: The running server; its base URL is url(server)
+        """
+        server = ThreadingHTTPServer((host, port), self.handler())
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
+
+def url(server):
+    """Return the base URL of a running stand-in server, for --www-url and --data-url"""
+    host, port = server.server_address[:2]
+    return f"http://{host}:{port}"
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve a local sec-edgar-filings tree as a stand-in for EDGAR")
+    parser.add_argument("root", nargs="?", default="../filings", help="sec-edgar-filings directory to serve")
+    parser.add_argument("--port", type=int, default=8765, help="Port to listen on (default: 8765)")
+    parser.add_argument("--submissions-lag", type=float, default=0.0,
+                        help="Seconds before the submissions API lists the filings (default: 0)")
+    args = parser.parse_args(argv)
+
+    edgar = StandInEdgar(args.root, submissions_lag=args.submissions_lag)
+    server = edgar.serve(port=args.port)
+    print(f"Serving {len(edgar.filings)} filings at {url(server)}; "
+          f"point the watcher's --www-url and --data-url here")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+if __name__ == "__main__":
+    main()
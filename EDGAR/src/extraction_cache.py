@@ -0,0 +1,180 @@
+import hashlib
+import os
+import pickle
+import shutil
+
+# Bytes read at a time while hashing a filing
+HASH_CHUNK_SIZE = 1024 * 1024
+
+# Writes between recounts of the cache's size from disk, which pick up what other processes
+# sharing the cache wrote or evicted
+RECOUNT_PUTS = 64
+
+# Eviction trims the cache to this fraction of max_bytes, so the writes that follow do not each
+# trigger another eviction
+EVICT_TO = 0.9
+
+# Running size of each cache directory as seen by this process: path -> [pid, bytes, puts since
+# recount]. Kept outside the instances because batch workers receive a fresh copy per filing
+_TOTALS = {}
+
+class ExtractionCache:
+    """
+    On-disk cache of extract_financial_tables results keyed by the filing's content hash and
+    the extractor version, so an unchanged filing is never parsed twice by the same rules.
+
+    Entries live at <cache_dir>/<version>/<hash[:2]>/<hash>.pkl. Entries touched least recently
+    are evicted once the cache grows past max_bytes. Writes keep a running total of the size,
+    so the directory is only walked to evict and to recount every RECOUNT_PUTS writes.
+    """
+
+    def __init__(self, cache_dir="extraction_cache", max_bytes=512 * 1024 * 1024):
+        """
+        Args:
+            cache_dir (str): Directory holding cached entries
+            max_bytes (int): Largest total size; a write taking the cache past it evicts the
+                least recently used entries
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+
+    def key_for(self, file_path, version):
+        """
+        Args:
+            file_path (str): Path to the filing document
+            version (str): Extractor version, see prod.extractor_version
+
+        Returns:
+            str: Cache key of the form <version>/<sha256 of the file content>
+        """
+        digest = hashlib.sha256()
+        with open(file_path, 'rb') as file:
+            for chunk in iter(lambda: file.read(HASH_CHUNK_SIZE), b''):
+                digest.update(chunk)
+        return f"{version}/{digest.hexdigest()}"
+
+    def _entry_path(self, key):
+        version, content_hash = key.split('/')
+        return os.path.join(self.cache_dir, version, content_hash[:2], f"{content_hash}.pkl")
+
+    def get(self, key):
+        """
+        Args:
+            key (str): Key from key_for
+
+        Returns:
+            dict: Entry with "statements" and "table_index", or None on a miss
+        """
+        entry_path = self._entry_path(key)
+        try:
+            with open(entry_path, 'rb') as file:
+                entry = pickle.load(file)
+            # Mark the entry as recently used for eviction
+            os.utime(entry_path)
+        except FileNotFoundError:
+            return None
+        except Exception:
+            # A truncated entry, or one pickled by incompatible code, is just a miss; it will
+            # be overwritten by the next put
+            return None
+        return entry
+
+    def put(self, key, statements, table_index):
+        """
+        Store the result of one extraction.
+
+        Args:
+            key (str): Key from key_for
+            statements (dict): Statement DataFrames keyed by statement name
+            table_index (dict): Source table identifier keyed by statement name
+        """
+        entry_path = self._entry_path(key)
+        os.makedirs(os.path.dirname(entry_path), exist_ok=True)
+        total = self._running_total()
+        replaced = os.path.getsize(entry_path) if os.path.exists(entry_path) else 0
+
+        # Write to a temporary file first so concurrent readers never see a partial entry
+        tmp_path = f"{entry_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as file:
+            pickle.dump({"statements": statements, "table_index": table_index}, file,
+                        protocol=pickle.HIGHEST_PROTOCOL)
+        size = os.path.getsize(tmp_path)
+        os.replace(tmp_path, entry_path)
+
+        total[1] += size - replaced
+        total[2] += 1
+        if total[1] > self.max_bytes:
+            self.evict()
+
+    def _running_total(self):
+        """Return this process's [pid, bytes, puts since recount] for the cache, recounting when due"""
+        path = os.path.abspath(self.cache_dir)
+        total = _TOTALS.get(path)
+        # A forked worker inherits the parent's count; it is recounted in the worker
+        if total is None or total[0] != os.getpid() or total[2] >= RECOUNT_PUTS:
+            total = _TOTALS[path] = [os.getpid(), self.size(), 0]
+        return total
+
+    def _entries(self):
+        if not os.path.isdir(self.cache_dir):
+            return []
+
+        entries = []
+        for dirpath, _, filenames in os.walk(self.cache_dir):
+            for filename in filenames:
+                if filename.endswith('.pkl'):
+                    stat = os.stat(os.path.join(dirpath, filename))
+                    entries.append((stat.st_mtime, stat.st_size, os.path.join(dirpath, filename)))
+        return entries
+
+    def size(self):
+        """Return the total size of cached entries in bytes"""
+        return sum(size for _, size, _ in self._entries())
+
+    def evict(self):
+        """
+        Delete least recently used entries until the cache fits in EVICT_TO of max_bytes.
+
+        Returns:
+            int: Number of entries removed
+        """
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+
+        removed = 0
+        for _, size, entry_path in entries:
+            if total <= self.max_bytes * EVICT_TO:
+                break
+            try:
+                os.remove(entry_path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            removed += 1
+
+        _TOTALS[os.path.abspath(self.cache_dir)] = [os.getpid(), total, 0]
+        return removed
+
+    def invalidate(self, keep_version=None):
+        """
+        Drop cached results, e.g. after the detection rules in prod.py change.
+
+        Args:
+            keep_version (str, optional): Extractor version whose entries are kept. All
+                entries are removed when omitted
+
+        Returns:
+            int: Number of version directories removed
+        """
+        if not os.path.isdir(self.cache_dir):
+            return 0
+
+        _TOTALS.pop(os.path.abspath(self.cache_dir), None)
+        removed = 0
+        for version in os.listdir(self.cache_dir):
+            version_dir = os.path.join(self.cache_dir, version)
+            if version != keep_version and os.path.isdir(version_dir):
+                shutil.rmtree(version_dir)
+                removed += 1
+
+        return removed
@@ -0,0 +1,211 @@
+import os
+import re
+from collections import namedtuple
+from html.parser import HTMLParser
+
+# Characters read from disk per parser feed
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# A numeric inline XBRL fact. period is "YYYY-MM-DD" for instants and "start/end" for durations;
+# dimensions is a sorted tuple of (axis, member) pairs, empty for the default context.
+Fact = namedtuple("Fact", ["concept", "period", "dimensions", "value", "unit", "decimals", "fact_id"])
+
+# Context period elements (as lowercased by html.parser) and the field each one fills
+PERIOD_FIELDS = {'xbrli:startdate': 'start', 'xbrli:enddate': 'end', 'xbrli:instant': 'instant'}
+
+# Elements whose text content the parser collects
+TEXT_TAGS = set(PERIOD_FIELDS) | {'xbrldi:explicitmember', 'xbrldi:typedmember', 'xbrli:measure'}
+
+NUMBER_WORDS = {
+    "no": 0, "none": 0, "zero": 0, "one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6,
+    "seven": 7, "eight": 8, "nine": 9, "ten": 10, "eleven": 11, "twelve": 12, "thirteen": 13,
+    "fourteen": 14, "fifteen": 15, "sixteen": 16, "seventeen": 17, "eighteen": 18, "nineteen": 19,
+    "twenty": 20,
+}
+
+def parse_fact_value(text, fmt, scale, sign):
+    """
+    Convert the displayed text of an ix:nonFraction element into its numeric value.
+
+    Args:
+        text (str): Text content of the element, e.g. "1,234"
+        fmt (str): The element's format attribute, e.g. "ixt:num-dot-decimal"
+        scale (str): The element's scale attribute, a power of ten
+        sign (str): "-" when the fact is negative
+
+    Returns:
+        float: The fact's value, or None if the text cannot be read in the given format
+    """
+    fmt = (fmt or '').split(':')[-1]
+    text = text.strip()
+
+    if fmt == 'fixed-zero':
+        value = 0.0
+    elif fmt == 'numwordsen':
+        value = NUMBER_WORDS.get(text.lower())
+    else:
+        if fmt == 'num-comma-decimal':
+            text = text.replace('.', '').replace(' ', '').replace(',', '.')
+        else:
+            text = re.sub(r'[,\s]', '', text)
+        try:
+            value = float(text)
+        except ValueError:
+            value = None
+
+    if value is None:
+        return None
+    value *= 10.0 ** int(scale or 0)
+    return -value if sign == '-' else value
+
+class _FactParser(HTMLParser):
+    """
+    Event-based parser that only acts on ix:nonFraction facts and the xbrli:context and
+    xbrli:unit definitions they refer to; everything else in the document is skipped.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.raw_facts = []
+        self.contexts = {}
+        self.units = {}
+        self._open_facts = []
+        self._context = None
+        self._unit = None
+        self._text_target = None
+        self._text_parts = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag == 'ix:nonfraction':
+            attrs = dict(attrs)
+            # Facts can nest (one displayed number tagged with two concepts), so keep a stack
+            self._open_facts.append((attrs, []))
+        elif tag == 'xbrli:context':
+            self._context = {"id": dict(attrs).get('id'), "start": None, "end": None, "instant": None, "dimensions": []}
+        elif self._context is not None and tag in PERIOD_FIELDS:
+            self._begin_text(PERIOD_FIELDS[tag])
+        elif self._context is not None and tag in ('xbrldi:explicitmember', 'xbrldi:typedmember'):
+            self._begin_text(('member', dict(attrs).get('dimension')))
+        elif tag == 'xbrli:unit':
+            self._unit = {"id": dict(attrs).get('id'), "numerator": [], "denominator": [], "part": "numerator"}
+        elif self._unit is not None and tag == 'xbrli:unitdenominator':
+            self._unit["part"] = "denominator"
+        elif self._unit is not None and tag == 'xbrli:measure':
+            self._begin_text('measure')
+
+    def handle_endtag(self, tag):
+        if tag == 'ix:nonfraction' and self._open_facts:
+            attrs, parts = self._open_facts.pop()
+            self.raw_facts.append((attrs, ''.join(parts)))
+        elif tag == 'xbrli:context' and self._context is not None:
+            self.contexts[self._context["id"]] = self._context
+            self._context = None
+        elif tag == 'xbrli:unit' and self._unit is not None:
+            measure = '*'.join(self._unit["numerator"])
+            if self._unit["denominator"]:
+                measure += '/' + '*'.join(self._unit["denominator"])
+            self.units[self._unit["id"]] = measure
+            self._unit = None
+        elif self._text_target is not None and tag in TEXT_TAGS:
+            self._end_text()
+
+    def handle_data(self, data):
+        for _, parts in self._open_facts:
+            parts.append(data)
+        if self._text_target is not None:
+            self._text_parts.append(data)
+
+    def _begin_text(self, target):
+        self._text_target = target
+        self._text_parts = []
+
+    def _end_text(self):
+        text = ''.join(self._text_parts).strip()
+        target = self._text_target
+        self._text_target = None
+
+        if target == 'measure':
+            self._unit[self._unit["part"]].append(text)
+        elif isinstance(target, tuple):
+            self._context["dimensions"].append((target[1], text))
+        else:
+            self._context[target] = text
+
+def extract_facts(file_path, chunk_size=STREAM_CHUNK_SIZE):
+    """
+    Extract every numeric fact from an inline XBRL document in a single streaming pass.
+
+    Args:
+        file_path (str): Path to the inline XBRL/HTML file
+        chunk_size (int): Number of characters read and fed to the parser at a time
+
+    Returns:
+        list: Fact tuples in document order. Facts whose value is nil or unreadable are kept
+            with value None
+    """
+    if not os.path.exists(file_path):
+        raise FileNotFoundError(f"File not found: {file_path}")
+
+    parser = _FactParser()
+    with open(file_path, 'r', encoding='utf-8') as file:
+        while True:
+            chunk = file.read(chunk_size)
+            if not chunk:
+                break
+            parser.feed(chunk)
+    parser.close()
+
+    # Contexts usually sit in the ix:header before the facts, but resolve them once at the end
+    # so documents that define them later still work
+    facts = []
+    for attrs, text in parser.raw_facts:
+        context = parser.contexts.get(attrs.get('contextref'), {})
+        if context.get("instant"):
+            period = context["instant"]
+        elif context:
+            period = f"{context['start']}/{context['end']}"
+        else:
+            period = None
+
+        if attrs.get('xsi:nil') == 'true':
+            value = None
+        else:
+            value = parse_fact_value(text, attrs.get('format'), attrs.get('scale'), attrs.get('sign'))
+
+        facts.append(Fact(
+            concept=attrs.get('name'),
+            period=period,
+            dimensions=tuple(sorted(context.get("dimensions", []))),
+            value=value,
+            unit=parser.units.get(attrs.get('unitref'), attrs.get('unitref')),
+            decimals=attrs.get('decimals'),
+            fact_id=attrs.get('id'),
+        ))
+
+    return facts
+
+def facts_to_dataframe(facts):
+    """
+    Args:
+        facts (list): Fact tuples from extract_facts
+
+    Returns:
+        pandas.DataFrame: One row per fact with a float64 value column
+    """
+    import pandas as pd
+
+    df = pd.DataFrame(facts, columns=Fact._fields)
+    df["value"] = df["value"].astype('float64')
+    return df
+
+# Example usage
+if __name__ == "__main__":
+    file_path = "../filings/sec-edgar-filings/NVDA/10-K/0001045810-25-000023/nvda_primary-document.html"
+
+    facts = extract_facts(file_path)
+    print(f"Extracted {len(facts)} facts")
+
+    # Consolidated (no dimensions) revenue for each period
+    for fact in facts:
+        if fact.concept == "us-gaap:Revenues" and not fact.dimensions:
+            print(fact.period, fact.value, fact.unit)
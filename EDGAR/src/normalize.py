@@ -0,0 +1,130 @@
+import os
+import re
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+# Cells that only pad a value: currency signs, percent signs and the closing half of a split
+# "(123" ")" negative
+SPACER_CELLS = ['', '$', '€', '£', '%', ')', '%)']
+
+# Cells that stand for zero
+DASH_CELLS = ['—', '–', '-', '— ', '−']
+
+# Per share amounts, but not share counts such as "shares used in per share computation"
+PER_SHARE_PATTERN = re.compile(r'^(?!.*\bshares\b).*\bper (?:common |ordinary )?share\b', re.IGNORECASE)
+
+SCALE_WORDS = {"thousands": 1e3, "millions": 1e6, "billions": 1e9}
+SCALE_PATTERN = re.compile(r'in (thousands|millions|billions)', re.IGNORECASE)
+
+def table_scale(table):
+    """
+    Work out the multiplier of the values in a statement table.
+
+    Args:
+        table (bs4.element.Tag): BeautifulSoup table element
+
+    Returns:
+        float: Most common inline XBRL scale among the table's ix:nonFraction facts as a
+            multiplier, else the scale named in the table text ("in millions"), else None
+    """
+    scales = Counter(fact.get('scale') for fact in table.find_all('ix:nonfraction') if fact.get('scale'))
+    if scales:
+        return 10.0 ** int(scales.most_common(1)[0][0])
+
+    match = SCALE_PATTERN.search(table.get_text())
+    return SCALE_WORDS[match.group(1).lower()] if match else None
+
+def normalize_statement(df, scale=None):
+    """
+    Turn a raw statement DataFrame from parse_table_to_dataframe into typed columns.
+
+    Currency and spacer cells are dropped and the remaining cells of each row are shifted
+    left, so every period's value lines up regardless of colspans in the source HTML.
+    Values are parsed to float64 in one vectorized pass: commas are stripped, parentheses
+    become negatives and dashes become zero.
+
+    Args:
+        df (pandas.DataFrame): Raw statement with the line item in the first column
+        scale (float, optional): Multiplier applied to every value except per share
+            amounts. Defaults to df.attrs["scale"], then to 1
+
+    Returns:
+        pandas.DataFrame: One row per line item with line_item and section columns followed
+            by one float64 column per period
+    """
+    if scale is None:
+        scale = df.attrs.get("scale") or 1.0
+
+    if df.shape[1] < 2:
+        return pd.DataFrame(columns=["line_item", "section"])
+
+    labels = df.iloc[:, 0].astype(str).str.strip()
+    cells = df.iloc[:, 1:].astype(str).apply(lambda column: column.str.strip())
+
+    # Collapse spacer cells: a stable argsort on the "is spacer" mask moves kept cells left
+    values = cells.to_numpy(dtype=object)
+    keep = ~cells.isin(SPACER_CELLS).to_numpy()
+    order = np.argsort(~keep, axis=1, kind='stable')
+    values = np.take_along_axis(values, order, axis=1)
+    keep = np.take_along_axis(keep, order, axis=1)
+    values[~keep] = None
+    collapsed = pd.DataFrame(values, index=df.index)
+
+    # Parse every remaining cell at once
+    stacked = collapsed.stack()
+    negative = stacked.str.startswith('(')
+    numbers = stacked.str.replace(r'[$€£,()%\s]', '', regex=True)
+    numbers = numbers.mask(stacked.isin(DASH_CELLS), '0')
+    numbers = pd.to_numeric(numbers, errors='coerce').astype('float64')
+    numbers = numbers.mask(negative, -numbers)
+    parsed = numbers.unstack().reindex(index=df.index, columns=collapsed.columns)
+
+    has_number = parsed.notna().any(axis=1)
+    has_text = collapsed.notna().any(axis=1)
+    if not has_number.any():
+        return pd.DataFrame(columns=["line_item", "section"])
+
+    # Header rows (e.g. "Year Ended", then the period dates) come before the first value row
+    first_data = df.index.get_loc(has_number.idxmax())
+    header_rows = [i for i in df.index[:first_data] if not labels[i] and has_text[i]]
+    n_periods = int(parsed.notna().sum(axis=1).max())
+    periods = collapsed.loc[header_rows[-1]].dropna().tolist() if header_rows else []
+    periods = [period_name(periods[k]) if k < len(periods) else f"period_{k}" for k in range(n_periods)]
+
+    # Rows with a label but no values are section headers for the rows that follow them
+    section = labels.where(~has_number & (labels != '')).ffill().fillna('')
+    line_items = df.index[(labels != '') & has_number]
+
+    result = parsed.loc[line_items].iloc[:, :n_periods]
+    result.columns = periods
+
+    # Per share amounts are reported in units even when the statement is in millions
+    per_share = (labels.loc[line_items].str.contains(PER_SHARE_PATTERN)
+                 | section.loc[line_items].str.contains(PER_SHARE_PATTERN))
+    result = result.mul(np.where(per_share, 1.0, scale), axis=0)
+
+    result.insert(0, "section", section.loc[line_items].str.rstrip(':'))
+    result.insert(0, "line_item", labels.loc[line_items])
+    return result.reset_index(drop=True)
+
+def period_name(label):
+    """Return an ISO date for a period header like "Jan 26, 2025", or the label unchanged"""
+    parsed = pd.to_datetime(label, errors='coerce', format='mixed')
+    return parsed.strftime('%Y-%m-%d') if not pd.isna(parsed) else label
+
+def write_statement(df, path):
+    """
+    Write a normalized statement as Parquet so it can be loaded without re-parsing strings.
+
+    Args:
+        df (pandas.DataFrame): Output of normalize_statement
+        path (str): Destination .parquet file
+    """
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    df.to_parquet(path, index=False)
+
+def load_statement(path):
+    """Read a statement written by write_statement"""
+    return pd.read_parquet(path)
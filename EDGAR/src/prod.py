@@ -1,9 +1,44 @@
+import hashlib
+import json
 import os
 import pandas as pd
+from bisect import bisect_left
 from bs4 import BeautifulSoup
+from collections import deque
+from html import unescape
+from html.parser import HTMLParser
 import re
+import sys
 
-def extract_financial_tables(file_path, output_dir="financial_tables_aapl"):
+try:
+    from instrumentation import METRICS
+except ModuleNotFoundError:
+    # Run as a script from this directory; the copilot CLI puts the repository root on the path
+    sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, os.pardir))
+    from instrumentation import METRICS
+from normalize import normalize_statement, table_scale, write_statement
+
+HEADING_TAGS = ['h1', 'h2', 'h3', 'h4', 'h5']
+
+# Statements extract_financial_tables looks for, as (key, label, phrases). A table is classified
+# as the first statement whose phrases all appear in its lowercased text. Add an entry here to
+# detect another statement; all phrases are matched together in one pass over each table.
+STATEMENT_SIGNATURES = [
+    ("balance_sheet", "BALANCE SHEET", ["total liabilities and shareholders' equity"]),
+    ("cash_flow_statement", "CASH FLOWS", ["cash and cash equivalents at end of period"]),
+    ("income_statement", "INCOME STATEMENT", ["total operating expenses", "net income per share"]),
+]
+
+# Characters read from disk per parser feed in streaming mode
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# Bump whenever table parsing or classification changes in a way that alters extracted
+# statements, so cached extraction results are invalidated
+EXTRACTOR_VERSION = 2
+
+@METRICS.timed()
+def extract_financial_tables(file_path, output_dir="financial_tables_aapl", streaming=False,
+                             signatures=STATEMENT_SIGNATURES, cache=None, output_formats=("csv",)):
     """
     Extract and save only the key financial tables (balance sheet, income statement, cash flow)
     from an XBRL/HTML document.
@@ -11,6 +46,13 @@ def extract_financial_tables(file_path, output_dir="financial_tables_aapl"):
     Args:
         file_path (str): Path to the XBRL/HTML file
         output_dir (str): Directory to save the CSV files
+        streaming (bool): Scan the document incrementally with iter_tables instead of building
+            a full BeautifulSoup tree, and stop as soon as every statement has been found
+        signatures (list): Statements to detect as (key, label, phrases) tuples
+        cache (ExtractionCache, optional): Cache of results keyed by file content and
+            extractor version; a hit skips parsing entirely
+        output_formats (tuple): "csv" saves the raw tables as today, "parquet" saves each
+            statement normalized to float64 columns by normalize_statement
         
     Returns:
         dict: Dictionary of financial DataFrames with table identifiers as keys
@@ -19,80 +61,326 @@ def extract_financial_tables(file_path, output_dir="financial_tables_aapl"):
     if not os.path.exists(file_path):
         raise FileNotFoundError(f"File not found: {file_path}")
     
-    # Read the file
-    with open(file_path, 'r', encoding='utf-8') as file:
-        content = file.read()
+    cache_key = cache.key_for(file_path, extractor_version(signatures)) if cache else None
+    cached = cache.get(cache_key) if cache else None
     
-    # Parse the HTML content
-    soup = BeautifulSoup(content, 'html.parser')
+    if cached:
+        financials = cached["statements"]
+        print(f"Loaded {len(financials)} financial tables from cache")
+    else:
+        financials, table_index = scan_financial_tables(file_path, streaming, signatures)
+        if cache:
+            cache.put(cache_key, financials, table_index)
     
-    # Find all tables
-    tables = soup.find_all('table')
-    print(f"Found {len(tables)} tables in the document")
+    # Create output directory if specified and financials found
+    if output_dir and financials:
+        os.makedirs(output_dir, exist_ok=True)
+        
+        # Save each financial table as CSV and/or typed Parquet
+        for table_name, df in financials.items():
+            if "csv" in output_formats:
+                csv_path = os.path.join(output_dir, f"{table_name}.csv")
+                df.to_csv(csv_path, index=False)
+                print(f"Saved: {csv_path}")
+            if "parquet" in output_formats:
+                parquet_path = os.path.join(output_dir, f"{table_name}.parquet")
+                write_statement(normalize_statement(df), parquet_path)
+                print(f"Saved: {parquet_path}")
+    
+    # Print summary of found financial tables
+    print(f"\nFound {len(financials)} financial tables:")
+    for table_name in financials.keys():
+        print(f"- {table_name}")
+    
+    return financials
+
+def scan_financial_tables(file_path, streaming=False, signatures=STATEMENT_SIGNATURES):
+    """
+    Find the tables matching each statement signature in an XBRL/HTML document.
+    
+    Args:
+        file_path (str): Path to the XBRL/HTML file
+        streaming (bool): Scan the document incrementally with iter_tables and stop as soon
+            as every statement has been found
+        signatures (list): Statements to detect as (key, label, phrases) tuples
+        
+    Returns:
+        tuple: (financials, table_index) where financials maps statement keys to DataFrames
+            and table_index maps the same keys to the identifier of the source table
+    """
+    if streaming:
+        # Tables are emitted one at a time; only the current table's markup is held in memory
+        tables = iter_tables(file_path)
+    else:
+        # Read the file
+        with open(file_path, 'r', encoding='utf-8') as file:
+            content = file.read()
+        
+        # Parse the HTML content
+        soup = BeautifulSoup(content, 'html.parser')
+        
+        # Find all tables, resolving each one's nearest preceding heading from a single index
+        heading_index = HeadingIndex(soup)
+        tables = [(i, table, heading_index.heading_for(i)) for i, table in enumerate(heading_index.tables)]
+        print(f"Found {len(tables)} tables in the document")
+    
+    matcher = SignatureMatcher(signatures)
     
     # Dictionary to store financial DataFrames
     financials = {}
+    table_index = {}
+    scanned = 0
     
     # Process each table
-    for i, table in enumerate(tables):
+    for i, table, heading in tables:
+        scanned += 1
+        METRICS.incr("tables_scanned")
         try:
-            # Generate a table identifier
-            # Try to find a caption or a title for better identification
-            caption = table.find('caption')
-            title_element = table.find(lambda tag: tag.name in ['h1', 'h2', 'h3', 'h4', 'h5'] and tag.text.strip())
+            # Only tables whose raw text could match a signature are worth building a DataFrame for
+            if not matcher.candidates(table.get_text().lower()):
+                METRICS.incr("tables_skipped")
+                continue
             
-            if caption and caption.text.strip():
-                table_id = f"table_{i}_{clean_title(caption.text.strip())}"
-            elif title_element and title_element.text.strip():
-                table_id = f"table_{i}_{clean_title(title_element.text.strip())}"
-            else:
-                # Try to find nearby headings
-                prev_heading = table.find_previous(['h1', 'h2', 'h3', 'h4', 'h5'])
-                if prev_heading and prev_heading.text.strip():
-                    table_id = f"table_{i}_{clean_title(prev_heading.text.strip())}"
-                else:
-                    table_id = f"table_{i}"
+            # Generate a table identifier
+            table_id = table_identifier(i, table, heading)
             
             # Parse the table into a pandas DataFrame
             df = parse_table_to_dataframe(table)
+            df.attrs["scale"] = table_scale(table)
             
             # Skip empty tables and very small tables (likely not financial statements)
             if df.empty or (df.shape[0] < 5 and df.shape[1] < 3):
+                METRICS.incr("tables_skipped")
                 continue
                 
             # Convert DataFrame to string for keyword search
             df_text = df.to_string().lower()
             
             # Check for specific financial tables using key phrases
-            if "total liabilities and shareholders' equity" in df_text:
-                financials["balance_sheet"] = df
-                print(f"FOUND BALANCE SHEET: {table_id}")
-            elif "cash and cash equivalents at end of period" in df_text:
-                financials["cash_flow_statement"] = df
-                print(f"FOUND CASH FLOWS: {table_id}")
-            elif "total operating expenses" in df_text and "net income per share" in df_text:
-                financials["income_statement"] = df
-                print(f"FOUND INCOME STATEMENT: {table_id}")
+            statements = matcher.candidates(df_text)
+            if statements:
+                key, label = statements[0]
+                financials[key] = df
+                table_index[key] = table_id
+                print(f"FOUND {label}: {table_id}")
+                METRICS.incr("statements_found")
                 
         except Exception as e:
+            METRICS.incr("parse_errors")
             print(f"Error parsing table {i}: {str(e)}")
+        
+        # Nothing left to find, so skip the rest of the document
+        if streaming and all(key in financials for key, _, _ in signatures):
+            break
     
-    # Create output directory if specified and financials found
-    if output_dir and financials:
-        os.makedirs(output_dir, exist_ok=True)
+    if streaming:
+        print(f"Scanned {scanned} tables in the document")
+    
+    return financials, table_index
+
+def extractor_version(signatures=STATEMENT_SIGNATURES):
+    """
+    Fingerprint of the extraction rules, used to key cached results.
+    
+    Args:
+        signatures (list): Statement signatures in use
         
-        # Save each financial table as CSV
-        for table_name, df in financials.items():
-            csv_path = os.path.join(output_dir, f"{table_name}.csv")
-            df.to_csv(csv_path, index=False)
-            print(f"Saved: {csv_path}")
+    Returns:
+        str: Hash of EXTRACTOR_VERSION and the signatures, so editing either invalidates the cache
+    """
+    rules = json.dumps([EXTRACTOR_VERSION, [list(signature) for signature in signatures]])
+    return hashlib.sha256(rules.encode('utf-8')).hexdigest()[:16]
+
+class SignatureMatcher:
+    """
+    Multi-pattern matcher over the phrases of a set of statement signatures. Every phrase is
+    compiled into one regular expression so a table's text is scanned once, in C, no matter
+    how many statements are configured.
+    """
     
-    # Print summary of found financial tables
-    print(f"\nFound {len(financials)} financial tables:")
-    for table_name in financials.keys():
-        print(f"- {table_name}")
+    def __init__(self, signatures=STATEMENT_SIGNATURES):
+        """
+        Args:
+            signatures (list): Statements to detect as (key, label, phrases) tuples
+        """
+        self.signatures = [(key, label, frozenset(phrases)) for key, label, phrases in signatures]
+        phrases = sorted({phrase for _, _, group in self.signatures for phrase in group}, key=len, reverse=True)
+        
+        # A lookahead matches at every offset, so overlapping phrases are all seen. Only the
+        # longest phrase starting at an offset is reported, so also credit the phrases it contains.
+        self._pattern = re.compile('(?=(' + '|'.join(re.escape(phrase) for phrase in phrases) + '))')
+        self._contained = {phrase: {other for other in phrases if other in phrase} for phrase in phrases}
     
-    return financials
+    def candidates(self, text):
+        """
+        Args:
+            text (str): Lowercased table text
+            
+        Returns:
+            list: (key, label) of every statement whose phrases all occur in text, in signature order
+        """
+        found = set()
+        for match in self._pattern.finditer(text):
+            found |= self._contained[match.group(1)]
+        return [(key, label) for key, label, group in self.signatures if group <= found]
+
+def table_identifier(i, table, heading=None):
+    """
+    Build the identifier for the i-th table of a document.
+    
+    Args:
+        i (int): Position of the table among all tables in the document
+        table (bs4.element.Tag): BeautifulSoup table element
+        heading (str, optional): Text of the nearest heading preceding the table. When
+            omitted it is looked up in the table's tree with find_previous
+        
+    Returns:
+        str: Identifier of the form table_{i} or table_{i}_{title}
+    """
+    # Try to find a caption or a title for better identification
+    caption = table.find('caption')
+    title_element = table.find(lambda tag: tag.name in HEADING_TAGS and tag.text.strip())
+    
+    if caption and caption.text.strip():
+        return f"table_{i}_{clean_title(caption.text.strip())}"
+    if title_element and title_element.text.strip():
+        return f"table_{i}_{clean_title(title_element.text.strip())}"
+    
+    # Try to find nearby headings
+    if heading is None:
+        prev_heading = table.find_previous(HEADING_TAGS)
+        heading = prev_heading.text if prev_heading else ''
+    if heading.strip():
+        return f"table_{i}_{clean_title(heading.strip())}"
+    return f"table_{i}"
+
+class HeadingIndex:
+    """
+    Document-order index of the h1-h5 headings and tables of a parsed document, built in a
+    single traversal so the nearest heading before any table is a bisect away instead of a
+    find_previous walk back through the tree.
+    """
+    
+    def __init__(self, soup):
+        """
+        Args:
+            soup (bs4.BeautifulSoup): Parsed document
+        """
+        self.tables = []
+        self._table_positions = []
+        self._heading_positions = []
+        self._heading_texts = []
+        
+        # find_all returns matches in document order, so the enumeration is the position
+        for position, tag in enumerate(soup.find_all(['table'] + HEADING_TAGS)):
+            if tag.name == 'table':
+                self.tables.append(tag)
+                self._table_positions.append(position)
+            else:
+                self._heading_positions.append(position)
+                self._heading_texts.append(tag.text)
+    
+    def heading_for(self, i):
+        """
+        Args:
+            i (int): Position of the table among all tables in the document
+            
+        Returns:
+            str: Text of the last heading that starts before the table, or '' if there is none
+        """
+        k = bisect_left(self._heading_positions, self._table_positions[i])
+        return self._heading_texts[k - 1] if k else ''
+
+class _TableStreamParser(HTMLParser):
+    """
+    Event-based parser that re-assembles the markup of each <table> as the document is fed
+    in chunks. Completed tables are queued as (index, markup, heading) where index matches
+    the table's position in soup.find_all('table') and heading is the text of the last
+    h1-h5 element that started before the table.
+    """
+    
+    def __init__(self):
+        # Keep entity references raw so the table markup can be reproduced verbatim
+        super().__init__(convert_charrefs=False)
+        self.completed = deque()
+        self.table_count = 0
+        self._open_tables = []
+        self._heading_parts = None
+        self._heading_depth = 0
+        self._last_heading = ''
+    
+    def _append(self, markup, text=''):
+        for open_table in self._open_tables:
+            open_table[1].append(markup)
+        if self._heading_parts is not None and text:
+            self._heading_parts.append(text)
+    
+    def handle_starttag(self, tag, attrs):
+        if tag == 'table':
+            # Nested tables keep their outer table's start position for numbering
+            self._open_tables.append((self.table_count, [], self._last_heading))
+            self.table_count += 1
+        if tag in HEADING_TAGS:
+            if self._heading_parts is None:
+                self._heading_parts = []
+            self._heading_depth += 1
+        self._append(self.get_starttag_text())
+    
+    def handle_startendtag(self, tag, attrs):
+        self._append(self.get_starttag_text())
+    
+    def handle_endtag(self, tag):
+        self._append(f"</{tag}>")
+        if tag in HEADING_TAGS and self._heading_parts is not None:
+            self._heading_depth -= 1
+            if self._heading_depth == 0:
+                self._last_heading = ''.join(self._heading_parts)
+                self._heading_parts = None
+        if tag == 'table' and self._open_tables:
+            index, parts, heading = self._open_tables.pop()
+            self.completed.append((index, ''.join(parts), heading))
+    
+    def handle_data(self, data):
+        self._append(data, data)
+    
+    def handle_entityref(self, name):
+        self._append(f"&{name};", unescape(f"&{name};"))
+    
+    def handle_charref(self, name):
+        self._append(f"&#{name};", unescape(f"&#{name};"))
+    
+    def handle_comment(self, data):
+        self._append(f"<!--{data}-->")
+
+def iter_tables(file_path, chunk_size=STREAM_CHUNK_SIZE):
+    """
+    Stream the tables of an HTML document without building a tree for the whole file.
+    
+    Args:
+        file_path (str): Path to the XBRL/HTML file
+        chunk_size (int): Number of characters read and fed to the parser at a time
+        
+    Yields:
+        tuple: (index, table, heading) where table is a BeautifulSoup table element built
+            from that table's markup alone and heading is the preceding heading text
+    """
+    parser = _TableStreamParser()
+    
+    with open(file_path, 'r', encoding='utf-8') as file:
+        while True:
+            chunk = file.read(chunk_size)
+            if not chunk:
+                break
+            parser.feed(chunk)
+            
+            while parser.completed:
+                index, markup, heading = parser.completed.popleft()
+                yield index, BeautifulSoup(markup, 'html.parser').table, heading
+    
+    parser.close()
+    while parser.completed:
+        index, markup, heading = parser.completed.popleft()
+        yield index, BeautifulSoup(markup, 'html.parser').table, heading
 
 def clean_title(title):
     """Clean a title string to make it suitable for a filename or dict key"""
@@ -103,6 +391,7 @@ def clean_title(title):
     # Truncate long titles
     return title[:50].lower()
 
+@METRICS.timed()
 def parse_table_to_dataframe(table):
     """
     Parse an HTML table into a pandas DataFrame.
@@ -173,9 +462,10 @@ def parse_table_to_dataframe(table):
 
 # Example usage
 if __name__ == "__main__":
-    # Path to the XBRL file
-    # file_path = "../filings/sec-edgar-filings/NVDA/10-K/0001045810-25-000023/nvda_primary-document.html"
-    file_path = "../filings/sec-edgar-filings/AAPL/10-K/0000320193-24-000123/primary-document.html"
+    # Path to the XBRL file, relative to this script so it runs from any directory
+    filings_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "filings", "sec-edgar-filings")
+    # file_path = os.path.join(filings_dir, "NVDA", "10-K", "0001045810-25-000023", "nvda_primary-document.html")
+    file_path = os.path.join(filings_dir, "AAPL", "10-K", "0000320193-24-000123", "primary-document.html")
     
     # Extract and save financial tables
     financial_tables = extract_financial_tables(file_path)
@@ -0,0 +1,206 @@
+import argparse
+import hashlib
+import json
+import os
+import re
+from difflib import SequenceMatcher
+
+from accession import filing_order
+from sections import SectionIndex, clean_section_text
+
+# Prior paragraphs at least this similar to a changed paragraph are reported as its previous version
+SIMILARITY_THRESHOLD = 0.8
+
+QUOTE_TRANSLATION = str.maketrans({'‘': "'", '’': "'", '“': '"', '”': '"', '–': '-', '—': '-', '\xa0': ' '})
+
+def normalize_paragraph(text):
+    """Normalize quotes, dashes, case and whitespace so cosmetic edits hash the same"""
+    return re.sub(r'\s+', ' ', text.translate(QUOTE_TRANSLATION)).strip().lower()
+
+def paragraph_hash(text):
+    """Return the hash of a paragraph's normalized text"""
+    return hashlib.sha1(normalize_paragraph(text).encode('utf-8')).hexdigest()
+
+def split_paragraphs(text):
+    """Split cleaned section text (one paragraph per line) into paragraphs"""
+    return [line for line in text.split('\n') if line.strip()]
+
+class ParagraphStore:
+    """
+    Per-ticker store of the paragraph hashes of each filing's risk factors, with the text of
+    every distinct paragraph stored once. Each ticker is a JSON file under store_dir.
+    """
+
+    def __init__(self, store_dir="risk_paragraphs"):
+        """
+        Args:
+            store_dir (str): Directory holding one <TICKER>.json file per company
+        """
+        self.store_dir = store_dir
+
+    def _path(self, ticker):
+        return os.path.join(self.store_dir, f"{ticker.upper()}.json")
+
+    def load(self, ticker):
+        """
+        Returns:
+            dict: {"filings": [{"accession", "filing_date", "hashes"}, ...] oldest first,
+                "paragraphs": {hash: text}}
+        """
+        try:
+            with open(self._path(ticker), 'r', encoding='utf-8') as file:
+                return json.load(file)
+        except FileNotFoundError:
+            return {"filings": [], "paragraphs": {}}
+
+    def previous_filing(self, ticker, accession, filing_date=None):
+        """
+        Args:
+            ticker (str): Company ticker
+            accession (str): Accession of the filing being compared
+            filing_date (str, optional): Its filing date, "YYYY-MM-DD"
+
+        Returns:
+            list: Paragraph texts, in order, of the newest stored filing filed before this one.
+                Filings stored later but filed after it (a backfill) are not its baseline
+        """
+        data = self.load(ticker)
+        current = filing_order(accession, filing_date)
+        # Stored filings are kept in filing_order, the same key add_filing sorts by
+        earlier = [filing for filing in data["filings"]
+                   if filing_order(filing["accession"], filing.get("filing_date")) < current]
+        if not earlier:
+            return []
+        return [data["paragraphs"][paragraph] for paragraph in earlier[-1]["hashes"]]
+
+    def add_filing(self, ticker, accession, paragraphs, filing_date=None):
+        """
+        Record a filing's paragraphs, replacing any earlier record of the same accession.
+
+        Args:
+            ticker (str): Company ticker
+            accession (str): Accession number of the filing
+            paragraphs (list): Paragraph texts in document order
+            filing_date (str, optional): Filing date, "YYYY-MM-DD"
+        """
+        data = self.load(ticker)
+        hashes = []
+        for text in paragraphs:
+            key = paragraph_hash(text)
+            data["paragraphs"].setdefault(key, text)
+            hashes.append(key)
+
+        data["filings"] = [filing for filing in data["filings"] if filing["accession"] != accession]
+        data["filings"].append({"accession": accession, "filing_date": filing_date, "hashes": hashes})
+        data["filings"].sort(key=lambda filing: filing_order(filing["accession"], filing.get("filing_date")))
+
+        # Drop paragraph texts no stored filing refers to any more
+        referenced = {key for filing in data["filings"] for key in filing["hashes"]}
+        data["paragraphs"] = {key: text for key, text in data["paragraphs"].items() if key in referenced}
+
+        os.makedirs(self.store_dir, exist_ok=True)
+        tmp_path = f"{self._path(ticker)}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as file:
+            json.dump(data, file)
+        os.replace(tmp_path, self._path(ticker))
+
+def diff_paragraphs(previous, current, threshold=SIMILARITY_THRESHOLD):
+    """
+    Compare two filings' paragraphs by hash, matching edited paragraphs by similarity.
+
+    Args:
+        previous (list): Paragraph texts of the prior filing
+        current (list): Paragraph texts of the new filing
+        threshold (float): Minimum SequenceMatcher ratio for a changed paragraph to be
+            reported as a modification of a prior one
+
+    Returns:
+        dict: "new" (list of texts), "modified" (list of dicts with text, previous and
+            similarity), "removed" (prior texts with no match) and "unchanged" (count)
+    """
+    previous_hashes = {paragraph_hash(text): text for text in previous}
+    current_hashes = {paragraph_hash(text) for text in current}
+
+    changed = [text for text in current if paragraph_hash(text) not in previous_hashes]
+    unmatched = {key: normalize_paragraph(text) for key, text in previous_hashes.items() if key not in current_hashes}
+
+    new, modified = [], []
+    for text in changed:
+        normalized = normalize_paragraph(text)
+        matcher = SequenceMatcher(None, autojunk=False)
+        matcher.set_seq2(normalized)
+
+        best_key, best_ratio = None, threshold
+        for key, candidate in unmatched.items():
+            matcher.set_seq1(candidate)
+            # The quick upper bounds rule out most candidates before the full comparison
+            if matcher.real_quick_ratio() < best_ratio or matcher.quick_ratio() < best_ratio:
+                continue
+            ratio = matcher.ratio()
+            if ratio >= best_ratio:
+                best_key, best_ratio = key, ratio
+
+        if best_key is None:
+            new.append(text)
+        else:
+            modified.append({"text": text, "previous": previous_hashes[best_key], "similarity": round(best_ratio, 3)})
+            del unmatched[best_key]
+
+    return {
+        "new": new,
+        "modified": modified,
+        "removed": [previous_hashes[key] for key in unmatched],
+        "unchanged": len(current) - len(changed),
+    }
+
+def changed_risk_factors(file_path, ticker, accession, store, index=None, threshold=SIMILARITY_THRESHOLD,
+                         filing_date=None):
+    """
+    Extract a filing's risk factors and return only what changed since the company's prior
+    filing in the store (the newest one filed before it), then record this filing.
+
+    Args:
+        file_path (str): Path to the XBRL/HTML 10-K
+        ticker (str): Company ticker
+        accession (str): Accession number of the filing
+        store (ParagraphStore): Paragraph store shared across runs
+        index (SectionIndex, optional): Prebuilt section index for the document
+        threshold (float): Similarity threshold for matching edited paragraphs
+        filing_date (str, optional): Filing date, "YYYY-MM-DD"; orders filings whose
+            accession numbers come from different filing agents
+
+    Returns:
+        dict: Output of diff_paragraphs. With no prior filing every paragraph is new
+    """
+    index = index or SectionIndex.from_file(file_path)
+    paragraphs = split_paragraphs(clean_section_text(index.section("1A")))
+
+    diff = diff_paragraphs(store.previous_filing(ticker, accession, filing_date), paragraphs, threshold)
+    store.add_filing(ticker, accession, paragraphs, filing_date)
+    return diff
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Emit only the risk factor paragraphs that changed since the prior filing")
+    parser.add_argument("file_path", help="Path to the XBRL/HTML 10-K")
+    parser.add_argument("ticker", help="Company ticker")
+    parser.add_argument("accession", help="Accession number of the filing")
+    parser.add_argument("--store-dir", default="risk_paragraphs", help="Directory of the per-ticker paragraph store")
+    parser.add_argument("--filing-date", help="Filing date of the filing, YYYY-MM-DD")
+    parser.add_argument("--threshold", type=float, default=SIMILARITY_THRESHOLD, help="Similarity for edited paragraphs")
+    parser.add_argument("--output", help="Write the changes as JSON to this file")
+    args = parser.parse_args(argv)
+
+    diff = changed_risk_factors(args.file_path, args.ticker, args.accession, ParagraphStore(args.store_dir),
+                                threshold=args.threshold, filing_date=args.filing_date)
+    print(f"{diff['unchanged']} unchanged, {len(diff['modified'])} modified, "
+          f"{len(diff['new'])} new, {len(diff['removed'])} removed paragraphs")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            json.dump(diff, file, indent=2)
+        print(f"Saved changes to: {args.output}")
+
+    return diff
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,307 @@
+import json
+import os
+import re
+from bisect import bisect_right
+from html.parser import HTMLParser
+
+# Characters read from disk per parser feed
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# Standard 10-K items in filing order
+STANDARD_ITEMS = {
+    "1": "Business",
+    "1A": "Risk Factors",
+    "1B": "Unresolved Staff Comments",
+    "1C": "Cybersecurity",
+    "2": "Properties",
+    "3": "Legal Proceedings",
+    "4": "Mine Safety Disclosures",
+    "5": "Market for Registrant's Common Equity, Related Stockholder Matters and Issuer Purchases of Equity Securities",
+    "6": "[Reserved]",
+    "7": "Management's Discussion and Analysis of Financial Condition and Results of Operations",
+    "7A": "Quantitative and Qualitative Disclosures About Market Risk",
+    "8": "Financial Statements and Supplementary Data",
+    "9": "Changes in and Disagreements with Accountants on Accounting and Financial Disclosure",
+    "9A": "Controls and Procedures",
+    "9B": "Other Information",
+    "9C": "Disclosure Regarding Foreign Jurisdictions that Prevent Inspections",
+    "10": "Directors, Executive Officers and Corporate Governance",
+    "11": "Executive Compensation",
+    "12": "Security Ownership of Certain Beneficial Owners and Management and Related Stockholder Matters",
+    "13": "Certain Relationships and Related Transactions, and Director Independence",
+    "14": "Principal Accountant Fees and Services",
+    "15": "Exhibits and Financial Statement Schedules",
+    "16": "Form 10-K Summary",
+}
+
+# An "Item N." heading at the start of a line
+ITEM_PATTERN = re.compile(r'^[^\S\n]*item[^\S\n]+(\d{1,2}[a-c]?)\b', re.IGNORECASE | re.MULTILINE)
+
+# Elements that start a new line of text
+BLOCK_TAGS = {'p', 'div', 'br', 'tr', 'li', 'ul', 'ol', 'table', 'hr', 'section', 'article',
+              'h1', 'h2', 'h3', 'h4', 'h5', 'h6'}
+
+# Elements whose content is not document text; ix:header holds the hidden XBRL contexts
+SKIP_TAGS = {'script', 'style', 'ix:header'}
+
+class _TextParser(HTMLParser):
+    """
+    Event-based parser that flattens a document to text, one block element per line, while
+    recording where every <table> starts and ends in that text.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts = []
+        self.length = 0
+        self.table_starts = []
+        self.table_spans = []
+        self._open_tables = []
+        self._skip_depth = 0
+
+    def _write(self, text):
+        self.parts.append(text)
+        self.length += len(text)
+
+    def handle_starttag(self, tag, attrs):
+        if tag in SKIP_TAGS:
+            self._skip_depth += 1
+        elif tag == 'table':
+            # Numbered in start order, matching soup.find_all('table')
+            self.table_starts.append(self.length)
+            self._open_tables.append(self.length)
+        if tag in BLOCK_TAGS:
+            self._write('\n')
+        elif tag in ('td', 'th'):
+            self._write(' ')
+
+    def handle_startendtag(self, tag, attrs):
+        if tag in BLOCK_TAGS:
+            self._write('\n')
+
+    def handle_endtag(self, tag):
+        if tag in SKIP_TAGS and self._skip_depth:
+            self._skip_depth -= 1
+        elif tag == 'table' and self._open_tables:
+            start = self._open_tables.pop()
+            if not self._open_tables:
+                self.table_spans.append((start, self.length))
+        if tag in BLOCK_TAGS:
+            self._write('\n')
+
+    def handle_data(self, data):
+        if not self._skip_depth:
+            self._write(data)
+
+class SectionIndex:
+    """
+    Offsets of the standard 10-K items in a document's text, built in one parse of the HTML
+    and one scan of the resulting text. Sections are sliced from the stored text on demand,
+    and table positions are kept so a table can be mapped to the item it appears in.
+    """
+
+    def __init__(self, text, offsets, table_starts):
+        """
+        Args:
+            text (str): Document text, one block element per line
+            offsets (dict): Start offset in text of each item found, keyed by item number
+            table_starts (list): Start offset in text of each table, in document order
+        """
+        self.text = text
+        self.offsets = offsets
+        self.table_starts = table_starts
+
+        # Items in document order, for finding where each section ends
+        self._ordered = sorted(offsets.items(), key=lambda item: item[1])
+
+    @classmethod
+    def from_file(cls, file_path, chunk_size=STREAM_CHUNK_SIZE):
+        """
+        Build the index for an XBRL/HTML 10-K.
+
+        Args:
+            file_path (str): Path to the XBRL/HTML file
+            chunk_size (int): Number of characters read and fed to the parser at a time
+
+        Returns:
+            SectionIndex: Index of every standard item found in the document
+        """
+        if not os.path.exists(file_path):
+            raise FileNotFoundError(f"File not found: {file_path}")
+
+        parser = _TextParser()
+        with open(file_path, 'r', encoding='utf-8', errors='replace') as file:
+            while True:
+                chunk = file.read(chunk_size)
+                if not chunk:
+                    break
+                parser.feed(chunk)
+        parser.close()
+
+        text = ''.join(parser.parts)
+        return cls(text, find_item_offsets(text, parser.table_spans), parser.table_starts)
+
+    def items(self):
+        """Return the item numbers found, in document order"""
+        return [item for item, _ in self._ordered]
+
+    def span(self, item):
+        """
+        Args:
+            item (str): Item number, e.g. "1A" or "7"
+
+        Returns:
+            tuple: (start, end) offsets of the section in text, or None if it was not found
+        """
+        item = item.upper()
+        if item not in self.offsets:
+            return None
+
+        position = self._ordered.index((item, self.offsets[item]))
+        end = self._ordered[position + 1][1] if position + 1 < len(self._ordered) else len(self.text)
+        return self.offsets[item], end
+
+    def section(self, item):
+        """
+        Args:
+            item (str): Item number, e.g. "1A" or "7"
+
+        Returns:
+            str: Text of the section including its heading, or "" if it was not found
+        """
+        span = self.span(item)
+        return self.text[span[0]:span[1]] if span else ""
+
+    def item_at(self, offset):
+        """Return the item whose section contains a text offset, or None before the first item"""
+        starts = [start for _, start in self._ordered]
+        position = bisect_right(starts, offset) - 1
+        return self._ordered[position][0] if position >= 0 else None
+
+    def table_items(self):
+        """
+        Returns:
+            list: Item containing each table, indexed like soup.find_all('table') and the
+                table numbers used by extract_financial_tables
+        """
+        return [self.item_at(start) for start in self.table_starts]
+
+    def tables_in(self, *items):
+        """Return the numbers of the tables that appear in any of the given items"""
+        wanted = {item.upper() for item in items}
+        return [i for i, item in enumerate(self.table_items()) if item in wanted]
+
+    def save(self, path):
+        """Write the index and its text to a JSON file so it can be reloaded without parsing"""
+        with open(path, 'w', encoding='utf-8') as file:
+            json.dump({"text": self.text, "offsets": self.offsets, "table_starts": self.table_starts}, file)
+
+    @classmethod
+    def load(cls, path):
+        """Read an index written by save"""
+        with open(path, 'r', encoding='utf-8') as file:
+            data = json.load(file)
+        return cls(data["text"], data["offsets"], data["table_starts"])
+
+def find_item_offsets(text, table_spans=()):
+    """
+    Locate the heading of each standard item in a document's text.
+
+    Table of contents entries are skipped: they sit inside tables, and any heading that would
+    put the items out of filing order is ignored as a cross-reference.
+
+    Args:
+        text (str): Document text, one block element per line
+        table_spans (list): (start, end) offsets of top-level tables in text
+
+    Returns:
+        dict: Start offset of each item's heading keyed by item number
+    """
+    table_starts = [start for start, _ in table_spans]
+    order = {item: rank for rank, item in enumerate(STANDARD_ITEMS)}
+
+    offsets = {}
+    last_rank = -1
+    for match in ITEM_PATTERN.finditer(text):
+        item = match.group(1).upper()
+        rank = order.get(item)
+        if rank is None or rank <= last_rank:
+            continue
+
+        position = bisect_right(table_starts, match.start()) - 1
+        if position >= 0 and match.start() < table_spans[position][1]:
+            continue
+
+        offsets[item] = match.start()
+        last_rank = rank
+
+    return offsets
+
+def clean_section_text(text):
+    """
+    Tidy a section sliced from a SectionIndex: drops page numbers, "Table of Contents"
+    running headers and repeated lines, and collapses whitespace.
+
+    Args:
+        text (str): Raw section text
+
+    Returns:
+        str: Cleaned text, one paragraph per line
+    """
+    text = re.sub(r'Table of Contents', '', text)
+    text = re.sub(r'[ \t\xa0]+', ' ', text)
+
+    unique_lines = []
+    seen_lines = set()
+    for line in text.split('\n'):
+        line = line.strip()
+        # Skip empty lines, page numbers and already seen lines
+        if not line or line.isdigit() or line in seen_lines:
+            continue
+        seen_lines.add(line)
+        unique_lines.append(line)
+
+    return '\n'.join(unique_lines)
+
+def extract_risk_factors(file_path, output_file=None, index=None):
+    """
+    Extract the Risk Factors section (Item 1A) from an XBRL/HTML 10-K document.
+
+    Args:
+        file_path (str): Path to the XBRL/HTML file
+        output_file (str, optional): Path to save the extracted text
+        index (SectionIndex, optional): Prebuilt index for the document, to avoid re-parsing
+
+    Returns:
+        str: The extracted Risk Factors text, or "" if the section was not found
+    """
+    index = index or SectionIndex.from_file(file_path)
+
+    risk_factors_text = clean_section_text(index.section("1A"))
+    if not risk_factors_text:
+        print("Could not find the Risk Factors section.")
+        return ""
+    print(f"Extracted {len(risk_factors_text)} characters of Risk Factors text")
+
+    # Save to file if requested
+    if output_file:
+        with open(output_file, 'w', encoding='utf-8') as out_file:
+            out_file.write(risk_factors_text)
+        print(f"Saved Risk Factors to: {output_file}")
+
+    return risk_factors_text
+
+# Example usage
+if __name__ == "__main__":
+    # Path to the XBRL file
+    file_path = "../filings/sec-edgar-filings/NVDA/10-K/0001045810-25-000023/nvda_primary-document.html"
+
+    index = SectionIndex.from_file(file_path)
+    for item in index.items():
+        start, end = index.span(item)
+        print(f"Item {item:<4}{STANDARD_ITEMS[item][:60]:<62}{end - start:>9} chars")
+
+    # Every section comes from the same index, without parsing the document again
+    risk_factors = extract_risk_factors(file_path, index=index)
+    mdna = clean_section_text(index.section("7"))
+    print(f"\nMD&A preview:\n{mdna[:500]}...")
@@ -0,0 +1,290 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import re
+import time
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from accession import filing_order
+from normalize import normalize_statement
+
+# Long-format layout of every stored value
+STORE_SCHEMA = pa.schema([
+    ("ticker", pa.string()),
+    ("accession", pa.string()),
+    ("statement", pa.string()),
+    ("period", pa.string()),
+    ("item_key", pa.string()),
+    ("line_item", pa.string()),
+    ("section", pa.string()),
+    ("value", pa.float64()),
+])
+
+CATALOG_NAME = "catalog.json"
+SEGMENTS_DIR = "segments"
+
+def normalize_line_item(label):
+    """
+    Key under which a line item is indexed, so the same item matches across companies and
+    years: lowercased, footnote marks and punctuation dropped, whitespace collapsed.
+
+    Args:
+        label (str): Line item as printed in the statement, e.g. "Accounts receivable, net (1)"
+
+    Returns:
+        str: Normalized key, e.g. "accounts receivable net"
+    """
+    label = re.sub(r'\(\d+\)|\*', ' ', label.lower().replace('&', ' and '))
+    return ' '.join(re.sub(r'[^\w\s]', ' ', label).split())
+
+def statements_to_long(ticker, accession, financials):
+    """
+    Flatten extract_financial_tables output to one row per (statement, line item, period).
+
+    Args:
+        ticker (str): Company ticker
+        accession (str): Accession number of the filing
+        financials (dict): Raw statement DataFrames keyed by statement name
+
+    Returns:
+        pandas.DataFrame: Rows in STORE_SCHEMA order, sorted by statement, item_key and period
+    """
+    frames = []
+    for statement, df in financials.items():
+        normalized = normalize_statement(df, df.attrs.get("scale"))
+        if normalized.empty:
+            continue
+        long = normalized.melt(id_vars=["line_item", "section"], var_name="period", value_name="value")
+        long = long.dropna(subset=["value"])
+        long.insert(0, "statement", statement)
+        frames.append(long)
+
+    columns = [field.name for field in STORE_SCHEMA]
+    if not frames:
+        return pd.DataFrame(columns=columns)
+
+    rows = pd.concat(frames, ignore_index=True)
+    rows["ticker"] = ticker.upper()
+    rows["accession"] = accession
+    rows["period"] = rows["period"].astype(str)
+    rows["item_key"] = rows["line_item"].map(normalize_line_item)
+    return rows[columns].sort_values(["statement", "item_key", "period"], kind="stable", ignore_index=True)
+
+class StatementStore:
+    """
+    Append-only store of normalized financial statements across companies and filings.
+    Each filing added becomes one immutable Arrow IPC segment file, listed in a JSON catalog.
+    Segments are memory-mapped when read, and an index from (ticker, line item) to rows is
+    built once per open, so time-series queries are lookups rather than CSV re-parsing.
+    """
+
+    def __init__(self, store_dir="statement_store"):
+        """
+        Args:
+            store_dir (str): Directory holding the catalog and the segment files
+        """
+        self.store_dir = store_dir
+        self._table = None
+        self._index = None
+
+    def _catalog_path(self):
+        return os.path.join(self.store_dir, CATALOG_NAME)
+
+    def catalog(self):
+        """
+        Returns:
+            list: One dict per segment with file, ticker, accession, filing_date, statements,
+                periods and rows
+        """
+        try:
+            with open(self._catalog_path(), 'r', encoding='utf-8') as file:
+                return json.load(file)
+        except FileNotFoundError:
+            return []
+
+    def has_filing(self, ticker, accession):
+        return any(segment["ticker"] == ticker.upper() and segment["accession"] == accession
+                   for segment in self.catalog())
+
+    def add_filing(self, ticker, accession, financials, filing_date=None):
+        """
+        Append a filing's statements. A filing already in the store is skipped; a filing with
+        no statement values is recorded without a segment, so it is not extracted again.
+
+        Args:
+            ticker (str): Company ticker
+            accession (str): Accession number of the filing
+            financials (dict): Statement DataFrames as returned by extract_financial_tables
+            filing_date (str, optional): Filing date, "YYYY-MM-DD"; orders the filing in series
+
+        Returns:
+            int: Number of values stored
+        """
+        if self.has_filing(ticker, accession):
+            return 0
+
+        rows = statements_to_long(ticker, accession, financials)
+        catalog = self.catalog()
+        if rows.empty:
+            catalog.append({"file": None, "ticker": ticker.upper(), "accession": accession,
+                            "filing_date": filing_date, "statements": [], "periods": [], "rows": 0})
+            self._write_catalog(catalog)
+            return 0
+
+        segments_dir = os.path.join(self.store_dir, SEGMENTS_DIR)
+        os.makedirs(segments_dir, exist_ok=True)
+        name = f"{len(catalog):06d}_{ticker.upper()}_{accession}.arrow"
+        path = os.path.join(segments_dir, name)
+
+        # Uncompressed IPC files can be memory-mapped and read without copying
+        table = pa.Table.from_pandas(rows, schema=STORE_SCHEMA, preserve_index=False)
+        with pa.OSFile(f"{path}.tmp", 'wb') as sink, pa.ipc.new_file(sink, STORE_SCHEMA) as writer:
+            writer.write_table(table)
+        os.replace(f"{path}.tmp", path)
+
+        catalog.append({"file": name, "ticker": ticker.upper(), "accession": accession, "filing_date": filing_date,
+                        "statements": sorted(rows["statement"].unique()),
+                        "periods": sorted(rows["period"].unique()), "rows": len(rows)})
+        self._write_catalog(catalog)
+
+        self._table = self._index = None
+        return len(rows)
+
+    def _write_catalog(self, catalog):
+        os.makedirs(self.store_dir, exist_ok=True)
+        with open(f"{self._catalog_path()}.tmp", 'w', encoding='utf-8') as file:
+            json.dump(catalog, file, indent=1)
+        os.replace(f"{self._catalog_path()}.tmp", self._catalog_path())
+
+    def _load(self):
+        if self._table is not None:
+            return
+
+        tables = [pa.ipc.open_file(pa.memory_map(os.path.join(self.store_dir, SEGMENTS_DIR, segment["file"]))).read_all()
+                  for segment in self.catalog() if segment["file"]]
+        self._table = pa.concat_tables(tables) if tables else STORE_SCHEMA.empty_table()
+
+        # Row positions of every (ticker, item_key) pair
+        keys = self._table.select(["ticker", "item_key"]).to_pandas()
+        self._index = keys.groupby(["ticker", "item_key"], sort=False).indices if len(keys) else {}
+
+    def tickers(self):
+        return sorted({segment["ticker"] for segment in self.catalog() if segment["rows"]})
+
+    def query(self, tickers=None, items=None, statements=None, periods=None):
+        """
+        Select stored values. Every filter is optional and takes a list.
+
+        Args:
+            tickers (list, optional): Company tickers
+            items (list, optional): Line items, matched after normalize_line_item
+            statements (list, optional): Statement names, e.g. ["income_statement"]
+            periods (list, optional): Periods as stored, e.g. ["2025-01-26"]
+
+        Returns:
+            pandas.DataFrame: Matching rows in STORE_SCHEMA columns
+        """
+        self._load()
+        table = self._table
+
+        if items is not None:
+            keys = [normalize_line_item(item) for item in items]
+            wanted = [ticker.upper() for ticker in tickers] if tickers else self.tickers()
+            positions = [self._index[(ticker, key)] for ticker in wanted for key in keys
+                         if (ticker, key) in self._index]
+            table = table.take(np.sort(np.concatenate(positions)) if positions else np.array([], dtype=np.int64))
+        elif tickers:
+            table = table.filter(pc.is_in(table["ticker"], pa.array([ticker.upper() for ticker in tickers])))
+
+        if statements:
+            table = table.filter(pc.is_in(table["statement"], pa.array(statements)))
+        if periods:
+            table = table.filter(pc.is_in(table["period"], pa.array([str(period) for period in periods])))
+
+        return table.to_pandas()
+
+    def series(self, item, tickers=None, statement=None):
+        """
+        Time series of one line item across companies. A period reported by several filings
+        takes the value from the latest filing, by filing date.
+
+        Args:
+            item (str): Line item, e.g. "Total operating expenses"
+            tickers (list, optional): Company tickers, all when omitted
+            statement (str, optional): Restrict to one statement
+
+        Returns:
+            pandas.DataFrame: Values indexed by period with one column per ticker
+        """
+        rows = self.query(tickers=tickers, items=[item], statements=[statement] if statement else None)
+        if rows.empty:
+            return pd.DataFrame()
+        # Filing dates order filings from different filer agents; accessions only break ties
+        order = {(segment["ticker"], segment["accession"]): filing_order(segment["accession"], segment.get("filing_date"))
+                 for segment in self.catalog()}
+        rows["order"] = [order[key] for key in zip(rows["ticker"], rows["accession"])]
+        rows = rows.sort_values("order", kind="stable")
+        return rows.pivot_table(index="period", columns="ticker", values="value", aggfunc="last").sort_index()
+
+def ingest(store, root, forms=("10-K",)):
+    """
+    Extract and add every filing under a sec-edgar-filings tree not yet in the store.
+
+    Args:
+        store (StatementStore): Store to append to
+        root (str): sec-edgar-filings directory, or a directory containing it
+        forms (tuple): Form types to include
+
+    Returns:
+        int: Number of values added
+    """
+    # batch imports prod, which is only needed when ingesting
+    from batch import discover_filings
+    from prod import extract_financial_tables
+
+    added = 0
+    for filing in discover_filings(root, list(forms)):
+        if store.has_filing(filing["ticker"], filing["accession"]):
+            continue
+        with contextlib.redirect_stdout(io.StringIO()):
+            financials = extract_financial_tables(filing["path"], output_dir=None, streaming=True)
+        count = store.add_filing(filing["ticker"], filing["accession"], financials)
+        print(f"{filing['key']}: {count} values from {', '.join(sorted(financials)) or 'no statements'}")
+        added += count
+    return added
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build and query the multi-company statement store")
+    parser.add_argument("--store-dir", default="statement_store", help="Directory of the store")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    ingest_parser = subparsers.add_parser("ingest", help="Add every new filing under a sec-edgar-filings tree")
+    ingest_parser.add_argument("root", help="sec-edgar-filings directory, or a directory containing it")
+    ingest_parser.add_argument("--form", action="append", dest="forms", help="Form type, may be repeated (default: 10-K)")
+
+    query_parser = subparsers.add_parser("query", help="Print the time series of a line item")
+    query_parser.add_argument("item", help="Line item, e.g. 'Total operating expenses'")
+    query_parser.add_argument("--ticker", action="append", dest="tickers", help="Ticker, may be repeated (default: all)")
+    query_parser.add_argument("--statement", help="Restrict to one statement, e.g. income_statement")
+    args = parser.parse_args(argv)
+
+    store = StatementStore(args.store_dir)
+    if args.command == "ingest":
+        added = ingest(store, args.root, tuple(args.forms or ["10-K"]))
+        print(f"Added {added} values; store holds {len(store.catalog())} filings")
+        return added
+
+    start_time = time.perf_counter()
+    series = store.series(args.item, tickers=args.tickers, statement=args.statement)
+    print(series.to_string() if not series.empty else f"No values for {args.item}")
+    print(f"\nQueried in {(time.perf_counter() - start_time) * 1000:.1f} ms")
+    return series
+
+if __name__ == "__main__":
+    main()
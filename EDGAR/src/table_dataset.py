@@ -0,0 +1,157 @@
+import argparse
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from bs4 import BeautifulSoup
+
+from prod import HeadingIndex, iter_tables, parse_table_to_dataframe, table_identifier
+
+# Long-format layout of every table cell. Row 0 holds a table's column headers and data rows
+# start at 1, the same numbering as the lines of the table's CSV dump
+CELL_SCHEMA = pa.schema([
+    ("filing", pa.string()),
+    ("table_id", pa.string()),
+    ("heading", pa.string()),
+    ("row", pa.int32()),
+    ("col", pa.int32()),
+    ("value", pa.string()),
+])
+
+# Parquet footer key holding the table index
+INDEX_KEY = "table_index"
+
+def table_cells(df):
+    """
+    Flatten a table's DataFrame to its non-empty cells.
+
+    Args:
+        df (pandas.DataFrame): Table as returned by parse_table_to_dataframe
+
+    Returns:
+        tuple: (rows, cols, values) arrays of the non-empty cells, headers in row 0
+    """
+    if df.columns.empty:
+        return np.empty(0, np.int32), np.empty(0, np.int32), np.empty(0, str)
+
+    grid = np.vstack([np.asarray(df.columns, dtype=object), df.to_numpy(dtype=object)])
+    rows, cols = np.nonzero(grid != '')
+    return rows.astype(np.int32), cols.astype(np.int32), grid[rows, cols].astype(str)
+
+def extract_all_tables(file_path, output_path, filing=None, streaming=True):
+    """
+    Gather every table of a filing into one long-format Parquet file of
+    (filing, table_id, heading, row, col, value) cells, written as each table is parsed.
+    Each table is its own row group, and the footer maps table ids to row groups so
+    read_table can load one table without scanning the rest. Tables with no text are left
+    out, and a table that fails to parse is skipped and counted.
+
+    Args:
+        file_path (str): Path to the XBRL/HTML file
+        output_path (str): Parquet file to write
+        filing (str, optional): Filing identifier stored with every cell, defaults to the
+            name of the directory holding the document (its accession number)
+        streaming (bool): Scan the document with iter_tables instead of a full tree
+
+    Returns:
+        dict: Table index keyed by table id, with row_group, heading, rows and cols
+    """
+    if not os.path.exists(file_path):
+        raise FileNotFoundError(f"File not found: {file_path}")
+    filing = filing or os.path.basename(os.path.dirname(os.path.abspath(file_path)))
+
+    if streaming:
+        tables = iter_tables(file_path)
+    else:
+        with open(file_path, 'r', encoding='utf-8') as file:
+            heading_index = HeadingIndex(BeautifulSoup(file.read(), 'html.parser'))
+        tables = ((i, table, heading_index.heading_for(i)) for i, table in enumerate(heading_index.tables))
+
+    index = {}
+    failed = 0
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+    with pq.ParquetWriter(output_path, CELL_SCHEMA) as writer:
+        for i, table, heading in tables:
+            # A malformed table is skipped, so it cannot leave the file without its index footer
+            try:
+                df = parse_table_to_dataframe(table)
+                rows, cols, values = table_cells(df)
+                if not len(values):
+                    continue
+
+                table_id = table_identifier(i, table, heading)
+                count = len(values)
+                cells = pa.table({
+                    "filing": pa.array([filing] * count, pa.string()),
+                    "table_id": pa.array([table_id] * count, pa.string()),
+                    "heading": pa.array([heading.strip()] * count, pa.string()),
+                    "row": pa.array(rows, pa.int32()),
+                    "col": pa.array(cols, pa.int32()),
+                    "value": pa.array(values, pa.string()),
+                }, schema=CELL_SCHEMA)
+            except Exception as e:
+                failed += 1
+                print(f"Error parsing table {i}: {str(e)}")
+                continue
+
+            writer.write_table(cells, row_group_size=count)
+            index[table_id] = {"row_group": len(index), "heading": heading.strip(),
+                               "rows": len(df) + 1, "cols": len(df.columns)}
+
+        writer.add_key_value_metadata({INDEX_KEY: json.dumps(index)})
+
+    print(f"Saved {len(index)} tables to: {output_path}" + (f" ({failed} skipped after errors)" if failed else ""))
+    return index
+
+def load_table_index(path):
+    """Read the table index from a file written by extract_all_tables, without reading any cells"""
+    metadata = pq.ParquetFile(path).metadata.metadata or {}
+    return json.loads(metadata[INDEX_KEY.encode()])
+
+def read_cells(path, table_id):
+    """
+    Args:
+        path (str): File written by extract_all_tables
+        table_id (str): Identifier of the table
+
+    Returns:
+        pandas.DataFrame: The table's long-format cells, read from its row group alone
+    """
+    index = load_table_index(path)
+    if table_id not in index:
+        raise KeyError(f"No table {table_id} in {path}")
+    return pq.ParquetFile(path).read_row_group(index[table_id]["row_group"]).to_pandas()
+
+def read_table(path, table_id):
+    """
+    Rebuild one table as parse_table_to_dataframe returned it.
+
+    Args:
+        path (str): File written by extract_all_tables
+        table_id (str): Identifier of the table
+
+    Returns:
+        pandas.DataFrame: The table with its original headers and '' in empty cells
+    """
+    entry = load_table_index(path)[table_id]
+    cells = read_cells(path, table_id)
+
+    grid = np.full((entry["rows"], entry["cols"]), '', dtype=object)
+    grid[cells["row"].to_numpy(), cells["col"].to_numpy()] = cells["value"].to_numpy()
+    return pd.DataFrame(grid[1:].tolist(), columns=list(grid[0]))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write every table of a filing to one long-format Parquet file")
+    parser.add_argument("file_path", help="Path to the XBRL/HTML filing")
+    parser.add_argument("output_path", help="Parquet file to write")
+    parser.add_argument("--filing", help="Filing identifier stored with every cell (default: accession directory name)")
+    parser.add_argument("--no-streaming", action="store_false", dest="streaming", help="Build a full BeautifulSoup tree")
+    args = parser.parse_args(argv)
+
+    return extract_all_tables(args.file_path, args.output_path, filing=args.filing, streaming=args.streaming)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,372 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import queue
+import re
+import sys
+import threading
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+
+from accession import ACCESSION_PATTERN
+from batch import MANIFEST_NAME, discover_filings
+from downloader import MAX_REQUESTS_PER_SECOND, SEC_DATA_URL, SEC_WWW_URL, EdgarDownloader
+try:
+    from instrumentation import METRICS, collect
+except ModuleNotFoundError:
+    # Run as a script from this directory; the copilot CLI puts the repository root on the path
+    sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, os.pardir))
+    from instrumentation import METRICS, collect
+from prod import extract_financial_tables
+try:
+    from rss_feed_truncated import PRWireParser
+    from seen_store import SeenStore
+except ModuleNotFoundError:
+    # The feed parser is shared with the press release pipeline in RSS, which is not a package
+    sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, os.pardir, "RSS"))
+    from rss_feed_truncated import PRWireParser
+    from seen_store import SeenStore
+
+WATCH_FORMS = ("10-K", "10-Q", "8-K")
+
+# Seconds between polls of the EDGAR feeds
+POLL_INTERVAL = 60
+
+# Entries requested per feed; EDGAR's latest-filings feed serves at most 100
+FEED_COUNT = 100
+
+# Polls a filing missing from the submissions API, or failing to download, is retried for
+MAX_ATTEMPTS = 10
+
+# Entry titles look like "10-K - NVIDIA CORP (0001045810) (Filer)"
+TITLE_PATTERN = re.compile(r'^(?P<form>\S+) - (?P<company>.*?) \((?P<cik>\d{10})\)(?: \((?P<role>[^)]*)\))?')
+
+def current_feed_url(form, www_url=SEC_WWW_URL, count=FEED_COUNT):
+    """Return the URL of EDGAR's Atom feed of the latest filings of one form type"""
+    return (f"{www_url.rstrip('/')}/cgi-bin/browse-edgar?action=getcurrent&type={form}&company=&dateb="
+            f"&owner=include&start=0&count={count}&output=atom")
+
+def parse_feed_entry(entry):
+    """
+    Read the filing an EDGAR Atom feed entry announces.
+
+    Args:
+        entry (dict): feedparser entry
+
+    Returns:
+        dict: form, company, cik and accession, or None if the entry is not a filing
+    """
+    title = TITLE_PATTERN.match(entry.get('title', ''))
+    accession = ACCESSION_PATTERN.search(entry.get('id', '')) or ACCESSION_PATTERN.search(entry.get('link', ''))
+    if not title or not accession:
+        return None
+
+    tags = entry.get('tags') or []
+    form = tags[0].get('term') if tags and tags[0].get('term') else title.group('form')
+    return {"form": form, "company": title.group('company'), "cik": title.group('cik'),
+            "accession": accession.group(0)}
+
+def extract_filing(path, output_dir, output_formats=("csv",)):
+    """Run extract_financial_tables without its progress output; runs in the watcher's process pool"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        return extract_financial_tables(path, output_dir=output_dir, streaming=True, output_formats=output_formats)
+
+def local_accessions(root):
+    """Return the accession numbers already mirrored under a sec-edgar-filings tree"""
+    if not os.path.isdir(root):
+        return set()
+    return {filing["accession"] for filing in discover_filings(root)}
+
+class FilingWatcher:
+    """
+    Polls EDGAR's latest-filings Atom feeds and extracts every new filing of the watched
+    forms. The mirror is scanned once at start; after that, accessions are tracked in
+    memory, so a poll costs one conditional request per form. New filings go through a
+    bounded queue to worker threads that download them and run extract_financial_tables in
+    a process pool.
+    When the workers fall behind, a full queue blocks polling until they catch up.
+    Filings that cannot be fetched yet are kept in memory and queued again by the next polls,
+    since the feed they came from may not be re-read (a 304) or may have moved past them.
+    """
+
+    def __init__(self, downloader, output_root="watched_tables", forms=WATCH_FORMS, tickers=None, store=None,
+                 workers=2, queue_size=32, feed_count=FEED_COUNT, seen_store=None, output_formats=("csv",),
+                 callback=None):
+        """
+        Args:
+            downloader (EdgarDownloader): Downloader whose mirror, session and rate limit are used
+            output_root (str): Root of per-accession statement tables, with a manifest in the
+                layout batch.py writes, so a later batch run skips watched filings
+            forms (tuple): Form types to watch
+            tickers (list, optional): Only watch these companies; every filer with a listed ticker
+                when omitted
+            store (StatementStore, optional): Store each filing's statements are appended to
+            workers (int): Number of download and extraction threads
+            queue_size (int): Filings waiting for a worker before polling blocks
+            feed_count (int): Entries requested per feed
+            seen_store (SeenStore, optional): Keeps feed validators across restarts for
+                conditional requests
+            output_formats (tuple): Passed through to extract_financial_tables
+            callback (Callable, optional): Called with the manifest record of every processed filing
+        """
+        self.downloader = downloader
+        self.output_root = output_root
+        self.forms = tuple(forms)
+        self.tickers = {ticker.upper() for ticker in tickers} if tickers else None
+        self.store = store
+        self.workers = workers
+        self.feed_count = feed_count
+        self.seen_store = seen_store
+        self.output_formats = output_formats
+        self.callback = callback
+
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.known = local_accessions(downloader.root)
+        self._known_lock = threading.Lock()
+        self._retry = []
+        self._retry_lock = threading.Lock()
+        self._manifest_lock = threading.Lock()
+        self._store_lock = threading.Lock()
+        self._threads = []
+        self._pool = None
+
+    def feed_urls(self):
+        return [current_feed_url(form, self.downloader.www_url, self.feed_count) for form in self.forms]
+
+    def new_filings(self, url):
+        """
+        Fetch one feed and return the filings in it not yet mirrored or queued.
+
+        Args:
+            url (str): EDGAR Atom feed URL
+
+        Returns:
+            list: Dicts with form, company, cik, accession and ticker
+        """
+        parser = PRWireParser(url, timeout=self.downloader.timeout, session=self.downloader.session,
+                              seen_store=self.seen_store)
+        self.downloader.limiter.acquire()
+        if not parser.fetch_feed():
+            return []
+
+        filings = []
+        for entry in parser.feed_data.entries:
+            filing = parse_feed_entry(entry)
+            if filing is None or filing["form"] not in self.forms:
+                continue
+
+            # The same accession appears once per party to the filing
+            with self._known_lock:
+                if filing["accession"] in self.known:
+                    continue
+
+            ticker = self.downloader.ticker_for(filing["cik"])
+            if ticker is None or (self.tickers and ticker not in self.tickers):
+                continue
+
+            with self._known_lock:
+                self.known.add(filing["accession"])
+            filings.append(dict(filing, ticker=ticker))
+
+        # Every entry is now mirrored or queued, so the next poll can be conditional
+        parser.save_validators()
+        return filings
+
+    def poll(self):
+        """
+        Queue the filings waiting for a retry, then fetch every watched feed once and queue
+        the new filings, blocking while the queue is full.
+
+        Returns:
+            int: Number of filings queued
+        """
+        with self._retry_lock:
+            retries, self._retry = self._retry, []
+        for filing in retries:
+            self.queue.put(filing)
+        queued = len(retries)
+
+        for url in self.feed_urls():
+            try:
+                filings = self.new_filings(url)
+            except Exception as e:
+                print(f"Polling {url} failed: {type(e).__name__}: {e}")
+                continue
+            for filing in filings:
+                self.queue.put(filing)
+                queued += 1
+        return queued
+
+    def process(self, filing):
+        """
+        Download and extract one filing. Never raises, so a bad filing cannot stop a worker.
+
+        Args:
+            filing (dict): Filing queued by poll
+
+        Returns:
+            dict: Manifest record with status, timing and the statements found or the error
+        """
+        key = f"{filing['ticker']}/{filing['form']}/{filing['accession']}"
+        output_dir = os.path.join(self.output_root, filing["ticker"], filing["form"], filing["accession"])
+        record = dict(filing, key=key, output_dir=output_dir)
+        start_time = time.time()
+
+        try:
+            listed = self.downloader.filing_for(filing["cik"], filing["accession"], filing["ticker"])
+            if listed is None:
+                # Submissions can lag the feed by a few minutes
+                return self._defer(record, filing, "not yet in the submissions API", start_time)
+
+            download = self.downloader.download_filing(listed)
+            if download["status"] == "failed":
+                return self._defer(record, filing, download["error"], start_time)
+
+            # Parsing is CPU-bound, so it runs in a process while this thread waits
+            financials, metrics = self._pool.submit(collect, extract_filing, download["path"], output_dir,
+                                                    self.output_formats).result()
+            METRICS.merge(metrics)
+            record.update(status="ok", path=download["path"], statements=sorted(financials))
+            if self.store is not None and financials:
+                with self._store_lock:
+                    record["values"] = self.store.add_filing(filing["ticker"], filing["accession"], financials,
+                                                             listed.get("filing_date"))
+        except Exception as e:
+            record.update(status="failed", error=f"{type(e).__name__}: {e}", traceback=traceback.format_exc())
+
+        record["seconds"] = round(time.time() - start_time, 3)
+        return record
+
+    def _defer(self, record, filing, error, start_time):
+        """Keep a filing for the next poll, or give it up after MAX_ATTEMPTS"""
+        attempts = filing.get("attempts", 0) + 1
+        seconds = round(time.time() - start_time, 3)
+        if attempts < MAX_ATTEMPTS:
+            with self._retry_lock:
+                self._retry.append(dict(filing, attempts=attempts))
+            return dict(record, status="pending", error=error, attempts=attempts, seconds=seconds)
+
+        # A later feed entry for it is treated as new
+        with self._known_lock:
+            self.known.discard(filing["accession"])
+        return dict(record, status="failed", error=error, attempts=attempts, seconds=seconds)
+
+    def _record(self, record):
+        if record["status"] != "pending":
+            os.makedirs(self.output_root, exist_ok=True)
+            with self._manifest_lock, open(os.path.join(self.output_root, MANIFEST_NAME), 'a', encoding='utf-8') as manifest:
+                manifest.write(json.dumps(record) + "\n")
+
+        if record["status"] == "ok":
+            print(f"{record['key']} {record['seconds']:.2f}s: {', '.join(record['statements']) or 'no statements found'}")
+        else:
+            print(f"{record['key']} {record['status'].upper()}" + (f": {record['error']}" if "error" in record else ""))
+        if self.callback:
+            self.callback(record)
+
+    def _work(self):
+        while True:
+            filing = self.queue.get()
+            try:
+                if filing is None:
+                    return
+                self._record(self.process(filing))
+            finally:
+                self.queue.task_done()
+
+    def start(self):
+        """Start the worker threads and the extraction processes"""
+        self._pool = ProcessPoolExecutor(max_workers=self.workers)
+        for _ in range(self.workers):
+            thread = threading.Thread(target=self._work, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self):
+        """Let the workers finish the queued filings, then stop them"""
+        for _ in self._threads:
+            self.queue.put(None)
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+        # Retries only live in memory, so the next start must read the feeds in full to find them
+        with self._retry_lock:
+            if self._retry and self.seen_store is not None:
+                for url in self.feed_urls():
+                    self.seen_store.set_validators(url, None, None)
+
+    def run(self, interval=POLL_INTERVAL, stop_event=None):
+        """
+        Poll every interval seconds until stop_event is set, then drain the queue.
+
+        Args:
+            interval (float): Seconds between polls
+            stop_event (threading.Event, optional): Set to stop watching
+        """
+        stop_event = stop_event or threading.Event()
+        self.start()
+        try:
+            while not stop_event.is_set():
+                queued = self.poll()
+                if queued:
+                    print(f"Queued {queued} new filings")
+                stop_event.wait(interval)
+        finally:
+            self.stop()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Watch EDGAR for new filings and extract their statements")
+    parser.add_argument("--ticker", action="append", dest="tickers", help="Company to watch, may be repeated (default: all)")
+    parser.add_argument("--form", action="append", dest="forms", help="Form type, may be repeated (default: 10-K, 10-Q, 8-K)")
+    parser.add_argument("--download-dir", default="../filings", help="Directory holding sec-edgar-filings")
+    parser.add_argument("--output-dir", default="watched_tables", help="Root of per-accession statement tables")
+    parser.add_argument("--store-dir", help="Also append statements to this statement store")
+    parser.add_argument("--seen-db", help="SQLite file keeping feed validators across restarts, for conditional polls")
+    parser.add_argument("--company", required=True, help="Company name for the SEC User-Agent")
+    parser.add_argument("--email", required=True, help="Contact email for the SEC User-Agent")
+    parser.add_argument("--interval", type=float, default=POLL_INTERVAL, help="Seconds between polls (default: 60)")
+    parser.add_argument("--workers", type=int, default=2, help="Download and extraction threads (default: 2)")
+    parser.add_argument("--queue-size", type=int, default=32, help="Filings waiting before polling blocks (default: 32)")
+    parser.add_argument("--rate", type=float, default=MAX_REQUESTS_PER_SECOND, help="Requests per second (default: 10)")
+    parser.add_argument("--www-url", default=SEC_WWW_URL, help="Base URL for the feeds, tickers and the Archives")
+    parser.add_argument("--data-url", default=SEC_DATA_URL, help="Base URL for the submissions API")
+    parser.add_argument("--once", action="store_true", help="Poll once, process what was queued, and exit")
+    args = parser.parse_args(argv)
+
+    downloader = EdgarDownloader(args.company, args.email, download_dir=args.download_dir, max_workers=args.workers,
+                                 rate=args.rate, www_url=args.www_url, data_url=args.data_url)
+    store = None
+    if args.store_dir:
+        from statement_store import StatementStore
+        store = StatementStore(args.store_dir)
+
+    seen_store = SeenStore(args.seen_db) if args.seen_db else None
+
+    watcher = FilingWatcher(downloader, output_root=args.output_dir, forms=tuple(args.forms or WATCH_FORMS),
+                            tickers=args.tickers, store=store, workers=args.workers, queue_size=args.queue_size,
+                            seen_store=seen_store)
+    print(f"Watching {', '.join(watcher.forms)}; {len(watcher.known)} accessions already mirrored")
+    try:
+        if args.once:
+            watcher.start()
+            print(f"Queued {watcher.poll()} new filings")
+            watcher.stop()
+        else:
+            watcher.run(interval=args.interval)
+    except KeyboardInterrupt:
+        watcher.stop()
+    finally:
+        downloader.close()
+        if seen_store is not None:
+            seen_store.close()
+    return watcher
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,262 @@
+import functools
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from html.entities import html5
+from html.parser import HTMLParser
+from typing import Iterable, List, Optional
+
+try:
+    from instrumentation import METRICS, collect
+except ModuleNotFoundError:
+    # Run as a script from this directory; the copilot CLI puts the repository root on the path
+    sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+    from instrumentation import METRICS, collect
+
+# Elements removed together with everything inside them
+REMOVED_TAGS = {'script', 'style', 'iframe', 'blockquote'}
+
+# Elements that never have content, so they are never left open (as in BeautifulSoup)
+VOID_TAGS = {'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'keygen', 'link', 'menuitem',
+             'meta', 'param', 'source', 'track', 'wbr', 'basefont', 'bgsound', 'command', 'frame',
+             'image', 'isindex', 'nextid', 'spacer'}
+
+# Elements whose text BeautifulSoup's get_text leaves out
+HIDDEN_TEXT_TAGS = {'rt', 'rp', 'template'}
+
+# Elements whose whitespace-only text is kept as is
+PRESERVE_WHITESPACE_TAGS = {'pre', 'textarea'}
+
+ASCII_SPACES = '\x20\x0a\x09\x0c\x0d'
+
+# The digits of a numeric character reference followed by text that is not part of it
+HEX_CHARREF_PATTERN = re.compile(r'([0-9a-f]+)(.*)', re.DOTALL)
+DECIMAL_CHARREF_PATTERN = re.compile(r'([0-9]+)(.*)', re.DOTALL)
+
+# Below this many articles a process pool costs more than it saves
+MIN_PARALLEL_ARTICLES = 32
+
+def _numeric_reference(number: int) -> str:
+    """Character for a numeric reference, resolved as BeautifulSoup's UnicodeDammit does"""
+    if number == 0 or number > 0x10ffff or 0xd800 <= number <= 0xdfff:
+        return '\ufffd'
+    if 0x80 <= number <= 0x9f:
+        # References written with their Windows-1252 byte value
+        try:
+            return bytes([number]).decode('cp1252')
+        except UnicodeDecodeError:
+            pass
+    return chr(number)
+
+class _CleanerParser(HTMLParser):
+    """
+    Event-based parser producing the same text as clean_article_content without building a
+    tree. It follows BeautifulSoup's html.parser tree builder where that changes the text:
+    end tags close elements the way the tree does, runs of whitespace-only text become a
+    single space or newline, and entities are decoded the same way.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=False)
+        self.parts = []
+        self.captions = []
+        self._pending = []
+        self._stack = []
+        self._closed_void = []
+        self._removed_depth = 0
+        self._hidden_depth = 0
+        self._preserve_depth = 0
+        # Position on the stack of the outermost open <figure> and of its first <figcaption>,
+        # and what was found for its caption so far
+        self._figure_at = None
+        self._figcaption_at = None
+        self._caption_parts = None
+        self._alt = None
+
+    def _flush(self, cdata=False):
+        """Route the text read since the last tag to the output, the caption or nowhere"""
+        if not self._pending:
+            return
+        text = ''.join(self._pending)
+        self._pending = []
+
+        if not self._preserve_depth and not text.strip(ASCII_SPACES):
+            text = '\n' if '\n' in text else ' '
+        if self._removed_depth or (self._hidden_depth and not cdata):
+            return
+        if self._figure_at is None:
+            self.parts.append(text)
+        elif self._figcaption_at is not None:
+            self._caption_parts.append(text)
+
+    def _open(self, tag, attrs):
+        self._flush()
+        position = len(self._stack)
+        self._stack.append(tag)
+
+        if self._removed_depth or tag in REMOVED_TAGS:
+            self._removed_depth += 1
+            return
+        self._hidden_depth += tag in HIDDEN_TEXT_TAGS
+        self._preserve_depth += tag in PRESERVE_WHITESPACE_TAGS
+
+        if tag == 'figure' and self._figure_at is None:
+            self._figure_at = position
+            self._caption_parts, self._alt = None, None
+        elif tag == 'figcaption' and self._figure_at is not None and self._caption_parts is None:
+            self._figcaption_at = position
+            self._caption_parts = []
+        elif tag == 'img' and self._figure_at is not None and self._alt is None:
+            # Only the figure's first image is considered, as img.find('img') does
+            self._alt = dict(attrs).get('alt') or ''
+
+    def _close(self, tag):
+        self._flush()
+        # An end tag closes the most recent open element of that name and everything opened
+        # after it; an end tag with no open element is ignored
+        for position in range(len(self._stack) - 1, -1, -1):
+            if self._stack[position] == tag:
+                break
+        else:
+            return
+
+        while len(self._stack) > position:
+            self._pop()
+
+    def _pop(self):
+        position = len(self._stack) - 1
+        tag = self._stack.pop()
+        if self._removed_depth:
+            self._removed_depth -= 1
+            return
+        self._hidden_depth -= tag in HIDDEN_TEXT_TAGS
+        self._preserve_depth -= tag in PRESERVE_WHITESPACE_TAGS
+
+        if position == self._figcaption_at:
+            self._figcaption_at = None
+        elif position == self._figure_at:
+            self._figure_at = None
+            if self._caption_parts is not None:
+                self.captions.append(f"[Image: {''.join(self._caption_parts).strip()}]")
+            elif self._alt:
+                self.captions.append(f"[Image: {self._alt}]")
+
+    def handle_starttag(self, tag, attrs):
+        self._open(tag, attrs)
+        if tag in VOID_TAGS:
+            self._close(tag)
+            # A later explicit end tag for it is redundant
+            self._closed_void.append(tag)
+
+    def handle_startendtag(self, tag, attrs):
+        self._open(tag, attrs)
+        self._close(tag)
+
+    def handle_endtag(self, tag):
+        if tag in self._closed_void:
+            self._closed_void.remove(tag)
+        else:
+            self._close(tag)
+
+    def handle_data(self, data):
+        self._pending.append(data)
+
+    def handle_entityref(self, name):
+        # Unknown entities are kept as literal text, without their semicolon
+        self._pending.append(html5.get(name + ';', '&' + name))
+
+    def handle_charref(self, name):
+        digits, base, pattern = name, 10, DECIMAL_CHARREF_PATTERN
+        if name[:1] in ('x', 'X'):
+            digits, base, pattern = name[1:], 16, HEX_CHARREF_PATTERN
+
+        try:
+            self._pending.append(_numeric_reference(int(digits, base)))
+            return
+        except ValueError:
+            pass
+        # A reference not ended by a semicolon, or text that only looks like one
+        match = pattern.match(digits)
+        if match is None:
+            self._pending.append(digits)
+        else:
+            self._pending.append(_numeric_reference(int(match.group(1), base)) + match.group(2))
+
+    def handle_comment(self, data):
+        self._flush()
+
+    def handle_decl(self, decl):
+        self._flush()
+
+    def handle_pi(self, data):
+        self._flush()
+
+    def unknown_decl(self, data):
+        self._flush()
+        # CDATA sections are text, as in BeautifulSoup's get_text
+        if data.upper().startswith('CDATA['):
+            self._pending.append(data[6:])
+            self._flush(cdata=True)
+
+    def close(self):
+        super().close()
+        # Elements left open at the end of the document are closed there
+        self._flush()
+        while self._stack:
+            self._pop()
+
+@METRICS.timed()
+def clean_article_text(html_content: str) -> str:
+    """
+    Clean HTML content and return readable text while preserving structure. Produces the
+    same output as clean_article_content in one pass of an event-based parser.
+
+    Args:
+        html_content (str): Raw HTML content from RSS feed
+
+    Returns:
+        str: Cleaned, formatted text
+    """
+    parser = _CleanerParser()
+    parser.feed(html_content)
+    parser.close()
+
+    text = ''.join(parser.parts)
+
+    # Clean up whitespace
+    text = re.sub(r'\n\s*\n', '\n\n', text)  # Replace multiple newlines
+    text = re.sub(r' +', ' ', text)  # Replace multiple spaces
+
+    # Add image captions back in
+    if parser.captions:
+        text = text + "\n\n" + "\n".join(parser.captions)
+
+    return text.strip()
+
+def clean_articles(contents: Iterable[str], workers: Optional[int] = None, chunksize: int = 64) -> List[str]:
+    """
+    Clean many articles, spread across a process pool when there are enough of them.
+
+    Args:
+        contents (Iterable[str]): Raw HTML of each article
+        workers (Optional[int]): Number of worker processes, defaults to the CPU count.
+            1 cleans everything in this process
+        chunksize (int): Articles sent to a worker at a time
+
+    Returns:
+        List[str]: Cleaned text of each article, in input order
+    """
+    contents = list(contents)
+    workers = workers or os.cpu_count() or 1
+
+    if workers == 1 or len(contents) < MIN_PARALLEL_ARTICLES:
+        return [clean_article_text(content) for content in contents]
+
+    # Keep every worker busy even when the batch is small
+    chunksize = max(1, min(chunksize, len(contents) // workers))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        results = list(executor.map(functools.partial(collect, clean_article_text), contents, chunksize=chunksize))
+    for _, metrics in results:
+        METRICS.merge(metrics)
+    return [text for text, _ in results]
@@ -0,0 +1,233 @@
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+from urllib.parse import urlsplit
+
+import requests
+from bs4.dammit import UnicodeDammit
+from requests.adapters import HTTPAdapter
+from requests.exceptions import RequestException
+
+from full_rss_article import clean_article_content
+
+# Entry text shorter than this (in characters, without markup) is taken to be a summary
+MIN_ARTICLE_LENGTH = 1000
+
+# Endings wire feeds put on content cut short
+TRUNCATION_MARKERS = ('...', '…', '[…]', '[...]', 'read more', 'continue reading')
+
+def is_truncated(entry: Dict, min_length: int = MIN_ARTICLE_LENGTH) -> bool:
+    """
+    Decide whether a parsed entry only carries part of its article.
+
+    Args:
+        entry (Dict): Parsed entry with 'content' and/or 'summary'
+        min_length (int): Shortest text accepted as a full article
+
+    Returns:
+        bool: True if the full article should be fetched from the entry's link
+    """
+    content = entry.get('content') or entry.get('summary', '')
+    text = re.sub(r'<[^>]+>', ' ', content).strip()
+    return len(text) < min_length or text.lower().endswith(TRUNCATION_MARKERS)
+
+def decode_body(response: requests.Response) -> str:
+    """
+    Decode an article response. requests falls back to ISO-8859-1 for text/html sent without a
+    charset, which garbles UTF-8 pages, so without one the encoding is detected from the page
+    itself (byte order mark, <meta charset>, then the bytes).
+
+    Args:
+        response (requests.Response): Article response
+
+    Returns:
+        str: The page's HTML
+    """
+    if 'charset=' in response.headers.get('Content-Type', '').lower():
+        return response.text
+    return UnicodeDammit(response.content, is_html=True).unicode_markup
+
+class ArticleCache:
+    """
+    On-disk cache of fetched articles keyed by URL. Each entry keeps the response's ETag and
+    Last-Modified so a stale entry is revalidated with a conditional request rather than
+    downloaded again.
+    """
+
+    def __init__(self, cache_dir: str = "article_cache"):
+        """
+        Args:
+            cache_dir (str): Directory holding one JSON file per URL
+        """
+        self.cache_dir = cache_dir
+
+    def _path(self, url: str) -> str:
+        digest = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, digest[:2], f"{digest}.json")
+
+    def get(self, url: str) -> Optional[Dict]:
+        """Return the cached {"url", "etag", "last_modified", "fetched", "body"} for a URL, or None"""
+        try:
+            with open(self._path(url), 'r', encoding='utf-8') as file:
+                return json.load(file)
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def put(self, url: str, body: str, etag: Optional[str] = None, last_modified: Optional[str] = None):
+        """Store an article body with its validators"""
+        path = self._path(url)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        # Write then rename so concurrent readers never see a partial file
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as file:
+            json.dump({"url": url, "etag": etag, "last_modified": last_modified,
+                       "fetched": time.time(), "body": body}, file)
+        os.replace(tmp_path, path)
+
+    def touch(self, url: str):
+        """Mark a cached article as just revalidated"""
+        cached = self.get(url)
+        if cached:
+            self.put(url, cached["body"], cached["etag"], cached["last_modified"])
+
+class _HostLimit:
+    """Concurrency and request-rate limit for one host"""
+
+    def __init__(self, max_concurrent: int, min_interval: float):
+        self.semaphore = threading.Semaphore(max_concurrent)
+        self.min_interval = min_interval
+        self.next_start = 0.0
+        self.lock = threading.Lock()
+
+    def __enter__(self):
+        self.semaphore.acquire()
+        # Reserve the next start slot, then wait for it outside the lock
+        with self.lock:
+            now = time.monotonic()
+            start = max(now, self.next_start)
+            self.next_start = start + self.min_interval
+        time.sleep(start - now)
+        return self
+
+    def __exit__(self, *exc_info):
+        self.semaphore.release()
+
+class ArticleFetcher:
+    """
+    Fetches the full articles behind truncated feed entries over one pooled requests.Session,
+    with a limit on concurrent requests and on request rate per host, and an on-disk cache.
+    """
+
+    def __init__(self, session: Optional[requests.Session] = None, max_workers: int = 8, max_per_host: int = 2,
+                 min_interval: float = 1.0, timeout: float = 10, cache: Optional[ArticleCache] = None,
+                 max_age: Optional[float] = 3600):
+        """
+        Args:
+            session (Optional[requests.Session]): Session to reuse, otherwise one is created
+                with a connection pool sized to max_workers
+            max_workers (int): Number of articles fetched at the same time across all hosts
+            max_per_host (int): Number of requests in flight to any one host
+            min_interval (float): Seconds between the starts of two requests to one host
+            timeout (float): Timeout in seconds for each request
+            cache (Optional[ArticleCache]): Cache of fetched articles, none if not set
+            max_age (Optional[float]): Seconds a cached article is used without revalidating
+                it. None never revalidates; 0 always does
+        """
+        self.max_workers = max_workers
+        self.max_per_host = max_per_host
+        self.min_interval = min_interval
+        self.timeout = timeout
+        self.cache = cache
+        self.max_age = max_age
+
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+        self.session = session
+
+        self._hosts: Dict[str, _HostLimit] = {}
+        self._hosts_lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+
+    def _host_limit(self, url: str) -> _HostLimit:
+        host = urlsplit(url).netloc.lower()
+        with self._hosts_lock:
+            if host not in self._hosts:
+                self._hosts[host] = _HostLimit(self.max_per_host, self.min_interval)
+            return self._hosts[host]
+
+    def fetch(self, url: str) -> Optional[str]:
+        """
+        Fetch an article's HTML, from the cache when it is fresh.
+
+        Args:
+            url (str): Article URL
+
+        Returns:
+            Optional[str]: Raw HTML, or None if the request failed
+        """
+        cached = self.cache.get(url) if self.cache else None
+        if cached and (self.max_age is None or time.time() - cached["fetched"] < self.max_age):
+            return cached["body"]
+
+        headers = {}
+        if cached and cached["etag"]:
+            headers['If-None-Match'] = cached["etag"]
+        if cached and cached["last_modified"]:
+            headers['If-Modified-Since'] = cached["last_modified"]
+
+        try:
+            with self._host_limit(url):
+                response = self.session.get(url, timeout=self.timeout, headers=headers)
+            response.raise_for_status()
+        except RequestException as e:
+            print(f"Request error fetching article {url}: {str(e)}")
+            return None
+
+        if response.status_code == 304 and cached:
+            self.cache.touch(url)
+            return cached["body"]
+
+        body = decode_body(response)
+        if self.cache:
+            self.cache.put(url, body, response.headers.get('ETag'), response.headers.get('Last-Modified'))
+        return body
+
+    def fetch_text(self, url: str) -> Optional[str]:
+        """Fetch an article and return its text cleaned by clean_article_content, or None"""
+        body = self.fetch(url)
+        return clean_article_content(body) if body is not None else None
+
+    def fill_truncated(self, entries: List[Dict], min_length: int = MIN_ARTICLE_LENGTH) -> List[Dict]:
+        """
+        Fetch the full article of every truncated entry concurrently and store its cleaned
+        text in the entry's 'full_content'. Entries that are complete, or whose fetch
+        failed, are left without it.
+
+        Args:
+            entries (List[Dict]): Parsed entries with 'link' and 'content' or 'summary'
+            min_length (int): Shortest text accepted as a full article
+
+        Returns:
+            List[Dict]: The same entries
+        """
+        truncated = [entry for entry in entries if entry.get('link') and is_truncated(entry, min_length)]
+        texts = self._executor.map(lambda entry: self.fetch_text(entry['link']), truncated)
+
+        for entry, text in zip(truncated, texts):
+            if text is not None:
+                entry['full_content'] = text
+        return entries
+
+    def close(self):
+        """Shut down the worker threads and the session's connections"""
+        self._executor.shutdown(wait=True)
+        self.session.close()
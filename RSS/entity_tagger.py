@@ -0,0 +1,266 @@
+import csv
+import json
+import re
+import sys
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from article_cleaner import clean_article_text
+
+# Words of a company name or of text; '&', '.', '-' and "'" join parts like AT&T or Amazon.com
+TOKEN_PATTERN = re.compile(r"[A-Za-z0-9]+(?:[&.'\-][A-Za-z0-9]+)*")
+
+# Legal-form words dropped from the end of reference names, so "Apple Inc." is found as "Apple"
+CORPORATE_SUFFIXES = frozenset({
+    'inc', 'incorporated', 'corp', 'corporation', 'co', 'company', 'cos', 'ltd', 'limited', 'plc', 'llc',
+    'lp', 'l.p', 'llp', 'sa', 's.a', 'ag', 'nv', 'n.v', 'se', 'spa', 'bv', 'the', 'de', 'new', 'com',
+})
+
+# Texts where at least this share of the longer words are capitalized are headlines, in which
+# capitalization says nothing about whether a word is a name
+TITLE_CASE_SHARE = 0.8
+
+# Legal forms that, written after a word, mark it as a company name ("Block, Inc.")
+LEGAL_FORMS = CORPORATE_SUFFIXES - {'the', 'new', 'de', 'com'}
+
+# State-of-incorporation marks in EDGAR conformed names, e.g. "BANK OF AMERICA CORP /DE/"
+STATE_MARK_PATTERN = re.compile(r'/[A-Za-z]{2,}/?')
+
+# Exchange-qualified tickers as written in press releases, e.g. "(NYSE: ABC)" or "Nasdaq: XYZ",
+# and cashtags such as "$XYZ"; one alternation so each text is scanned once
+TICKER_PATTERN = re.compile(
+    r'\b(?:NYSE(?:\s+American|\s+Arca|\s+MKT)?|NASDAQ(?:GS|GM|CM)?|Nasdaq(?:GS|GM|CM)?|NYSEAMERICAN|AMEX|'
+    r'Cboe|CBOE|OTCQX|OTCQB|OTC|TSXV?|TSX-V)\s*:\s*([A-Z][A-Z0-9]{0,5}(?:[.\-][A-Z])?)\b'
+    r'|(?<![\w$])\$([A-Z]{1,5})\b'
+)
+
+def load_reference(path: str) -> List[Dict]:
+    """
+    Read a company reference file: SEC company_tickers.json, or a CSV with ticker, cik and
+    name (or title) columns.
+
+    Args:
+        path (str): Path to the reference file
+
+    Returns:
+        List[Dict]: Companies with ticker, cik (zero-padded to 10 digits) and name
+    """
+    if path.endswith('.csv'):
+        with open(path, 'r', encoding='utf-8', newline='') as file:
+            rows = list(csv.DictReader(file))
+    else:
+        with open(path, 'r', encoding='utf-8') as file:
+            data = json.load(file)
+        rows = list(data.values()) if isinstance(data, dict) else data
+
+    companies = []
+    for row in rows:
+        cik = row.get('cik_str') or row.get('cik') or ''
+        companies.append({'ticker': str(row['ticker']).upper(),
+                          'cik': f"{int(cik):010d}" if str(cik).strip() else '',
+                          'name': row.get('title') or row.get('name') or ''})
+    return companies
+
+def normalize_token(word: str) -> str:
+    """
+    Form of a word that names and text are matched on: lowercased, without a possessive or a
+    .com domain, so "Apple's" matches "Apple Inc." and "Amazon.com" matches "AMAZON COM INC".
+
+    Args:
+        word (str): Token from TOKEN_PATTERN
+
+    Returns:
+        str: Normalized token
+    """
+    word = word.lower()
+    if word.endswith("'s"):
+        word = word[:-2]
+    if word.endswith('.com') and len(word) > len('.com'):
+        word = word[:-len('.com')]
+    return word
+
+def name_alias(name: str) -> Tuple[str, ...]:
+    """
+    Lowercased tokens a company name is matched by, without its legal form.
+
+    Args:
+        name (str): Reference name, e.g. "NVIDIA CORP" or "Apple Inc."
+
+    Returns:
+        Tuple[str, ...]: Tokens, e.g. ("nvidia",); empty if nothing is left to match
+    """
+    tokens = [normalize_token(token) for token in TOKEN_PATTERN.findall(STATE_MARK_PATTERN.sub(' ', name))]
+    while len(tokens) > 1 and tokens[-1] in CORPORATE_SUFFIXES:
+        tokens.pop()
+    if tokens and tokens[0] == 'the' and len(tokens) > 1:
+        tokens.pop(0)
+    return tuple(tokens)
+
+def is_title_case(words: List[str]) -> bool:
+    """Whether a text's words are capitalized like a headline, as feed entry titles are"""
+    long_words = [word for word in words if len(word) > 3 and word[0].isalpha()]
+    if len(long_words) < 2:
+        return False
+    return sum(word[0].isupper() for word in long_words) >= TITLE_CASE_SHARE * len(long_words)
+
+class EntityTagger:
+    """
+    Tags text with the companies it mentions, using an Aho-Corasick automaton over word
+    tokens built once from every reference name, plus one regex for exchange-qualified
+    tickers and cashtags. Tagging an entry is a single pass over its tokens, however many
+    companies the reference holds.
+    """
+
+    def __init__(self, companies: Iterable[Dict]):
+        """
+        Args:
+            companies (Iterable[Dict]): Companies with ticker, cik and name, e.g. from load_reference
+        """
+        self.companies = list(companies)
+        self.by_ticker = {company['ticker']: company for company in self.companies}
+
+        # Automaton nodes: child transitions, failure link, and (alias length, companies) outputs
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[Tuple[int, Tuple[int, ...]]]] = [[]]
+
+        aliases: Dict[Tuple[str, ...], List[int]] = {}
+        for index, company in enumerate(self.companies):
+            alias = name_alias(company['name'])
+            # One- and two-letter single words ("AB", "X") match too much ordinary text
+            if alias and (len(alias) > 1 or len(alias[0]) > 2):
+                aliases.setdefault(alias, []).append(index)
+
+        for alias, indexes in aliases.items():
+            node = 0
+            for token in alias:
+                if token not in self._goto[node]:
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append([])
+                    self._goto[node][token] = len(self._goto) - 1
+                node = self._goto[node][token]
+            self._output[node].append((len(alias), tuple(indexes)))
+
+        self._build_failure_links()
+
+    def _build_failure_links(self):
+        # Breadth-first, so a node's failure link is set before its children's
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for token, child in self._goto[node].items():
+                queue.append(child)
+                fail = self._fail[node]
+                while fail and token not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[child] = self._goto[fail].get(token, 0) if node else 0
+                # A node also ends every alias its failure node ends
+                self._output[child] = self._output[child] + self._output[self._fail[child]]
+
+    @classmethod
+    def from_file(cls, path: str) -> 'EntityTagger':
+        """Build a tagger from a reference file read by load_reference"""
+        return cls(load_reference(path))
+
+    def _name_matches(self, text: str) -> List[Tuple[int, int, Tuple[int, ...]]]:
+        """Return (start token, end token, companies) of the longest non-overlapping name matches"""
+        words = TOKEN_PATTERN.findall(text)
+        tokens = [normalize_token(word) for word in words]
+        headline = is_title_case(words)
+        goto, fail, output = self._goto, self._fail, self._output
+
+        found = []
+        node = 0
+        for position, token in enumerate(tokens):
+            while node and token not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(token, 0)
+            for length, indexes in output[node]:
+                start = position - length + 1
+                if length == 1 and not self._single_word_name(words, tokens, position, headline):
+                    continue
+                found.append((start, position + 1, indexes))
+
+        # Prefer the longest match, e.g. "Apple Hospitality" over "Apple"
+        found.sort(key=lambda match: (match[0], match[0] - match[1]))
+        selected, covered_to = [], 0
+        for start, end, indexes in found:
+            if start >= covered_to:
+                selected.append((start, end, indexes))
+                covered_to = end
+        return selected
+
+    @staticmethod
+    def _single_word_name(words: List[str], tokens: List[str], position: int, headline: bool) -> bool:
+        """
+        Whether a one-word alias match is the company rather than an ordinary word ("target",
+        "Progressive", "Block"): a legal form after it ("Block, Inc.") always settles it. In
+        running text the word must be capitalized; in a headline, where every word is, it
+        must open the headline, where press release titles put the issuer.
+        """
+        if position + 1 < len(tokens) and tokens[position + 1] in LEGAL_FORMS:
+            return True
+        if headline:
+            return position == 0
+        return words[position][0].isupper()
+
+    def tag(self, *texts: str) -> List[Dict]:
+        """
+        Find the companies mentioned in texts, e.g. an entry's title and cleaned content.
+
+        Args:
+            texts (str): Plain texts to scan
+
+        Returns:
+            List[Dict]: Companies with ticker, cik, name and matched_by: first those given
+                by an exchange ticker or cashtag ('exchange'), then those found by name ('name'),
+                each in order of mention
+        """
+        texts = [text for text in texts if text]
+        tags: Dict[str, Dict] = {}
+
+        for match in TICKER_PATTERN.finditer('\n'.join(texts)):
+            ticker = (match.group(1) or match.group(2)).replace('.', '-')
+            if ticker not in tags:
+                company = self.by_ticker.get(ticker, {'ticker': ticker, 'cik': '', 'name': ''})
+                tags[ticker] = dict(company, matched_by='exchange')
+
+        # Each text is scanned on its own, since a headline is capitalized differently from
+        # the body and a name must not run from one text into the next
+        for text in texts:
+            for _, _, indexes in self._name_matches(text):
+                for index in indexes:
+                    company = self.companies[index]
+                    if company['ticker'] not in tags:
+                        tags[company['ticker']] = dict(company, matched_by='name')
+
+        return list(tags.values())
+
+    def tag_entry(self, entry: Dict) -> Dict:
+        """
+        Attach 'tickers' and 'ciks' (comma-separated) to a parsed entry, scanning its title and
+        its cleaned content, or its summary when there is no content.
+
+        Args:
+            entry (Dict): Entry from PRWireParser.iter_entries
+
+        Returns:
+            Dict: The same entry
+        """
+        text = entry.get('clean_content') or clean_article_text(entry.get('content') or entry.get('summary') or '')
+        tags = self.tag(entry.get('title', ''), text)
+        entry['tickers'] = ','.join(tag['ticker'] for tag in tags)
+        entry['ciks'] = ','.join(dict.fromkeys(tag['cik'] for tag in tags if tag['cik']))
+        return entry
+
+def main(reference_path: str, feed_url: str, num_articles: Optional[int] = None):
+    from full_rss_article import PRWireParser
+
+    tagger = EntityTagger.from_file(reference_path)
+    parser = PRWireParser(feed_url, tagger=tagger)
+    for entry in parser.iter_entries(limit=num_articles, fields=('title', 'tickers', 'ciks')):
+        print(f"{entry['tickers'] or '-':<24}{entry['title'][:100]}")
+
+if __name__ == "__main__":
+    main(sys.argv[1], sys.argv[2], int(sys.argv[3]) if len(sys.argv) > 3 else None)
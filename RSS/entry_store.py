@@ -0,0 +1,219 @@
+import bisect
+import datetime
+import sys
+import threading
+import time
+from dataclasses import asdict, dataclass
+from email.utils import parsedate_to_datetime
+from typing import Dict, Iterator, List, Optional
+
+from article_cleaner import clean_article_text
+
+# A day of wire traffic across the polled feeds
+DEFAULT_CAPACITY = 50000
+DEFAULT_MAX_AGE = 24 * 3600
+
+def parse_published(published: str, default: Optional[float] = None) -> float:
+    """
+    Convert an entry's published date (RFC 822 as in RSS, or ISO 8601 as in Atom) to epoch
+    seconds.
+
+    Args:
+        published (str): Date string from the feed
+        default (Optional[float]): Returned when the date is missing or unreadable, defaults
+            to the current time
+
+    Returns:
+        float: Seconds since the epoch
+    """
+    if published:
+        try:
+            parsed = parsedate_to_datetime(published)
+        except (TypeError, ValueError):
+            try:
+                parsed = datetime.datetime.fromisoformat(published.replace('Z', '+00:00'))
+            except ValueError:
+                parsed = None
+        if parsed is not None:
+            if parsed.tzinfo is None:
+                parsed = parsed.replace(tzinfo=datetime.timezone.utc)
+            return parsed.timestamp()
+    return time.time() if default is None else default
+
+@dataclass(slots=True)
+class FeedEntry:
+    """
+    Compact record of one parsed entry. Slots replace the per-entry dict, values repeated
+    across entries (company, author, categories, tickers, feed) are interned, and only the
+    cleaned text of an article is kept, not its raw HTML.
+    """
+    link: str
+    title: str = ''
+    published: str = ''
+    published_ts: float = 0.0
+    summary: str = ''
+    text: str = ''
+    company: str = ''
+    author: str = ''
+    categories: str = ''
+    tickers: str = ''
+    ciks: str = ''
+    feed: str = ''
+
+    @classmethod
+    def from_dict(cls, entry: Dict, feed: str = '') -> 'FeedEntry':
+        """
+        Build a record from an entry returned by either PRWireParser.iter_entries.
+
+        Args:
+            entry (Dict): Parsed entry; raw 'content' is cleaned unless 'clean_content' is present
+            feed (str): URL of the feed the entry came from
+
+        Returns:
+            FeedEntry: The record
+        """
+        text = entry.get('clean_content')
+        if text is None:
+            text = clean_article_text(entry['content']) if entry.get('content') else ''
+        return cls(
+            link=entry.get('link', ''),
+            title=entry.get('title', ''),
+            published=entry.get('published', ''),
+            published_ts=parse_published(entry.get('published', '')),
+            summary=entry.get('summary', ''),
+            text=text,
+            company=sys.intern(entry.get('company', '')),
+            author=sys.intern(entry.get('author', '')),
+            categories=sys.intern(entry.get('categories', '')),
+            tickers=sys.intern(entry.get('tickers', '')),
+            ciks=sys.intern(entry.get('ciks', '')),
+            feed=sys.intern(feed),
+        )
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+class RecentEntryStore:
+    """
+    Fixed-capacity ring buffer of the most recent feed entries, indexed by link and by
+    published time. Adding to a full store overwrites the oldest added entry, so memory stays
+    bounded however long a poller runs; entries older than max_age are dropped by prune.
+    Safe to share between threads.
+    """
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY, max_age: Optional[float] = DEFAULT_MAX_AGE):
+        """
+        Args:
+            capacity (int): Maximum number of entries held
+            max_age (Optional[float]): Age in seconds, by published time, after which prune
+                drops an entry; None keeps entries until they are overwritten
+        """
+        self.capacity = capacity
+        self.max_age = max_age
+        self._slots: List[Optional[FeedEntry]] = [None] * capacity
+        self._next = 0
+        self._lock = threading.Lock()
+
+        # link -> slot, and (published_ts, slot) pairs kept sorted
+        self._by_link: Dict[str, int] = {}
+        self._by_time: List[tuple] = []
+
+    def __len__(self) -> int:
+        return len(self._by_link)
+
+    def __contains__(self, link: str) -> bool:
+        return link in self._by_link
+
+    def _remove(self, slot: int):
+        entry = self._slots[slot]
+        self._slots[slot] = None
+        del self._by_link[entry.link]
+        position = bisect.bisect_left(self._by_time, (entry.published_ts, slot))
+        del self._by_time[position]
+
+    def add(self, entry, feed: str = '') -> FeedEntry:
+        """
+        Store an entry, replacing any entry with the same link.
+
+        Args:
+            entry (FeedEntry | Dict): Record, or entry dict from PRWireParser.iter_entries
+            feed (str): URL of the feed, when entry is a dict
+
+        Returns:
+            FeedEntry: The stored record
+        """
+        if not isinstance(entry, FeedEntry):
+            entry = FeedEntry.from_dict(entry, feed)
+
+        with self._lock:
+            slot = self._by_link.get(entry.link)
+            if slot is not None:
+                self._remove(slot)
+            else:
+                slot = self._next
+                if self._slots[slot] is not None:
+                    self._remove(slot)
+                self._next = (self._next + 1) % self.capacity
+
+            self._slots[slot] = entry
+            self._by_link[entry.link] = slot
+            bisect.insort(self._by_time, (entry.published_ts, slot))
+        return entry
+
+    def extend(self, entries, feed: str = '') -> int:
+        """Store every entry of an iterable, returning how many were stored"""
+        count = 0
+        for entry in entries:
+            self.add(entry, feed)
+            count += 1
+        return count
+
+    def get(self, link: str) -> Optional[FeedEntry]:
+        """Return the entry with a link, or None"""
+        with self._lock:
+            slot = self._by_link.get(link)
+            return self._slots[slot] if slot is not None else None
+
+    def between(self, start: float, end: Optional[float] = None) -> List[FeedEntry]:
+        """
+        Args:
+            start (float): Earliest published time, in epoch seconds
+            end (Optional[float]): Published time before which entries must fall, defaults to no limit
+
+        Returns:
+            List[FeedEntry]: Entries published in [start, end), oldest first
+        """
+        with self._lock:
+            low = bisect.bisect_left(self._by_time, (start, -1))
+            high = len(self._by_time) if end is None else bisect.bisect_left(self._by_time, (end, -1))
+            return [self._slots[slot] for _, slot in self._by_time[low:high]]
+
+    def latest(self, count: int = 10) -> List[FeedEntry]:
+        """Return the count most recently published entries, newest first"""
+        with self._lock:
+            return [self._slots[slot] for _, slot in reversed(self._by_time[-count:])] if count > 0 else []
+
+    def prune(self, now: Optional[float] = None) -> int:
+        """
+        Drop entries published more than max_age seconds before now.
+
+        Returns:
+            int: Number of entries dropped
+        """
+        if self.max_age is None:
+            return 0
+        cutoff = (time.time() if now is None else now) - self.max_age
+        with self._lock:
+            position = bisect.bisect_left(self._by_time, (cutoff, -1))
+            for _, slot in self._by_time[:position]:
+                entry = self._slots[slot]
+                self._slots[slot] = None
+                del self._by_link[entry.link]
+            del self._by_time[:position]
+            return position
+
+    def __iter__(self) -> Iterator[FeedEntry]:
+        """Iterate over the entries, oldest published first"""
+        with self._lock:
+            entries = [self._slots[slot] for _, slot in self._by_time]
+        return iter(entries)
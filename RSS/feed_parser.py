@@ -0,0 +1,224 @@
+import os
+import sys
+from typing import Dict, Iterable, Iterator, List, Optional
+
+import feedparser
+import requests
+from requests.exceptions import RequestException
+
+from entity_tagger import EntityTagger
+try:
+    from instrumentation import METRICS
+except ModuleNotFoundError:
+    # Run as a script from this directory; the copilot CLI puts the repository root on the path
+    sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+    from instrumentation import METRICS
+from seen_store import SeenStore, entry_content_hash, entry_key
+
+class FeedParser:
+    """
+    Fetching, conditional requests, seen-entry dedupe, tagging and the entry iterator shared
+    by the feed parsers. Subclasses set ENTRY_FIELDS, extend _FIELD_EXTRACTORS with their own
+    fields and choose the text the tagger scans in _tag_text.
+    """
+
+    # Fields of a parsed entry, in output order
+    ENTRY_FIELDS = ('title', 'link', 'published')
+
+    def __init__(self, feed_url: str, timeout: int = 10, session: Optional[requests.Session] = None,
+                 seen_store: Optional[SeenStore] = None, tagger: Optional[EntityTagger] = None):
+        """
+        Initialize the parser with a feed URL.
+
+        Args:
+            feed_url (str): The URL of the RSS feed to parse
+            timeout (int): Timeout in seconds for feed requests, applied per request
+            session (Optional[requests.Session]): Session to fetch with, so connections can
+                be shared across parsers
+            seen_store (Optional[SeenStore]): Persistent store of feed validators and emitted
+                entries. When set, requests are conditional and get_entries skips entries
+                already emitted with the same content
+            tagger (Optional[EntityTagger]): Company tagger, needed for the 'tickers' and
+                'ciks' entry fields
+        """
+        self.feed_url = feed_url
+        self.timeout = timeout
+        self.session = session
+        self.seen_store = seen_store
+        self.tagger = tagger
+        self.feed_data = None
+        self._tagged = None
+        self.last_error = None
+        self.not_modified = False
+
+        # Validators of the last response whose entries were all handled, sent back as a
+        # conditional request, and those of the response being handled
+        self.etag, self.last_modified = seen_store.get_validators(feed_url) if seen_store else (None, None)
+        self._fetched_validators = (None, None)
+
+    @METRICS.timed()
+    def fetch_feed(self) -> bool:
+        """
+        Fetch and parse the RSS feed with timeout handling. The request is conditional on the
+        ETag / Last-Modified of the last response whose entries were all handled (see
+        save_validators); a 304 sets not_modified and skips parsing.
+
+        Returns:
+            bool: True if successful, False otherwise (including when the feed is unchanged)
+        """
+        self.last_error = None
+        self.not_modified = False
+
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+
+        try:
+            # First get the raw feed content with timeout
+            response = (self.session or requests).get(self.feed_url, timeout=self.timeout, headers=headers)
+            response.raise_for_status()
+            METRICS.incr("bytes_fetched", len(response.content))
+
+            # Nothing changed since the last poll
+            if response.status_code == 304:
+                self.not_modified = True
+                print(f"Feed not modified: {self.feed_url}")
+                return False
+
+            # Only adopted once the entries are handled, so a crash or a limit cannot make
+            # the next poll skip entries that were never delivered
+            self._fetched_validators = (response.headers.get('ETag'), response.headers.get('Last-Modified'))
+
+            # Parse the feed content
+            self.feed_data = feedparser.parse(response.content)
+
+            # Check if parsing was successful
+            if not hasattr(self.feed_data, 'entries'):
+                print(f"No entries found in feed: {self.feed_url}")
+                return False
+
+            return len(self.feed_data.entries) > 0
+
+        except RequestException as e:
+            METRICS.incr("fetch_errors")
+            self.last_error = e
+            print(f"Request error fetching feed {self.feed_url}: {str(e)}")
+            return False
+        except Exception as e:
+            METRICS.incr("parse_errors")
+            self.last_error = e
+            print(f"Error parsing feed {self.feed_url}: {str(e)}")
+            return False
+
+    def save_validators(self, complete: bool = True):
+        """
+        Make the next request conditional on the fetched response, once its entries are handled.
+
+        Args:
+            complete (bool): Whether every entry was handled. When some were left unread (a
+                limit was hit), the next request is unconditional so they are fetched again
+        """
+        self.etag, self.last_modified = self._fetched_validators if complete else (None, None)
+        if self.seen_store:
+            self.seen_store.set_validators(self.feed_url, self.etag, self.last_modified)
+
+    def iter_entries(self, limit: Optional[int] = None, fields: Optional[Iterable[str]] = None) -> Iterator[Dict]:
+        """
+        Yield parsed entries one at a time, building only the requested fields, and only for
+        entries that are yielded. With a seen store, an entry is marked seen once the consumer
+        asks for the next one, and the response's validators are saved once every entry has
+        been read.
+
+        Args:
+            limit (Optional[int]): Maximum number of entries to yield
+            fields (Optional[Iterable[str]]): Fields to include in each entry, from the parser's
+                _FIELD_EXTRACTORS, e.g. 'tickers' / 'ciks' (comma-separated companies found by
+                the tagger). ENTRY_FIELDS when omitted
+
+        Yields:
+            Dict: Parsed entry
+        """
+        fields = self.ENTRY_FIELDS if fields is None else fields
+        unknown = set(fields) - set(self._FIELD_EXTRACTORS)
+        if unknown:
+            raise ValueError(f"Unknown entry fields: {', '.join(sorted(unknown))}")
+        if not self.tagger and {'tickers', 'ciks'} & set(fields):
+            raise ValueError("The 'tickers' and 'ciks' fields need a tagger")
+        extractors = [(field, self._FIELD_EXTRACTORS[field]) for field in fields]
+
+        if not self.feed_data:
+            if not self.fetch_feed():
+                return
+
+        count = 0
+        try:
+            for entry in self.feed_data.entries:
+                # Stop parsing once we've reached the limit, leaving the rest for the next poll
+                if limit and count >= limit:
+                    self.save_validators(complete=False)
+                    return
+
+                # Skip entries that don't have required fields
+                if not entry.get('title') or not entry.get('link'):
+                    continue
+
+                # Skip entries already emitted with the same content, before paying for cleaning
+                if self.seen_store:
+                    key, content_hash = entry_key(entry), entry_content_hash(entry)
+                    if not self.seen_store.is_new(key, content_hash):
+                        continue
+
+                yield {field: extract(self, entry) for field, extract in extractors}
+                if self.seen_store:
+                    self.seen_store.mark(key, content_hash)
+                METRICS.incr("entries_emitted")
+                count += 1
+
+            self.save_validators()
+
+        except Exception as e:
+            METRICS.incr("parse_errors")
+            print(f"Error processing entries: {str(e)}")
+
+    def get_entries(self, limit: Optional[int] = None, fields: Optional[Iterable[str]] = None) -> List[Dict]:
+        """
+        Get parsed entries from the feed with performance optimization.
+
+        Args:
+            limit (Optional[int]): Maximum number of entries to return
+            fields (Optional[Iterable[str]]): Fields to include in each entry, see iter_entries
+
+        Returns:
+            List[Dict]: List of parsed entries
+        """
+        return list(self.iter_entries(limit, fields))
+
+    def _tag_text(self, entry: Dict) -> str:
+        """Plain text the tagger scans besides the title"""
+        raise NotImplementedError
+
+    def _tag(self, entry: Dict) -> List[Dict]:
+        """
+        Companies mentioned in an entry's title and _tag_text, computed once per entry
+        however many fields use them.
+
+        Args:
+            entry (Dict): Feed entry
+
+        Returns:
+            List[Dict]: Tags from EntityTagger.tag
+        """
+        if self._tagged is None or self._tagged[0] is not entry:
+            self._tagged = (entry, self.tagger.tag(entry.get('title', ''), self._tag_text(entry)))
+        return self._tagged[1]
+
+    # How each entry field is built from a feedparser entry; subclasses add their own
+    _FIELD_EXTRACTORS = {
+        'title': lambda self, entry: entry.get('title', ''),
+        'link': lambda self, entry: entry.get('link', ''),
+        'published': lambda self, entry: entry.get('published', ''),
+        'tickers': lambda self, entry: ','.join(tag['ticker'] for tag in self._tag(entry)),
+        'ciks': lambda self, entry: ','.join(dict.fromkeys(tag['cik'] for tag in self._tag(entry) if tag['cik'])),
+    }
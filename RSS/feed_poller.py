@@ -0,0 +1,169 @@
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from entry_store import RecentEntryStore
+from rss_feed_truncated import PRWireParser
+from seen_store import SeenStore
+
+@dataclass
+class FeedConfig:
+    """Polling settings for one feed"""
+    url: str
+    timeout: float = 10
+    interval: float = 60
+    limit: Optional[int] = None
+
+class _FeedState:
+    """Scheduling state of one feed: when it is next due and how often it has failed in a row"""
+
+    def __init__(self, config: FeedConfig):
+        self.config = config
+        self.next_due = 0.0
+        self.failures = 0
+        self.last_error: Optional[Exception] = None
+
+class FeedPoller:
+    """
+    Polls many feeds in parallel over one pooled requests.Session. Each feed has its own
+    timeout and interval, and a feed that fails is retried with exponential backoff instead
+    of on every cycle.
+    """
+
+    def __init__(self, feeds: List[FeedConfig], max_workers: int = 8, session: Optional[requests.Session] = None,
+                 max_backoff: float = 900, parser_factory: Callable[..., PRWireParser] = PRWireParser,
+                 seen_store: Optional[SeenStore] = None, entry_store: Optional[RecentEntryStore] = None):
+        """
+        Args:
+            feeds (List[FeedConfig]): Feeds to poll
+            max_workers (int): Number of feeds fetched at the same time
+            session (Optional[requests.Session]): Session to reuse, otherwise one is created
+                with a connection pool sized to max_workers
+            max_backoff (float): Longest delay in seconds between retries of a failing feed
+            parser_factory (Callable): Builds the parser for a feed from (url, timeout, session,
+                seen_store)
+            seen_store (Optional[SeenStore]): Shared store for conditional requests and
+                dedupe of entries already emitted
+            entry_store (Optional[RecentEntryStore]): Bounded store every fetched entry is
+                added to, pruned of entries past its max_age after each poll
+        """
+        self.states = {feed.url: _FeedState(feed) for feed in feeds}
+        self.max_workers = max_workers
+        self.max_backoff = max_backoff
+        self.parser_factory = parser_factory
+        self.seen_store = seen_store
+        self.entry_store = entry_store
+
+        if session is None:
+            session = requests.Session()
+            # Keep-alive connections are reused across polls; one pool slot per worker
+            adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+        self.session = session
+
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+
+    def _poll_feed(self, state: _FeedState) -> List[Dict]:
+        config = state.config
+        parser = self.parser_factory(config.url, timeout=config.timeout, session=self.session,
+                                     seen_store=self.seen_store)
+
+        if not parser.fetch_feed() and parser.last_error is not None:
+            raise parser.last_error
+        return parser.get_entries(limit=config.limit) if parser.feed_data else []
+
+    def _schedule(self, state: _FeedState, now: float, error: Optional[Exception]):
+        state.last_error = error
+        if error is None:
+            state.failures = 0
+            state.next_due = now + state.config.interval
+        else:
+            state.failures += 1
+            backoff = min(state.config.interval * 2 ** state.failures, self.max_backoff)
+            # Jitter keeps feeds that failed together from retrying in lockstep
+            state.next_due = now + backoff * random.uniform(0.8, 1.0)
+
+    def due_feeds(self, now: Optional[float] = None) -> List[str]:
+        """Return the URLs of feeds whose next poll is due"""
+        now = time.monotonic() if now is None else now
+        return [url for url, state in self.states.items() if state.next_due <= now]
+
+    def poll_once(self, urls: Optional[List[str]] = None) -> Dict[str, List[Dict]]:
+        """
+        Fetch the given feeds (by default every due feed) concurrently.
+
+        Args:
+            urls (Optional[List[str]]): Feeds to fetch regardless of schedule
+
+        Returns:
+            Dict[str, List[Dict]]: Entries of each feed fetched successfully, keyed by URL
+        """
+        urls = self.due_feeds() if urls is None else urls
+        futures = {url: self._executor.submit(self._poll_feed, self.states[url]) for url in urls}
+
+        results = {}
+        for url, future in futures.items():
+            try:
+                results[url] = future.result()
+                error = None
+            except Exception as e:
+                error = e
+                print(f"Polling {url} failed ({self.states[url].failures + 1} in a row): {str(e)}")
+            self._schedule(self.states[url], time.monotonic(), error)
+
+        if self.entry_store is not None:
+            for url, entries in results.items():
+                self.entry_store.extend(entries, feed=url)
+            self.entry_store.prune()
+
+        return results
+
+    def run(self, callback: Callable[[str, List[Dict]], None], stop_event: Optional[threading.Event] = None):
+        """
+        Poll feeds as they come due until stop_event is set.
+
+        Args:
+            callback (Callable): Called with (url, entries) for every successful fetch
+            stop_event (Optional[threading.Event]): Set to stop the loop
+        """
+        stop_event = stop_event or threading.Event()
+
+        while not stop_event.is_set():
+            for url, entries in self.poll_once().items():
+                callback(url, entries)
+
+            # Sleep until the next feed is due, waking early if asked to stop
+            next_due = min(state.next_due for state in self.states.values())
+            stop_event.wait(max(0.0, next_due - time.monotonic()))
+
+    def close(self):
+        """Shut down the worker threads and the session's connections"""
+        self._executor.shutdown(wait=True)
+        self.session.close()
+
+def main(feed_urls: List[str], num_articles: int = 3, timeout: int = 10, interval: int = 60):
+    feeds = [FeedConfig(url, timeout=timeout, interval=interval, limit=num_articles) for url in feed_urls]
+    poller = FeedPoller(feeds)
+
+    start_time = time.time()
+    results = poller.poll_once()
+    print(f"Polled {len(feeds)} feeds in {time.time() - start_time:.2f} seconds")
+
+    for url, entries in results.items():
+        print(f"{len(entries)} entries from {url}")
+
+    poller.close()
+    return results
+
+if __name__ == "__main__":
+    main([
+        'https://www.prnewswire.com/rss/news-releases-list.rss',
+        'https://feed.businesswire.com/rss/home/?rss=G1QFDERJXkJeEVlZXw==',
+    ])
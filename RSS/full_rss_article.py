@@ -1,108 +1,32 @@
-import feedparser
 import datetime
 import csv
-from typing import List, Dict, Optional  # Added Optional here
-import requests
-from requests.exceptions import RequestException
-import socket
+from typing import Dict
 import time
 from bs4 import BeautifulSoup
 import re
+import os
+import sys
 
-class PRWireParser:
-    def __init__(self, feed_url: str, timeout: int = 10):
-        """
-        Initialize the PR Wire parser with a feed URL.
-        
-        Args:
-            feed_url (str): The URL of the RSS feed to parse
-            timeout (int): Timeout in seconds for feed requests
-        """
-        self.feed_url = feed_url
-        self.timeout = timeout
-        self.feed_data = None
-        
-        # Set socket timeout globally
-        socket.setdefaulttimeout(timeout)
+from article_cleaner import clean_article_text
+from feed_parser import FeedParser
+try:
+    from instrumentation import METRICS
+except ModuleNotFoundError:
+    # Run as a script from this directory; the copilot CLI puts the repository root on the path
+    sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+    from instrumentation import METRICS
 
-    def fetch_feed(self) -> bool:
-        """
-        Fetch and parse the RSS feed with timeout handling.
-        
-        Returns:
-            bool: True if successful, False otherwise
-        """
-        start_time = time.time()
-        
-        try:
-            # First get the raw feed content with timeout
-            response = requests.get(self.feed_url, timeout=self.timeout)
-            response.raise_for_status()
-            
-            # Parse the feed content
-            self.feed_data = feedparser.parse(response.content)
-            
-            # Check if parsing was successful
-            if not hasattr(self.feed_data, 'entries'):
-                print(f"No entries found in feed: {self.feed_url}")
-                return False
-                
-            print(f"Feed fetched in {time.time() - start_time:.2f} seconds")
-            return len(self.feed_data.entries) > 0
-            
-        except RequestException as e:
-            print(f"Request error fetching feed {self.feed_url}: {str(e)}")
-            return False
-        except Exception as e:
-            print(f"Error parsing feed {self.feed_url}: {str(e)}")
-            return False
+# Fields of a parsed entry, in output order. 'content' is the raw HTML
+ENTRY_FIELDS = ('title', 'link', 'published', 'summary', 'content', 'author', 'categories')
 
-    def get_entries(self, limit: Optional[int] = None) -> List[Dict]:
-        """
-        Get parsed entries from the feed with performance optimization.
-        
-        Args:
-            limit (Optional[int]): Maximum number of entries to return
-            
-        Returns:
-            List[Dict]: List of parsed entries
-        """
-        if not self.feed_data:
-            if not self.fetch_feed():
-                return []
+class PRWireParser(FeedParser):
+    """Parser for feeds whose entries carry the full release, cleaned on demand"""
 
-        entries = []
-        try:
-            # Limit the number of entries to process
-            feed_entries = self.feed_data.entries[:limit] if limit else self.feed_data.entries
-            
-            for entry in feed_entries:
-                # Skip entries that don't have required fields
-                if not entry.get('title') or not entry.get('link'):
-                    continue
-                    
-                # Get the full content
-                content = self._extract_full_content(entry)
-                
-                parsed_entry = {
-                    'title': entry.get('title', ''),
-                    'link': entry.get('link', ''),
-                    'published': entry.get('published', ''),
-                    'summary': entry.get('summary', ''),
-                    'content': content,
-                    'author': entry.get('author', ''),
-                    'categories': self._extract_categories(entry)
-                }
-                entries.append(parsed_entry)
-                
-                # Early exit if we've reached the limit
-                if limit and len(entries) >= limit:
-                    break
-                    
-        except Exception as e:
-            print(f"Error processing entries: {str(e)}")
-            
-        return entries
+    ENTRY_FIELDS = ENTRY_FIELDS
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._cleaned = None
 
     def _extract_full_content(self, entry: Dict) -> str:
         """
@@ -132,6 +56,15 @@ class PRWireParser:
         # Fall back to summary if nothing else is available
         return entry.get('summary', '')
 
+    def _tag_text(self, entry: Dict) -> str:
+        return self._clean_content(entry)
+
+    def _clean_content(self, entry: Dict) -> str:
+        """Cleaned content of an entry, computed once per entry for 'clean_content' and the tagger"""
+        if self._cleaned is None or self._cleaned[0] is not entry:
+            self._cleaned = (entry, clean_article_text(self._extract_full_content(entry)))
+        return self._cleaned[1]
+
     def _extract_categories(self, entry: Dict) -> str:
         """
         Extract categories from entry.
@@ -148,8 +81,20 @@ class PRWireParser:
             return ','.join(entry.categories)
         return ''
 
+    # How each entry field is built from a feedparser entry
+    _FIELD_EXTRACTORS = dict(
+        FeedParser._FIELD_EXTRACTORS,
+        summary=lambda self, entry: entry.get('summary', ''),
+        content=lambda self, entry: self._extract_full_content(entry),
+        # Same output as clean_article_content, in a single parser pass
+        clean_content=lambda self, entry: self._clean_content(entry),
+        author=lambda self, entry: entry.get('author', ''),
+        categories=lambda self, entry: self._extract_categories(entry),
+    )
 
 
+
+@METRICS.timed()
 def clean_article_content(html_content: str) -> str:
     """
     Clean HTML content and return readable text while preserving structure.
@@ -195,61 +140,18 @@ def clean_article_content(html_content: str) -> str:
     
     return text
 
-# Modify your parser's get_entries method to include cleaned content:
-def get_entries(self, limit: Optional[int] = None) -> List[Dict]:
-    """
-    Get parsed entries from the feed with performance optimization.
-    
-    Args:
-        limit (Optional[int]): Maximum number of entries to return
-        
-    Returns:
-        List[Dict]: List of parsed entries
-    """
-    if not self.feed_data:
-        if not self.fetch_feed():
-            return []
-
-    entries = []
-    try:
-        feed_entries = self.feed_data.entries[:limit] if limit else self.feed_data.entries
-        
-        for entry in feed_entries:
-            if not entry.get('title') or not entry.get('link'):
-                continue
-                
-            content = self._extract_full_content(entry)
-            cleaned_content = clean_article_content(content)
-            
-            parsed_entry = {
-                'title': entry.get('title', ''),
-                'link': entry.get('link', ''),
-                'published': entry.get('published', ''),
-                'content': cleaned_content,  # Use cleaned content here
-                'raw_content': content,  # Keep original content just in case
-                'author': entry.get('author', ''),
-                'categories': self._extract_categories(entry)
-            }
-            entries.append(parsed_entry)
-            
-            if limit and len(entries) >= limit:
-                break
-                
-    except Exception as e:
-        print(f"Error processing entries: {str(e)}")
-        
-    return entries
-
 def main(num_articles: int, timeout: int):
     # feed_url = 'https://www.lux.camera/rss/'
     feed_url = 'https://feed.businesswire.com/rss/home/?rss=G1QFDERJXkJeEVlZXw==&_gl=1*1uxc8vr*_gcl_au*MjU2NjMzMzkxLjE3NDA1MzAyMzY.*_ga*MjIwMTYxNDQ0LjE3NDA1MzAyMzY.*_ga_ZQWF70T3FK*MTc0MDUzMDIzNS4xLjEuMTc0MDUzMDI3Ny4xOC4wLjA.'
 
     parser = PRWireParser(feed_url, timeout=timeout)
     
+    entries = []
     if parser.fetch_feed():
-        entries = parser.get_entries(limit=num_articles)
-
-        for entry in entries:
+        # Content is cleaned once, as each entry is read
+        fields = ('title', 'published', 'author', 'categories', 'clean_content')
+        for entry in parser.iter_entries(limit=num_articles, fields=fields):
+            entries.append(entry)
             print(f"\nTitle: {entry['title']}")
             print(f"Author: {entry['author']}")
             print(f"Published: {entry['published']}")
@@ -257,7 +159,7 @@ def main(num_articles: int, timeout: int):
             # print(f"Content length: {len(entry['content'])} characters")
             print("\nContent:")
             print("-" * 80)
-            print(clean_article_content(entry['content']))
+            print(entry['clean_content'])
             print("-" * 80)
             # print("Content preview:", entry['content'])
             print("-" * 80)
@@ -0,0 +1,96 @@
+import hashlib
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+def entry_key(entry: Dict) -> str:
+    """
+    Stable identity of a feed entry: its guid when the feed provides one, otherwise its link.
+
+    Args:
+        entry (Dict): Feed entry from feedparser
+
+    Returns:
+        str: Key for the seen-entry store
+    """
+    return entry.get('id') or entry.get('guid') or entry.get('link', '')
+
+def entry_content_hash(entry: Dict) -> str:
+    """
+    Hash of the parts of an entry that change when a release is updated.
+
+    Args:
+        entry (Dict): Feed entry from feedparser
+
+    Returns:
+        str: Hex digest of the title, summary and content
+    """
+    digest = hashlib.sha1()
+    digest.update(entry.get('title', '').encode('utf-8'))
+    digest.update(entry.get('summary', '').encode('utf-8'))
+    for content in entry.get('content', []):
+        digest.update(content.get('value', '').encode('utf-8'))
+    return digest.hexdigest()
+
+class SeenStore:
+    """
+    SQLite-backed record of feed HTTP validators (ETag / Last-Modified) and of the entries
+    already emitted, so pollers only send conditional requests and only emit new or updated
+    entries, across restarts. Safe to share between threads.
+    """
+
+    def __init__(self, path: str = "seen_entries.db"):
+        """
+        Args:
+            path (str): SQLite database file, created if missing
+        """
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS feeds (url TEXT PRIMARY KEY, etag TEXT, last_modified TEXT)")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, content_hash TEXT, "
+                "first_seen REAL, last_seen REAL)")
+
+    def get_validators(self, url: str) -> Tuple[Optional[str], Optional[str]]:
+        """Return the (etag, last_modified) stored for a feed, or (None, None)"""
+        with self._lock:
+            row = self._conn.execute("SELECT etag, last_modified FROM feeds WHERE url = ?", (url,)).fetchone()
+        return row if row else (None, None)
+
+    def set_validators(self, url: str, etag: Optional[str], last_modified: Optional[str]):
+        """Remember the validators of a feed's latest full response"""
+        with self._lock, self._conn:
+            self._conn.execute("INSERT OR REPLACE INTO feeds (url, etag, last_modified) VALUES (?, ?, ?)",
+                               (url, etag, last_modified))
+
+    def is_new(self, key: str, content_hash: str) -> bool:
+        """
+        Return True if an entry was never marked, or was marked with different content. An
+        entry that is not new has its last_seen refreshed, since it is still in the feed and
+        prune must not forget it.
+        """
+        with self._lock, self._conn:
+            row = self._conn.execute("SELECT content_hash FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is None or row[0] != content_hash:
+                return True
+            self._conn.execute("UPDATE entries SET last_seen = ? WHERE key = ?", (time.time(), key))
+        return False
+
+    def mark(self, key: str, content_hash: str):
+        """Record an entry as seen with the given content"""
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute("INSERT INTO entries (key, content_hash, first_seen, last_seen) VALUES (?, ?, ?, ?) "
+                               "ON CONFLICT(key) DO UPDATE SET content_hash = excluded.content_hash, "
+                               "last_seen = excluded.last_seen", (key, content_hash, now, now))
+
+    def prune(self, older_than: float):
+        """Forget entries not seen in the last older_than seconds"""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM entries WHERE last_seen < ?", (time.time() - older_than,))
+
+    def close(self):
+        self._conn.close()
@@ -0,0 +1,99 @@
+import glob
+import os
+import random
+import sys
+import time
+
+# The pipelines live in EDGAR/src and RSS, which are not packages; copilot puts them on the path
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+from copilot.cli import add_source_paths
+add_source_paths()
+
+from article_cleaner import clean_article_text, clean_articles
+from full_rss_article import clean_article_content
+
+WORDS = ("the company announced record quarterly revenue growth driven by strong demand for its "
+         "products and services across north america europe and asia pacific markets").split()
+
+def synthetic_article(rng):
+    """Build a press release shaped like the wire feeds' content: paragraphs, lists, tables,
+    figures, quotes and tracking scripts"""
+    def paragraph(low=30, high=90):
+        return ' '.join(rng.choice(WORDS) for _ in range(rng.randint(low, high)))
+
+    parts = [f"<p><b>NEW YORK--(BUSINESS WIRE)--</b>{paragraph()} (NYSE: ABC)</p>\n"]
+    for i in range(rng.randint(6, 20)):
+        kind = rng.random()
+        if kind < 0.6:
+            # Wire feeds write the same apostrophes and dashes as decimal and hex references
+            parts.append(f"<p>{paragraph()} &amp; {paragraph()}&#8217;s {paragraph(5, 20)}&#x2019;s "
+                         f"{paragraph(5, 20)} &#X2014; {paragraph(5, 20)}&#x201c;</p>\n")
+        elif kind < 0.7:
+            parts.append("<ul>" + "".join(f"<li>{paragraph(5, 20)}</li>\n" for _ in range(4)) + "</ul>\n")
+        elif kind < 0.8:
+            rows = "".join(f"<tr><td>{rng.choice(WORDS)}</td><td>${rng.randint(1, 999)}.{rng.randint(0, 9)}</td></tr>\n"
+                           for _ in range(10))
+            parts.append(f"<table>{rows}</table>\n")
+        elif kind < 0.88:
+            parts.append(f'<figure><img src="photo.jpg" alt="{paragraph(3, 8)}">'
+                         f"<figcaption>{paragraph(5, 15)}</figcaption></figure>\n")
+        elif kind < 0.94:
+            parts.append(f"<blockquote>{paragraph()}</blockquote><script>track({i});</script>\n")
+        else:
+            parts.append(f"<div><span>{paragraph()}</span>&nbsp;</div>\n")
+    return "".join(parts)
+
+# Fragments of malformed markup, joined at random to check the cleaners agree on broken input
+FUZZ_FRAGMENTS = ("<p>", "</p>", "<div>", "</div>", "<b>", "</b>", "<br>", "</br>", "<pre>", "</pre>",
+                  "<figure><img alt='chart'>", "<figcaption>", "</figcaption>", "</figure>", "<script>",
+                  "</script>", "<rt>", "</rt>", "<![CDATA[x]]>", "<!-- c -->", "text", " ", "\n", "&amp;",
+                  "&nbsp;", "&bogus;", "&#8217;", "&#39", "&#150;", "&#0;", "&#x2019;", "&#X2014;", "&#x27",
+                  "&#xfffd;x", "&#X1F600;", "&#x9f;", "&#x81;", "&#x1f;", "&#xD800;", "&#x110000;", "&#x")
+
+def fuzz_documents(count=5000, seed=0):
+    """Generate count short malformed documents from FUZZ_FRAGMENTS"""
+    rng = random.Random(seed)
+    return ["".join(rng.choice(FUZZ_FRAGMENTS) for _ in range(rng.randint(1, 40))) for _ in range(count)]
+
+def load_corpus(corpus_dir=None, count=2000, seed=0):
+    """Read saved articles (*.html) from corpus_dir, or generate count synthetic ones"""
+    if corpus_dir:
+        articles = []
+        for path in sorted(glob.glob(os.path.join(corpus_dir, "*.html"))):
+            with open(path, 'r', encoding='utf-8') as file:
+                articles.append(file.read())
+        return articles
+
+    rng = random.Random(seed)
+    return [synthetic_article(rng) for _ in range(count)]
+
+def timed(func):
+    """Return the result of func() and its wall time"""
+    start_time = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start_time
+
+def main(corpus_dir=None):
+    articles = load_corpus(corpus_dir)
+    megabytes = sum(len(article) for article in articles) / 1e6
+    print(f"{len(articles)} articles, {megabytes:.1f} MB of HTML")
+
+    baseline, baseline_time = timed(lambda: [clean_article_content(article) for article in articles])
+    single, single_time = timed(lambda: [clean_article_text(article) for article in articles])
+    batch, batch_time = timed(lambda: clean_articles(articles))
+
+    mismatches = sum(a != b for a, b in zip(baseline, single)) + sum(a != b for a, b in zip(baseline, batch))
+    print(f"{'cleaner':<34}{'time':>9}{'articles/s':>12}{'speedup':>9}")
+    for name, elapsed in (("clean_article_content (bs4)", baseline_time),
+                          ("clean_article_text", single_time),
+                          (f"clean_articles ({os.cpu_count()} processes)", batch_time)):
+        print(f"{name:<34}{elapsed:>8.2f}s{len(articles) / elapsed:>12.0f}{baseline_time / elapsed:>8.1f}x")
+    print(f"Outputs differing from clean_article_content: {mismatches}")
+
+    documents = fuzz_documents()
+    mismatches = sum(clean_article_content(document) != clean_article_text(document) for document in documents)
+    print(f"Malformed documents differing from clean_article_content: {mismatches} of {len(documents)}")
+
+if __name__ == "__main__":
+    main(sys.argv[1] if len(sys.argv) > 1 else None)
@@ -0,0 +1,57 @@
+import os
+import sys
+import time
+from bs4 import BeautifulSoup
+
+# The pipelines live in EDGAR/src and RSS, which are not packages; copilot puts them on the path
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+from copilot.cli import add_source_paths
+add_source_paths()
+
+from prod import HEADING_TAGS, HeadingIndex
+
+FILINGS = {
+    "AAPL": "EDGAR/filings/sec-edgar-filings/AAPL/10-K/0000320193-24-000123/primary-document.html",
+    "NVDA": "EDGAR/filings/sec-edgar-filings/NVDA/10-K/0001045810-25-000023/nvda_primary-document.html",
+}
+
+def find_previous_headings(soup):
+    """Resolve every table's heading the old way, with one find_previous walk per table"""
+    headings = []
+    for table in soup.find_all('table'):
+        prev_heading = table.find_previous(HEADING_TAGS)
+        headings.append(prev_heading.text if prev_heading else '')
+    return headings
+
+def indexed_headings(soup):
+    """Resolve every table's heading from a HeadingIndex built once for the document"""
+    heading_index = HeadingIndex(soup)
+    return [heading_index.heading_for(i) for i in range(len(heading_index.tables))]
+
+def best_of(func, soup, repeat):
+    """Return the result of func(soup) and its fastest wall time over repeat runs"""
+    best = float('inf')
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        result = func(soup)
+        best = min(best, time.perf_counter() - start_time)
+    return result, best
+
+def main(repeat=3):
+    print(f"{'filing':<8}{'tables':>8}{'find_previous':>16}{'index':>12}{'speedup':>10}")
+
+    for ticker, relative_path in FILINGS.items():
+        with open(os.path.join(REPO_ROOT, relative_path), 'r', encoding='utf-8') as file:
+            soup = BeautifulSoup(file.read(), 'html.parser')
+
+        old_headings, old_time = best_of(find_previous_headings, soup, repeat)
+        new_headings, new_time = best_of(indexed_headings, soup, repeat)
+
+        # The index must resolve exactly the same heading for every table
+        assert old_headings == new_headings, f"Heading mismatch for {ticker}"
+
+        print(f"{ticker:<8}{len(old_headings):>8}{old_time:>15.3f}s{new_time:>11.3f}s{old_time / new_time:>9.1f}x")
+
+if __name__ == "__main__":
+    main()
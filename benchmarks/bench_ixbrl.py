@@ -0,0 +1,46 @@
+import contextlib
+import io
+import os
+import sys
+import time
+
+# The pipelines live in EDGAR/src and RSS, which are not packages; copilot puts them on the path
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+from copilot.cli import add_source_paths
+add_source_paths()
+
+from ixbrl import extract_facts
+from prod import extract_financial_tables
+
+FILINGS = {
+    "AAPL": "EDGAR/filings/sec-edgar-filings/AAPL/10-K/0000320193-24-000123/primary-document.html",
+    "NVDA": "EDGAR/filings/sec-edgar-filings/NVDA/10-K/0001045810-25-000023/nvda_primary-document.html",
+}
+
+def best_of(func, repeat):
+    """Return the result of func() and its fastest wall time over repeat runs"""
+    best = float('inf')
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        # Silence extract_financial_tables' progress output
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = func()
+        best = min(best, time.perf_counter() - start_time)
+    return result, best
+
+def main(repeat=3):
+    print(f"{'filing':<8}{'tables (tree)':>15}{'tables (stream)':>17}{'ixbrl facts':>13}{'facts':>8}{'vs tree':>9}")
+
+    for ticker, relative_path in FILINGS.items():
+        file_path = os.path.join(REPO_ROOT, relative_path)
+
+        _, tree_time = best_of(lambda: extract_financial_tables(file_path, output_dir=None), repeat)
+        _, stream_time = best_of(lambda: extract_financial_tables(file_path, output_dir=None, streaming=True), repeat)
+        facts, facts_time = best_of(lambda: extract_facts(file_path), repeat)
+
+        print(f"{ticker:<8}{tree_time:>14.3f}s{stream_time:>16.3f}s{facts_time:>12.3f}s"
+              f"{len(facts):>8}{tree_time / facts_time:>8.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,326 @@
+import argparse
+import datetime
+import gc
+import glob
+import json
+import multiprocessing
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from html import escape
+
+# The pipelines live in EDGAR/src and RSS, which are not packages; copilot puts them on the path
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+from copilot.cli import add_source_paths
+add_source_paths()
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import feedparser
+from bs4 import BeautifulSoup
+
+from article_cleaner import clean_article_text
+from bench_clean import synthetic_article
+from full_rss_article import PRWireParser, clean_article_content
+from prod import HeadingIndex, SignatureMatcher, parse_table_to_dataframe, scan_financial_tables
+
+FILINGS = {
+    "AAPL": "EDGAR/filings/sec-edgar-filings/AAPL/10-K/0000320193-24-000123/primary-document.html",
+    "NVDA": "EDGAR/filings/sec-edgar-filings/NVDA/10-K/0001045810-25-000023/nvda_primary-document.html",
+}
+
+# Synthetic filings repeat the body of this filing to reach larger sizes
+SCALE_SOURCE = "NVDA"
+
+RESULTS_DIR = os.path.join(REPO_ROOT, "benchmarks", "results")
+
+# A stage slower than the baseline by more than this fraction is reported as a regression
+REGRESSION_THRESHOLD = 0.10
+
+# Filing stages. Each takes the state left by the stages before it and adds its own output.
+
+def stage_read(state):
+    with open(state["path"], 'r', encoding='utf-8') as file:
+        state["content"] = file.read()
+
+def stage_parse(state):
+    state["soup"] = BeautifulSoup(state["content"], 'html.parser')
+
+def stage_table_scan(state):
+    heading_index = HeadingIndex(state["soup"])
+    matcher = SignatureMatcher()
+    state["candidates"] = [table for table in heading_index.tables if matcher.candidates(table.get_text().lower())]
+
+def stage_dataframe(state):
+    state["frames"] = [parse_table_to_dataframe(table) for table in state["candidates"]]
+
+def stage_classify(state):
+    matcher = SignatureMatcher()
+    financials = {}
+    for df in state["frames"]:
+        statements = matcher.candidates(df.to_string().lower())
+        if statements and not (df.empty or (df.shape[0] < 5 and df.shape[1] < 3)):
+            financials[statements[0][0]] = df
+    state["financials"] = financials
+
+def stage_csv_write(state):
+    for name, df in state["financials"].items():
+        df.to_csv(os.path.join(state["output_dir"], f"{name}.csv"), index=False)
+
+def stage_extract_tree(state):
+    state["extracted"] = scan_financial_tables(state["path"])
+
+def stage_extract_streaming(state):
+    state["extracted"] = scan_financial_tables(state["path"], streaming=True)
+
+# Feed stages
+
+def stage_feed_read(state):
+    with open(state["path"], 'rb') as file:
+        state["payload"] = file.read()
+
+def stage_feed_parse(state):
+    state["feed"] = feedparser.parse(state["payload"])
+
+def stage_entries(state):
+    parser = PRWireParser(state["path"])
+    parser.feed_data = state["feed"]
+    state["entries"] = parser.get_entries()
+
+def stage_clean(state):
+    state["cleaned"] = [clean_article_content(entry["content"]) for entry in state["entries"]]
+
+def stage_clean_fast(state):
+    state["cleaned"] = [clean_article_text(entry["content"]) for entry in state["entries"]]
+
+PIPELINES = {
+    "filing": [
+        ("file_read", stage_read),
+        ("html_parse", stage_parse),
+        ("table_scan", stage_table_scan),
+        ("dataframe_build", stage_dataframe),
+        ("classification", stage_classify),
+        ("csv_write", stage_csv_write),
+        ("extract_tree", stage_extract_tree),
+        ("extract_streaming", stage_extract_streaming),
+    ],
+    "feed": [
+        ("file_read", stage_feed_read),
+        ("feed_parse", stage_feed_parse),
+        ("entry_build", stage_entries),
+        ("content_cleaning", stage_clean),
+        ("content_cleaning_fast", stage_clean_fast),
+    ],
+}
+
+# End-to-end stages start from the file and need none of the stages before them
+STANDALONE_STAGES = {"extract_tree", "extract_streaming"}
+
+def max_rss_mb():
+    """High-water resident set size of this process in MB"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Reported in bytes on macOS and in kilobytes on Linux
+    return peak / 1e6 if sys.platform == "darwin" else peak / 1e3
+
+def measure_stage(kind, path, stage_name, repeat):
+    """
+    Run one stage in a fresh process and measure it. The stages it depends on run first,
+    unmeasured, so the peak RSS reflects this stage on top of its inputs only.
+
+    Returns:
+        dict: seconds (best of repeat), peak_rss_mb (process high-water after the stage),
+            rss_growth_mb (high-water growth during the stage), alloc_peak_mb and
+            alloc_net_mb (Python allocations traced during one run)
+    """
+    stages = PIPELINES[kind]
+    position = [name for name, _ in stages].index(stage_name)
+    stage = stages[position][1]
+
+    # Silence the pipeline's progress output
+    sys.stdout = open(os.devnull, 'w')
+
+    with tempfile.TemporaryDirectory() as output_dir:
+        state = {"path": path, "output_dir": output_dir}
+        if stage_name not in STANDALONE_STAGES:
+            for name, previous in stages[:position]:
+                if name not in STANDALONE_STAGES:
+                    previous(state)
+
+        gc.collect()
+        rss_before = max_rss_mb()
+        best = float('inf')
+        for _ in range(repeat):
+            start_time = time.perf_counter()
+            stage(state)
+            best = min(best, time.perf_counter() - start_time)
+        rss_after = max_rss_mb()
+
+        gc.collect()
+        tracemalloc.start()
+        stage(state)
+        alloc_net, alloc_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    return {"seconds": round(best, 4), "peak_rss_mb": round(rss_after, 1),
+            "rss_growth_mb": round(rss_after - rss_before, 1),
+            "alloc_peak_mb": round(alloc_peak / 1e6, 2), "alloc_net_mb": round(alloc_net / 1e6, 2)}
+
+def scaled_filing(source_path, factor, output_dir):
+    """Write a synthetic filing whose body is the source filing's body repeated factor times"""
+    with open(source_path, 'r', encoding='utf-8') as file:
+        content = file.read()
+
+    body_start = content.index('>', content.lower().index('<body')) + 1
+    body_end = content.lower().rindex('</body>')
+    body = content[body_start:body_end]
+
+    path = os.path.join(output_dir, f"{SCALE_SOURCE}_x{factor}.html")
+    with open(path, 'w', encoding='utf-8') as file:
+        file.write(content[:body_start] + body * factor + content[body_end:])
+    return path
+
+def synthetic_feed(entry_count, output_dir, seed=0):
+    """Write an RSS 2.0 payload of entry_count wire-style press releases"""
+    rng = random.Random(seed)
+    items = []
+    for i in range(entry_count):
+        items.append(f"<item><title>Company {i} announces results</title>"
+                     f"<link>https://www.example.com/news/{i}</link><guid>release-{i}</guid>"
+                     f"<pubDate>Tue, 25 Feb 2025 22:30:00 GMT</pubDate><author>Company {i}</author>"
+                     f"<description>{escape(synthetic_article(rng))}</description></item>")
+
+    path = os.path.join(output_dir, f"feed_{entry_count}.xml")
+    with open(path, 'w', encoding='utf-8') as file:
+        file.write('<?xml version="1.0" encoding="UTF-8"?><rss version="2.0"><channel>'
+                   f"<title>Synthetic wire</title>{''.join(items)}</channel></rss>")
+    return path
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def run_suite(scales=(2, 4), feed_sizes=(50, 200), feeds_dir=None, repeat=3, stages=None):
+    """
+    Measure every stage of the filing and feed pipelines on every input.
+
+    Args:
+        scales (tuple): Sizes of the synthetic filings, as multiples of the source filing
+        feed_sizes (tuple): Entry counts of the synthetic feeds
+        feeds_dir (str, optional): Directory of recorded feed payloads (*.xml, *.rss) to add
+        repeat (int): Timed runs per stage; the fastest is reported
+        stages (list, optional): Only run these stage names
+
+    Returns:
+        dict: Run metadata and a list of results, one per input and stage
+    """
+    results = []
+    context = multiprocessing.get_context("spawn")
+
+    with tempfile.TemporaryDirectory() as input_dir:
+        inputs = [("filing", name, os.path.join(REPO_ROOT, path)) for name, path in FILINGS.items()]
+        inputs += [("filing", f"{SCALE_SOURCE}_x{factor}",
+                    scaled_filing(os.path.join(REPO_ROOT, FILINGS[SCALE_SOURCE]), factor, input_dir))
+                   for factor in scales]
+        inputs += [("feed", f"synthetic_{size}", synthetic_feed(size, input_dir)) for size in feed_sizes]
+        if feeds_dir:
+            inputs += [("feed", os.path.basename(path), path)
+                       for path in sorted(glob.glob(os.path.join(feeds_dir, "*.xml")) +
+                                          glob.glob(os.path.join(feeds_dir, "*.rss")))]
+
+        # One process per measurement so memory high-water marks do not carry over
+        with context.Pool(1, maxtasksperchild=1) as pool:
+            for kind, name, path in inputs:
+                size_mb = os.path.getsize(path) / 1e6
+                for stage_name, _ in PIPELINES[kind]:
+                    if stages and stage_name not in stages:
+                        continue
+                    measurement = pool.apply(measure_stage, (kind, path, stage_name, repeat))
+                    results.append(dict(pipeline=kind, input=name, input_mb=round(size_mb, 2),
+                                        stage=stage_name, **measurement))
+                    print(f"{kind:<7}{name:<16}{stage_name:<24}{measurement['seconds']:>9.3f}s"
+                          f"{measurement['peak_rss_mb']:>9.0f} MB{measurement['alloc_peak_mb']:>10.1f} MB")
+
+    return {
+        "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "repeat": repeat,
+        "results": results,
+    }
+
+def compare(baseline, current, threshold=REGRESSION_THRESHOLD):
+    """
+    Print each stage's change from a baseline run.
+
+    Args:
+        baseline (dict): Earlier output of run_suite
+        current (dict): Later output of run_suite
+        threshold (float): Slowdown, as a fraction, reported as a regression
+
+    Returns:
+        list: (pipeline, input, stage, baseline seconds, current seconds) of every regression
+    """
+    before = {(r["pipeline"], r["input"], r["stage"]): r for r in baseline["results"]}
+    regressions = []
+
+    print(f"\nCompared with {baseline.get('revision')} ({baseline['timestamp']}):")
+    print(f"{'input':<16}{'stage':<24}{'before':>9}{'after':>9}{'change':>9}{'peak RSS':>11}{'alloc':>9}")
+    for result in current["results"]:
+        key = (result["pipeline"], result["input"], result["stage"])
+        if key not in before:
+            continue
+        old = before[key]
+        change = result["seconds"] / old["seconds"] - 1 if old["seconds"] else 0.0
+        flag = "  REGRESSION" if change > threshold else ""
+        print(f"{result['input']:<16}{result['stage']:<24}{old['seconds']:>8.3f}s{result['seconds']:>8.3f}s"
+              f"{change:>+8.0%}{result['peak_rss_mb'] - old['peak_rss_mb']:>+8.0f} MB"
+              f"{result['alloc_peak_mb'] - old['alloc_peak_mb']:>+6.0f} MB{flag}")
+        if flag:
+            regressions.append((*key, old["seconds"], result["seconds"]))
+
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark each stage of the filing and feed pipelines")
+    parser.add_argument("--output", help="Results file (default: benchmarks/results/<timestamp>.json)")
+    parser.add_argument("--compare", help="Earlier results file to compare this run against")
+    parser.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD,
+                        help="Slowdown reported as a regression, as a fraction (default: 0.10)")
+    parser.add_argument("--scale", type=int, action="append", dest="scales",
+                        help="Size of a synthetic filing as a multiple of the NVDA 10-K, may be repeated (default: 2 and 4)")
+    parser.add_argument("--feed-size", type=int, action="append", dest="feed_sizes",
+                        help="Entries in a synthetic feed, may be repeated (default: 50 and 200)")
+    parser.add_argument("--feeds-dir", help="Directory of recorded feed payloads (*.xml, *.rss) to include")
+    parser.add_argument("--stage", action="append", dest="stages", help="Only run this stage, may be repeated")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per stage (default: 3)")
+    args = parser.parse_args(argv)
+
+    suite = run_suite(scales=tuple(args.scales or (2, 4)), feed_sizes=tuple(args.feed_sizes or (50, 200)),
+                      feeds_dir=args.feeds_dir, repeat=args.repeat, stages=args.stages)
+
+    output = args.output or os.path.join(RESULTS_DIR, f"{suite['timestamp'].replace(':', '')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as file:
+        json.dump(suite, file, indent=2)
+    print(f"\nSaved results to: {output}")
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as file:
+            regressions = compare(json.load(file), suite, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} stages regressed by more than {args.threshold:.0%}")
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1 @@
+"""Command line entry point for the EDGAR and RSS pipelines: python -m copilot --help"""
@@ -0,0 +1,201 @@
+import argparse
+import io
+import json
+import os
+import runpy
+import sys
+import time
+
+# Only the standard library is imported here. pandas, bs4, feedparser and requests are
+# imported by the subcommand that needs them, so a small job pays only for its own imports.
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# The pipelines are script directories rather than packages, and share instrumentation.py at
+# the root. Their modules do not touch the import path; entry points set it up with add_source_paths
+SOURCE_DIRS = (os.path.join(REPO_ROOT, "EDGAR", "src"), os.path.join(REPO_ROOT, "RSS"), REPO_ROOT)
+
+# Socket of a warm worker (python -m copilot serve); commands are sent there when it is running
+WORKER_ENV = "ANALYST_COPILOT_WORKER"
+
+def add_source_paths():
+    """Put EDGAR/src, RSS and the repository root on the import path"""
+    for path in reversed(SOURCE_DIRS):
+        if path not in sys.path:
+            sys.path.insert(0, path)
+
+def run_extract(args):
+    from prod import extract_financial_tables
+
+    financials = extract_financial_tables(args.file_path, output_dir=args.output_dir, streaming=args.streaming,
+                                          output_formats=tuple(args.output_formats or ["csv"]))
+    print(f"Found {len(financials)} statements: {', '.join(sorted(financials)) or 'none'}")
+    return 0
+
+def run_batch(args):
+    from batch import run_batch as run
+    from extraction_cache import ExtractionCache
+
+    cache = ExtractionCache(args.cache_dir) if args.cache_dir else None
+    records = run(args.root, args.output_dir, workers=args.workers, forms=args.forms, streaming=args.streaming,
+                  retry_failed=args.retry_failed, cache=cache, output_formats=tuple(args.output_formats or ["csv"]))
+    return 1 if any(record["status"] != "ok" for record in records) else 0
+
+def run_poll_feeds(args):
+    from feed_poller import FeedConfig, FeedPoller
+
+    poller = FeedPoller([FeedConfig(url, timeout=args.timeout, limit=args.limit) for url in args.feed_urls])
+    try:
+        results = poller.poll_once()
+    finally:
+        poller.close()
+
+    output = open(args.output, 'a', encoding='utf-8') if args.output else None
+    try:
+        for url, entries in results.items():
+            print(f"{len(entries)} entries from {url}")
+            for entry in entries:
+                if output:
+                    output.write(json.dumps(entry) + "\n")
+                else:
+                    print(f"  {entry['published']}  {entry['title']}")
+    finally:
+        if output:
+            output.close()
+    return 0 if len(results) == len(args.feed_urls) else 1
+
+def run_clean(args):
+    from article_cleaner import clean_articles
+
+    if args.files:
+        contents = []
+        for path in args.files:
+            with open(path, 'r', encoding='utf-8', errors='replace') as file:
+                contents.append(file.read())
+    else:
+        contents = [sys.stdin.read()]
+
+    texts = clean_articles(contents, workers=args.workers)
+    if args.output_dir:
+        os.makedirs(args.output_dir, exist_ok=True)
+        for path, text in zip(args.files, texts):
+            name = os.path.splitext(os.path.basename(path))[0] + ".txt"
+            with open(os.path.join(args.output_dir, name), 'w', encoding='utf-8') as file:
+                file.write(text)
+        print(f"Cleaned {len(texts)} articles into {args.output_dir}")
+    else:
+        print("\n\n".join(texts))
+    return 0
+
+def run_module(args):
+    # The module's own argument parser reads sys.argv
+    sys.argv = [args.module] + args.args
+    try:
+        runpy.run_module(args.module, run_name="__main__", alter_sys=True)
+    except SystemExit as e:
+        return e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+    return 0
+
+def run_serve(args):
+    from copilot.worker import serve
+
+    serve(args.socket)
+    return 0
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m copilot", description="Analyst copilot pipelines")
+    parser.add_argument("--worker", default=os.environ.get(WORKER_ENV),
+                        help=f"Socket of a warm worker to run the command in (default: ${WORKER_ENV}). "
+                             "The command runs here when no worker is listening")
+    parser.add_argument("--metrics", help="Enable the shared metrics registry and write it to this file when the "
+                                          "command ends, as Prometheus text for .prom and JSON otherwise")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    extract = subparsers.add_parser("extract", help="Extract the financial statements of one filing")
+    extract.add_argument("file_path", help="Path to the XBRL/HTML filing")
+    extract.add_argument("--output-dir", default="financial_tables", help="Directory for the statement files")
+    extract.add_argument("--no-streaming", action="store_false", dest="streaming", help="Build a full BeautifulSoup tree")
+    extract.add_argument("--format", action="append", dest="output_formats", choices=["csv", "parquet"],
+                         help="Statement output format, may be repeated (default: csv)")
+    extract.set_defaults(func=run_extract)
+
+    batch = subparsers.add_parser("batch", help="Extract every filing under a sec-edgar-filings tree")
+    batch.add_argument("root", help="sec-edgar-filings directory, or a directory containing it")
+    batch.add_argument("--output-dir", default="batch_output", help="Directory for per-accession results and the manifest")
+    batch.add_argument("--workers", type=int, help="Number of worker processes (default: CPU count)")
+    batch.add_argument("--form", action="append", dest="forms", help="Form type to include, may be repeated (default: all)")
+    batch.add_argument("--no-streaming", action="store_false", dest="streaming", help="Build a full BeautifulSoup tree per filing")
+    batch.add_argument("--retry-failed", action="store_true", help="Re-run filings the manifest records as failed")
+    batch.add_argument("--format", action="append", dest="output_formats", choices=["csv", "parquet"],
+                       help="Statement output format, may be repeated (default: csv)")
+    batch.add_argument("--cache-dir", help="Reuse extraction results for unchanged filings from this directory")
+    batch.set_defaults(func=run_batch)
+
+    poll = subparsers.add_parser("poll-feeds", help="Fetch RSS feeds once and print or save their new entries")
+    poll.add_argument("feed_urls", nargs="+", help="Feed URLs")
+    poll.add_argument("--limit", type=int, help="Most entries per feed")
+    poll.add_argument("--timeout", type=float, default=10, help="Timeout in seconds per feed (default: 10)")
+    poll.add_argument("--output", help="Append the entries as JSON lines to this file")
+    poll.set_defaults(func=run_poll_feeds)
+
+    clean = subparsers.add_parser("clean", help="Convert article HTML to readable text")
+    clean.add_argument("files", nargs="*", help="HTML files (default: read standard input)")
+    clean.add_argument("--output-dir", help="Write one .txt per file here instead of printing")
+    clean.add_argument("--workers", type=int, help="Worker processes for large batches (default: CPU count)")
+    clean.set_defaults(func=run_clean)
+
+    run = subparsers.add_parser("run", help="Run a module of EDGAR/src, RSS or the root as a script, "
+                                            "e.g. run watcher --once --company ... --email ...")
+    run.add_argument("module", help="Module name, e.g. watcher, statement_store, feed_poller, retrieval")
+    run.add_argument("args", nargs=argparse.REMAINDER, help="Arguments passed to the module")
+    run.set_defaults(func=run_module)
+
+    serve = subparsers.add_parser("serve", help="Run a warm worker that keeps the pipelines imported")
+    serve.add_argument("--socket", default=os.environ.get(WORKER_ENV) or "copilot.sock",
+                       help=f"Unix socket to listen on (default: ${WORKER_ENV} or copilot.sock)")
+    serve.set_defaults(func=run_serve)
+
+    return parser
+
+def main(argv=None, use_worker=True):
+    """
+    Run a subcommand, in a warm worker when one is listening and here otherwise.
+
+    Args:
+        argv (list, optional): Arguments, defaults to sys.argv[1:]
+        use_worker (bool): Whether the command may be sent to a warm worker
+
+    Returns:
+        int: Exit status
+    """
+    argv = sys.argv[1:] if argv is None else list(argv)
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.command == "clean" and args.output_dir and not args.files:
+        # Output files are named after the input files
+        parser.error("clean --output-dir needs input files; standard input is cleaned to standard output")
+
+    if use_worker and args.worker and args.command != "serve":
+        from copilot.worker import submit
+
+        stdin = sys.stdin.read() if args.command == "clean" and not args.files else None
+        status = submit(args.worker, argv, stdin)
+        if status is not None:
+            return status
+        if stdin is not None:
+            sys.stdin = io.StringIO(stdin)
+
+    add_source_paths()
+    if args.metrics:
+        from instrumentation import METRICS
+        METRICS.enable()
+
+    start_time = time.perf_counter()
+    try:
+        status = args.func(args)
+    finally:
+        if args.metrics:
+            METRICS.write(args.metrics)
+    if args.command != "serve":
+        print(f"{args.command} finished in {time.perf_counter() - start_time:.2f} seconds", file=sys.stderr)
+    return status
@@ -0,0 +1,125 @@
+import importlib
+import io
+import json
+import os
+import signal
+import socket
+import sys
+import traceback
+
+# Imported once when the worker starts, so jobs begin with the pipelines already loaded
+PRELOAD_MODULES = ("pandas", "bs4", "requests", "feedparser", "prod", "batch", "extraction_cache",
+                   "article_cleaner", "feed_poller")
+
+class _StreamWriter(io.TextIOBase):
+    """Text stream that forwards every write to the client as a JSON line"""
+
+    def __init__(self, connection, name):
+        self.connection = connection
+        self.name = name
+
+    def writable(self):
+        return True
+
+    def write(self, text):
+        if text:
+            self.connection.sendall((json.dumps({"stream": self.name, "data": text}) + "\n").encode('utf-8'))
+        return len(text)
+
+def _run_job(connection):
+    """Run one request in this (forked) process and report its exit status to the client"""
+    from copilot.cli import main
+
+    request = json.loads(connection.makefile('r', encoding='utf-8').readline())
+    os.chdir(request["cwd"])
+    sys.stdin = io.StringIO(request.get("stdin") or "")
+    sys.stdout = _StreamWriter(connection, "stdout")
+    sys.stderr = _StreamWriter(connection, "stderr")
+
+    try:
+        status = main(request["argv"], use_worker=False)
+    except SystemExit as e:
+        status = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+    except Exception:
+        traceback.print_exc()
+        status = 1
+
+    connection.sendall((json.dumps({"exit": status or 0}) + "\n").encode('utf-8'))
+
+def serve(path, preload=PRELOAD_MODULES):
+    """
+    Listen on a Unix socket and run each command sent by submit in a process forked from
+    this one. Forking after the heavy imports means every job starts with them loaded, and
+    jobs cannot leak state (working directory, open files, module globals) into each other.
+
+    Args:
+        path (str): Socket path
+        preload (tuple): Modules to import before accepting jobs
+    """
+    from copilot.cli import add_source_paths
+
+    add_source_paths()
+    for module in preload:
+        importlib.import_module(module)
+
+    if os.path.exists(path):
+        os.remove(path)
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(path)
+    server.listen()
+    # Finished jobs are reaped automatically, and SIGTERM removes the socket like Ctrl-C
+    signal.signal(signal.SIGCHLD, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    print(f"Worker {os.getpid()} ready on {path}", flush=True)
+
+    try:
+        while True:
+            connection, _ = server.accept()
+            if os.fork() == 0:
+                server.close()
+                # Jobs that start their own process pools must be able to wait for them
+                signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+                signal.signal(signal.SIGTERM, signal.SIG_DFL)
+                try:
+                    _run_job(connection)
+                finally:
+                    connection.close()
+                    os._exit(0)
+            connection.close()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+        os.remove(path)
+
+def submit(path, argv, stdin=None):
+    """
+    Run a command in the warm worker listening on path, relaying its output here.
+
+    Args:
+        path (str): Socket path
+        argv (list): Command line arguments, as for copilot.cli.main
+        stdin (str, optional): Standard input for the command
+
+    Returns:
+        int: The command's exit status, or None if no worker is listening
+    """
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        client.connect(path)
+    except (FileNotFoundError, ConnectionRefusedError):
+        client.close()
+        return None
+
+    with client:
+        client.sendall((json.dumps({"argv": argv, "cwd": os.getcwd(), "stdin": stdin}) + "\n").encode('utf-8'))
+        for line in client.makefile('r', encoding='utf-8'):
+            message = json.loads(line)
+            if "exit" in message:
+                return message["exit"]
+            stream = sys.stdout if message["stream"] == "stdout" else sys.stderr
+            stream.write(message["data"])
+            stream.flush()
+
+    # The job process died without reporting a status
+    return 1
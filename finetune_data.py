@@ -0,0 +1,401 @@
+import argparse
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from copilot.cli import add_source_paths
+from retrieval import FILING_ITEMS, article_documents, filing_documents
+
+# Tokens per packed training sequence
+DEFAULT_SEQ_LEN = 2048
+
+# Sequences per shard file; a shard of 2048-token uint16 sequences is 32 MB
+SEQUENCES_PER_SHARD = 8192
+
+# Examples handed to the worker pool at a time, so sources are streamed rather than loaded
+TOKENIZE_BATCH = 256
+
+# Byte-level fallback used when no tokenizer is named: UTF-8 bytes, with 256 as end of text
+BYTE_EOS_ID = 256
+
+MANIFEST_NAME = "manifest.json"
+
+# Keys of the examples packed so far, one per line, appended to as examples are added
+KEYS_NAME = "keys.txt"
+
+# Tokenizer of each pool worker, loaded once by _init_worker
+_TOKENIZER = None
+
+def load_tokenizer(name):
+    """
+    Args:
+        name (str, optional): Hugging Face tokenizer name or path; None for byte-level tokens
+
+    Returns:
+        tuple: (tokenizer or None, end-of-text id, vocabulary size)
+    """
+    if name is None:
+        return None, BYTE_EOS_ID, BYTE_EOS_ID + 1
+
+    # transformers is only needed when training with a model's own tokenizer
+    from transformers import AutoTokenizer
+
+    tokenizer = AutoTokenizer.from_pretrained(name)
+    return tokenizer, tokenizer.eos_token_id, len(tokenizer)
+
+def _init_worker(name):
+    global _TOKENIZER
+    _TOKENIZER = load_tokenizer(name)[0]
+
+def _tokenize(text):
+    if _TOKENIZER is None:
+        return np.frombuffer(text.encode('utf-8'), dtype=np.uint8)
+    return np.asarray(_TOKENIZER(text, add_special_tokens=False)["input_ids"], dtype=np.int64)
+
+def token_dtype(vocab_size):
+    """Smallest unsigned dtype holding every token id"""
+    return "uint16" if vocab_size <= np.iinfo(np.uint16).max + 1 else "uint32"
+
+def statement_examples(store_dir):
+    """
+    One example per statement in a StatementStore, rendered as a pipe-separated table.
+
+    Args:
+        store_dir (str): Directory of the statement store
+
+    Yields:
+        dict: Example with key and text
+    """
+    from statement_store import StatementStore
+
+    rows = StatementStore(store_dir).query()
+    for (ticker, accession, statement), group in rows.groupby(["ticker", "accession", "statement"], sort=True):
+        table = group.pivot_table(index="line_item", columns="period", values="value", aggfunc="last", sort=False)
+        table = table[sorted(table.columns, reverse=True)]
+        lines = [f"{ticker} {statement.replace('_', ' ')} (filing {accession}, in dollars)",
+                 " | ".join(["line item", *table.columns])]
+        for line_item, values in table.iterrows():
+            lines.append(" | ".join([line_item, *("" if np.isnan(value) else f"{value:,.0f}" for value in values)]))
+        yield {"key": f"statement/{ticker}/{accession}/{statement}", "text": "\n".join(lines)}
+
+def section_examples(root, items=FILING_ITEMS):
+    """
+    One example per 10-K item found under a sec-edgar-filings tree.
+
+    Args:
+        root (str): sec-edgar-filings directory, or a directory containing it
+        items (tuple): Item numbers to include
+
+    Yields:
+        dict: Example with key and text
+    """
+    from batch import discover_filings
+
+    for filing in discover_filings(root, ["10-K"]):
+        for document in filing_documents(filing["path"], filing["ticker"], filing["accession"], items):
+            yield {"key": f"section/{document['key']}", "text": f"{document['title']}\n{document['text']}"}
+
+def article_examples(paths):
+    """
+    One example per press release in JSONL files of parsed feed entries (one entry per line,
+    with title, link and content or summary).
+
+    Args:
+        paths (list): JSONL files
+
+    Yields:
+        dict: Example with key and text
+    """
+    for path in paths:
+        with open(path, 'r', encoding='utf-8') as file:
+            entries = [json.loads(line) for line in file if line.strip()]
+        for document in article_documents(entries):
+            yield {"key": f"article/{document['key']}", "text": f"{document['title']}\n{document['text']}"}
+
+class ShardBuilder:
+    """
+    Tokenizes examples in a process pool and packs them, separated by end-of-text tokens,
+    into fixed-length sequences stored in raw memory-mappable shard files.
+
+    Builds are incremental: the key of every example already packed is appended to a keys
+    file, and the tokens that did not fill a whole shard are kept as the pending tail the
+    next build packs first, so repeated small builds do not leave a trail of short shards.
+    finalize writes the tail's whole sequences as a last, shorter shard once the corpus is
+    complete. The manifest is rewritten after every shard, so an interrupted build resumes
+    from its last shard.
+    """
+
+    def __init__(self, out_dir, tokenizer=None, seq_len=DEFAULT_SEQ_LEN, sequences_per_shard=SEQUENCES_PER_SHARD,
+                 workers=None):
+        """
+        Args:
+            out_dir (str): Directory of the shards and the manifest
+            tokenizer (str, optional): Hugging Face tokenizer name; byte-level tokens when omitted
+            seq_len (int): Tokens per sequence
+            sequences_per_shard (int): Maximum sequences per shard file
+            workers (int, optional): Tokenizer processes, defaults to the CPU count
+        """
+        self.out_dir = out_dir
+        self.tokenizer = tokenizer
+        self.sequences_per_shard = sequences_per_shard
+        self.workers = workers
+        _, self.eos_id, vocab_size = load_tokenizer(tokenizer)
+
+        self.manifest = read_manifest(out_dir) or {
+            "tokenizer": tokenizer, "seq_len": seq_len, "dtype": token_dtype(vocab_size), "eos_id": self.eos_id,
+            "shards": [], "keys": 0, "pending": None, "generation": 0,
+        }
+        if (self.manifest["tokenizer"], self.manifest["seq_len"]) != (tokenizer, seq_len):
+            raise ValueError(f"{out_dir} was built with tokenizer {self.manifest['tokenizer']} and "
+                             f"seq_len {self.manifest['seq_len']}")
+        self.seq_len = seq_len
+        self.dtype = np.dtype(self.manifest["dtype"])
+        self._known = set(read_keys(out_dir, self.manifest["keys"]))
+        # Keys packed since the last save, appended to the keys file by _save
+        self._new_keys = []
+
+        # Token stream not yet written to a shard, and the positions in it where documents start
+        self._parts, self._length, self._doc_starts = [], 0, []
+        pending = self.manifest["pending"]
+        if pending:
+            tokens = np.load(os.path.join(out_dir, pending["file"]))
+            self._parts, self._length, self._doc_starts = [tokens], len(tokens), list(pending["doc_starts"])
+
+    def _append(self, key, tokens):
+        self._doc_starts.append(self._length)
+        self._parts.append(tokens.astype(self.dtype, copy=False))
+        self._parts.append(np.array([self.eos_id], dtype=self.dtype))
+        self._length += len(tokens) + 1
+        self._new_keys.append(key)
+
+    def _flush(self, final=False):
+        """
+        Write the stream's full shards and keep the remainder pending. The final flush, from
+        finalize, also writes the remainder's whole sequences as a shorter shard.
+        """
+        whole = self._length // self.seq_len
+        if not final:
+            whole -= whole % self.sequences_per_shard
+        if not whole:
+            return 0
+
+        stream = np.concatenate(self._parts)
+        starts = np.asarray(self._doc_starts, dtype=np.int64)
+        position = 0
+        while whole:
+            count = min(whole, self.sequences_per_shard)
+            end = position + count * self.seq_len
+            name = f"shard_{len(self.manifest['shards']):05d}"
+            path = os.path.join(self.out_dir, name)
+
+            stream[position:end].tofile(f"{path}.bin.tmp")
+            os.replace(f"{path}.bin.tmp", f"{path}.bin")
+            # Document starts within the shard; a document may continue into later shards
+            np.save(os.path.join(self.out_dir, f"{name}.idx.npy"), starts[(starts >= position) & (starts < end)] - position)
+            self.manifest["shards"].append({"name": name, "sequences": count})
+
+            position, whole = end, whole - count
+
+        self._parts = [stream[position:]]
+        self._length = len(stream) - position
+        self._doc_starts = [int(start) - position for start in starts if start >= position]
+        return position // self.seq_len
+
+    def _save(self):
+        previous = self.manifest["pending"]
+        self.manifest["generation"] += 1
+        name = f"pending_{self.manifest['generation']:06d}.npy"
+        np.save(os.path.join(self.out_dir, name), np.concatenate(self._parts) if self._parts else np.empty(0, self.dtype))
+        self.manifest["pending"] = {"file": name, "doc_starts": self._doc_starts}
+
+        # Keys are appended before the manifest counts them; lines past its count are dropped
+        # by read_keys, so a crash in between cannot record keys whose tokens were lost
+        with open(os.path.join(self.out_dir, KEYS_NAME), 'a', encoding='utf-8') as file:
+            file.writelines(f"{key}\n" for key in self._new_keys)
+        self.manifest["keys"] += len(self._new_keys)
+        self._new_keys = []
+
+        with open(os.path.join(self.out_dir, f"{MANIFEST_NAME}.tmp"), 'w', encoding='utf-8') as file:
+            json.dump(self.manifest, file)
+        os.replace(os.path.join(self.out_dir, f"{MANIFEST_NAME}.tmp"), os.path.join(self.out_dir, MANIFEST_NAME))
+        if previous:
+            os.remove(os.path.join(self.out_dir, previous["file"]))
+
+    def add(self, examples, batch_size=TOKENIZE_BATCH):
+        """
+        Tokenize and pack examples whose keys are not yet in the dataset.
+
+        Args:
+            examples (iterable): Dicts with key and text, e.g. from statement_examples,
+                section_examples or article_examples
+            batch_size (int): Examples tokenized per round of the pool
+
+        Returns:
+            dict: Number of examples, tokens and sequences added
+        """
+        os.makedirs(self.out_dir, exist_ok=True)
+        stats = {"examples": 0, "tokens": 0, "sequences": 0}
+
+        with ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                 initargs=(self.tokenizer,)) as executor:
+            batch = []
+            for example in _new_examples(examples, self._known):
+                batch.append(example)
+                if len(batch) < batch_size:
+                    continue
+                self._pack(executor, batch, stats)
+                batch = []
+            if batch:
+                self._pack(executor, batch, stats)
+
+        self._save()
+        return stats
+
+    def finalize(self):
+        """
+        Write the pending tail's whole sequences as a last shard, shorter than the others,
+        so they become readable. Tokens short of a whole sequence stay pending.
+
+        Returns:
+            int: Number of sequences written
+        """
+        os.makedirs(self.out_dir, exist_ok=True)
+        written = self._flush(final=True)
+        self._save()
+        return written
+
+    def pending_sequences(self):
+        """Return the number of whole sequences waiting in the pending tail for a full shard"""
+        return self._length // self.seq_len
+
+    def _pack(self, executor, batch, stats):
+        texts = [example["text"] for example in batch]
+        for example, tokens in zip(batch, executor.map(_tokenize, texts, chunksize=max(1, len(texts) // 32))):
+            self._append(example["key"], tokens)
+            stats["examples"] += 1
+            stats["tokens"] += len(tokens) + 1
+
+        written = self._flush()
+        if written:
+            stats["sequences"] += written
+            self._save()
+
+def _new_examples(examples, known):
+    for example in examples:
+        if example["key"] in known or not example["text"]:
+            continue
+        known.add(example["key"])
+        yield example
+
+def read_keys(out_dir, count):
+    """
+    Return the first count example keys of a shard directory. Lines past count were appended
+    by a build interrupted before its manifest was saved, and are removed from the file.
+    """
+    path = os.path.join(out_dir, KEYS_NAME)
+    try:
+        with open(path, 'r', encoding='utf-8') as file:
+            keys = file.read().splitlines()
+    except FileNotFoundError:
+        return []
+    if len(keys) > count:
+        keys = keys[:count]
+        with open(f"{path}.tmp", 'w', encoding='utf-8') as file:
+            file.writelines(f"{key}\n" for key in keys)
+        os.replace(f"{path}.tmp", path)
+    return keys
+
+def read_manifest(out_dir):
+    """Return the manifest of a shard directory, or None if nothing was built there yet"""
+    try:
+        with open(os.path.join(out_dir, MANIFEST_NAME), 'r', encoding='utf-8') as file:
+            return json.load(file)
+    except FileNotFoundError:
+        return None
+
+class PackedDataset:
+    """
+    Read-only view of the sequences written by ShardBuilder. Shards are memory-mapped, so a
+    sequence is a zero-copy view of the file and only the pages a batch touches are read.
+    """
+
+    def __init__(self, out_dir):
+        """
+        Args:
+            out_dir (str): Directory of the shards and the manifest
+        """
+        self.manifest = read_manifest(out_dir)
+        if self.manifest is None:
+            raise FileNotFoundError(f"No packed dataset in {out_dir}")
+        self.out_dir = out_dir
+        self.seq_len = self.manifest["seq_len"]
+        self.eos_id = self.manifest["eos_id"]
+
+        self._shards = [np.memmap(os.path.join(out_dir, f"{shard['name']}.bin"), dtype=self.manifest["dtype"],
+                                  mode='r', shape=(shard["sequences"], self.seq_len))
+                        for shard in self.manifest["shards"]]
+        self._offsets = np.cumsum([0] + [shard["sequences"] for shard in self.manifest["shards"]])
+
+    def __len__(self):
+        return int(self._offsets[-1])
+
+    def _locate(self, index):
+        if not -len(self) <= index < len(self):
+            raise IndexError(f"Sequence {index} out of range for {len(self)} sequences")
+        index %= len(self)
+        shard = int(np.searchsorted(self._offsets, index, side='right')) - 1
+        return shard, index - int(self._offsets[shard])
+
+    def __getitem__(self, index):
+        """Return sequence index as a (seq_len,) view of its shard"""
+        shard, row = self._locate(index)
+        return self._shards[shard][row]
+
+    def batch(self, indices):
+        """Return the sequences at indices stacked into a (len(indices), seq_len) array"""
+        return np.stack([self[index] for index in indices])
+
+    def document_starts(self, index):
+        """Return the positions within sequence index where a document begins"""
+        shard, row = self._locate(index)
+        starts = np.load(os.path.join(self.out_dir, f"{self.manifest['shards'][shard]['name']}.idx.npy"), mmap_mode='r')
+        low, high = np.searchsorted(starts, [row * self.seq_len, (row + 1) * self.seq_len])
+        return np.asarray(starts[low:high]) - row * self.seq_len
+
+def main(argv=None):
+    # The example sources import from EDGAR/src and RSS, which are not packages
+    add_source_paths()
+
+    parser = argparse.ArgumentParser(description="Build packed, memory-mapped training shards")
+    parser.add_argument("out_dir", help="Directory of the shards and manifest")
+    parser.add_argument("--filings", help="sec-edgar-filings tree whose 10-K sections to include")
+    parser.add_argument("--item", action="append", dest="items", help="10-K item to include, may be repeated (default: 1, 1A, 7)")
+    parser.add_argument("--statements", help="Statement store directory whose statements to include")
+    parser.add_argument("--articles", action="append", default=[], help="JSONL file of parsed feed entries, may be repeated")
+    parser.add_argument("--tokenizer", help="Hugging Face tokenizer name (default: byte-level tokens)")
+    parser.add_argument("--seq-len", type=int, default=DEFAULT_SEQ_LEN, help="Tokens per sequence")
+    parser.add_argument("--workers", type=int, help="Tokenizer processes (default: CPU count)")
+    parser.add_argument("--finalize", action="store_true",
+                        help="Also write the pending whole sequences as a last, shorter shard")
+    args = parser.parse_args(argv)
+
+    builder = ShardBuilder(args.out_dir, tokenizer=args.tokenizer, seq_len=args.seq_len, workers=args.workers)
+    if args.statements:
+        print(f"Statements: {builder.add(statement_examples(args.statements))}")
+    if args.filings:
+        print(f"10-K sections: {builder.add(section_examples(args.filings, tuple(args.items or FILING_ITEMS)))}")
+    if args.articles:
+        print(f"Press releases: {builder.add(article_examples(args.articles))}")
+    if args.finalize:
+        print(f"Finalized: {builder.finalize()} sequences")
+    elif builder.pending_sequences():
+        print(f"{builder.pending_sequences()} whole sequences pending until a full shard, or --finalize")
+
+    dataset = PackedDataset(args.out_dir)
+    print(f"{len(dataset)} sequences of {dataset.seq_len} tokens in {len(dataset.manifest['shards'])} shards")
+    return dataset
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,222 @@
+import functools
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+# Upper bounds in seconds of the latency histogram buckets
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Prefix of every exported Prometheus metric
+METRIC_PREFIX = "analyst_copilot"
+
+class Histogram:
+    """Cumulative-bucket latency histogram in the Prometheus layout"""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        # The last slot counts observations above every bound (the +Inf bucket)
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self):
+        """Return (upper bound, observations at or below it) for every bucket including +Inf"""
+        total, result = 0, []
+        for bound, count in zip(self.buckets + (float('inf'),), self.counts):
+            total += count
+            result.append((bound, total))
+        return result
+
+class Metrics:
+    """
+    Registry of counters and per-stage latency histograms shared by the EDGAR and RSS
+    pipelines. While disabled every hook returns immediately, so instrumented code pays one
+    attribute check per call.
+    """
+
+    def __init__(self, enabled=False):
+        """
+        Args:
+            enabled (bool): Whether hooks record anything
+        """
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self.counters = {}
+        self.histograms = {}
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def reset(self):
+        """Forget everything recorded so far"""
+        with self._lock:
+            self.counters = {}
+            self.histograms = {}
+
+    def incr(self, name, value=1):
+        """Add value to a counter, e.g. incr("tables_scanned")"""
+        if not self.enabled:
+            return
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def observe(self, stage, seconds):
+        """Record one run of a stage taking seconds"""
+        if not self.enabled:
+            return
+        with self._lock:
+            if stage not in self.histograms:
+                self.histograms[stage] = Histogram()
+            self.histograms[stage].observe(seconds)
+
+    @contextmanager
+    def _timer(self, stage):
+        start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - start_time)
+
+    def timer(self, stage):
+        """
+        Context manager timing the code it wraps as one run of stage.
+
+        Args:
+            stage (str): Stage name, e.g. "fetch_feed"
+        """
+        return self._timer(stage) if self.enabled else _NOOP_TIMER
+
+    def timed(self, stage=None):
+        """
+        Decorator timing every call of a function as one run of a stage.
+
+        Args:
+            stage (str, optional): Stage name, defaults to the function's name
+        """
+        def decorator(func):
+            name = stage or func.__name__
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                start_time = time.perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    self.observe(name, time.perf_counter() - start_time)
+            return wrapper
+        return decorator
+
+    def snapshot(self):
+        """
+        Returns:
+            dict: Raw "counters" and per-stage "histograms" (bucket counts, sum, count), in the
+                form merge takes, e.g. to send a worker process's metrics back to its parent
+        """
+        with self._lock:
+            return {
+                "counters": dict(self.counters),
+                "histograms": {stage: {"buckets": list(histogram.buckets), "counts": list(histogram.counts),
+                                       "sum": histogram.sum, "count": histogram.count}
+                               for stage, histogram in self.histograms.items()},
+            }
+
+    def merge(self, snapshot):
+        """Add the metrics of a snapshot, e.g. one returned by collect in a worker process"""
+        if not snapshot:
+            return
+        with self._lock:
+            for name, value in snapshot["counters"].items():
+                self.counters[name] = self.counters.get(name, 0) + value
+            for stage, recorded in snapshot["histograms"].items():
+                if stage not in self.histograms:
+                    self.histograms[stage] = Histogram(recorded["buckets"])
+                histogram = self.histograms[stage]
+                histogram.counts = [a + b for a, b in zip(histogram.counts, recorded["counts"])]
+                histogram.sum += recorded["sum"]
+                histogram.count += recorded["count"]
+
+    def to_dict(self):
+        """
+        Returns:
+            dict: "counters" by name and "stages" with count, sum, mean and bucket counts
+                of each stage's latency in seconds
+        """
+        with self._lock:
+            return {
+                "counters": dict(self.counters),
+                "stages": {stage: {"count": histogram.count, "sum": histogram.sum,
+                                   "mean": histogram.sum / histogram.count if histogram.count else 0.0,
+                                   "buckets": {("+Inf" if bound == float('inf') else str(bound)): count
+                                               for bound, count in histogram.cumulative()}}
+                           for stage, histogram in self.histograms.items()},
+            }
+
+    def to_json(self, indent=2):
+        return json.dumps(self.to_dict(), indent=indent)
+
+    def to_prometheus(self):
+        """Return every metric in the Prometheus text exposition format"""
+        with self._lock:
+            lines = []
+            for name, value in sorted(self.counters.items()):
+                lines.append(f"# TYPE {METRIC_PREFIX}_{name}_total counter")
+                lines.append(f"{METRIC_PREFIX}_{name}_total {value}")
+
+            if self.histograms:
+                metric = f"{METRIC_PREFIX}_stage_seconds"
+                lines.append(f"# TYPE {metric} histogram")
+                for stage, histogram in sorted(self.histograms.items()):
+                    for bound, count in histogram.cumulative():
+                        le = "+Inf" if bound == float('inf') else repr(bound)
+                        lines.append(f'{metric}_bucket{{stage="{stage}",le="{le}"}} {count}')
+                    lines.append(f'{metric}_sum{{stage="{stage}"}} {histogram.sum}')
+                    lines.append(f'{metric}_count{{stage="{stage}"}} {histogram.count}')
+
+        return "\n".join(lines) + "\n"
+
+    def write(self, path):
+        """Write the metrics to path, as Prometheus text if it ends in .prom and JSON otherwise"""
+        with open(path, 'w', encoding='utf-8') as file:
+            file.write(self.to_prometheus() if path.endswith(".prom") else self.to_json())
+
+class _NoopTimer:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+_NOOP_TIMER = _NoopTimer()
+
+# Shared registry, enabled by setting ANALYST_COPILOT_METRICS=1 or calling METRICS.enable()
+METRICS = Metrics(enabled=os.environ.get("ANALYST_COPILOT_METRICS") == "1")
+
+def collect(func, *args, **kwargs):
+    """
+    Run func in a worker process and return its result with the metrics it recorded, for
+    the parent to pass to METRICS.merge; each process has its own registry, so metrics
+    recorded in pool workers are otherwise lost. Submit it to the pool in place of func,
+    e.g. pool.submit(collect, process_filing, filing).
+
+    Returns:
+        tuple: (result, snapshot), the snapshot being None while metrics are disabled
+    """
+    if not METRICS.enabled:
+        return func(*args, **kwargs), None
+    # A forked worker starts with a copy of the parent's metrics
+    METRICS.reset()
+    result = func(*args, **kwargs)
+    return result, METRICS.snapshot()
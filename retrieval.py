@@ -0,0 +1,429 @@
+import argparse
+import json
+import math
+import os
+import re
+import shutil
+import time
+
+import numpy as np
+
+from copilot.cli import add_source_paths
+
+# BM25 term frequency saturation and document length normalization
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Target chunk size in words, and words repeated between windows of an over-long paragraph
+CHUNK_WORDS = 150
+CHUNK_OVERLAP = 30
+
+# Segments kept before they are merged into one
+MAX_SEGMENTS = 8
+
+# 10-K items indexed by default: business, risk factors and MD&A
+FILING_ITEMS = ("1", "1A", "7")
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:[.'][a-z0-9]+)*")
+
+STOPWORDS = frozenset("""
+a an and are as at be been but by can could did do does for from had has have if in into is it its
+may might more most no not of on or our such than that the their them then there these they this
+those to under was we were which while who will with would you your
+""".split())
+
+def tokenize(text):
+    """Lowercase word tokens of a text, without stopwords"""
+    return [token for token in TOKEN_PATTERN.findall(text.lower()) if token not in STOPWORDS]
+
+def chunk_text(text, max_words=CHUNK_WORDS, overlap=CHUNK_OVERLAP):
+    """
+    Split text (one paragraph per line) into passages of about max_words words. Paragraphs
+    are packed together whole; a paragraph longer than max_words is cut into overlapping windows.
+
+    Args:
+        text (str): Text to split
+        max_words (int): Target number of words per chunk
+        overlap (int): Words shared between consecutive windows of a long paragraph
+
+    Returns:
+        list: Chunk texts in order
+    """
+    chunks, current, current_words = [], [], 0
+    for paragraph in text.split('\n'):
+        words = paragraph.split()
+        if not words:
+            continue
+
+        if current and current_words + len(words) > max_words:
+            chunks.append('\n'.join(current))
+            current, current_words = [], 0
+
+        if len(words) <= max_words:
+            current.append(' '.join(words))
+            current_words += len(words)
+            continue
+
+        step = max_words - overlap
+        for start in range(0, len(words) - overlap, step):
+            chunks.append(' '.join(words[start:start + max_words]))
+
+    if current:
+        chunks.append('\n'.join(current))
+    return chunks
+
+def build_postings(token_lists):
+    """
+    Build compressed sparse postings for a set of documents.
+
+    Args:
+        token_lists (list): Tokens of each document
+
+    Returns:
+        tuple: (terms sorted, indptr, doc_ids, tfs) where the postings of terms[i] are
+            doc_ids[indptr[i]:indptr[i + 1]] with term frequencies tfs[indptr[i]:indptr[i + 1]]
+    """
+    vocab, term_ids, doc_ids = {}, [], []
+    for doc, tokens in enumerate(token_lists):
+        term_ids.extend(vocab.setdefault(token, len(vocab)) for token in tokens)
+        doc_ids.extend([doc] * len(tokens))
+
+    terms = sorted(vocab)
+    if not terms:
+        return terms, np.zeros(1, np.int64), np.empty(0, np.int32), np.empty(0, np.float32)
+
+    # Renumber terms alphabetically, then count each (term, doc) pair
+    rank = np.empty(len(terms), np.int64)
+    rank[[vocab[term] for term in terms]] = np.arange(len(terms))
+    pairs = rank[np.asarray(term_ids)] * len(token_lists) + np.asarray(doc_ids)
+    pairs, counts = np.unique(pairs, return_counts=True)
+
+    indptr = np.zeros(len(terms) + 1, np.int64)
+    np.cumsum(np.bincount(pairs // len(token_lists), minlength=len(terms)), out=indptr[1:])
+    return terms, indptr, (pairs % len(token_lists)).astype(np.int32), counts.astype(np.float32)
+
+class Segment:
+    """
+    One immutable slice of the index: postings, document lengths and chunk records written
+    together by one add. Arrays are memory-mapped from .npy files.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, "terms.json"), 'r', encoding='utf-8') as file:
+            self.rows = {term: row for row, term in enumerate(json.load(file))}
+        self.indptr = np.load(os.path.join(path, "indptr.npy"), mmap_mode='r')
+        self.doc_ids = np.load(os.path.join(path, "doc_ids.npy"), mmap_mode='r')
+        self.tfs = np.load(os.path.join(path, "tfs.npy"), mmap_mode='r')
+        self.lengths = np.load(os.path.join(path, "lengths.npy"))
+        with open(os.path.join(path, "chunks.jsonl"), 'r', encoding='utf-8') as file:
+            self.chunks = [json.loads(line) for line in file]
+        self.sources = np.array([chunk.get("source") for chunk in self.chunks], dtype=object)
+
+    @staticmethod
+    def write(path, chunks, token_lists):
+        """Index chunk records by their tokens and write them as a segment"""
+        terms, indptr, doc_ids, tfs = build_postings(token_lists)
+        lengths = np.array([len(tokens) for tokens in token_lists], np.int32)
+        Segment.save(path, terms, indptr, doc_ids, tfs, lengths, chunks)
+
+    @staticmethod
+    def save(path, terms, indptr, doc_ids, tfs, lengths, chunks):
+        """Write segment files to a temporary directory, then move it into place"""
+        tmp_path = f"{path}.tmp"
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        os.makedirs(tmp_path)
+
+        with open(os.path.join(tmp_path, "terms.json"), 'w', encoding='utf-8') as file:
+            json.dump(terms, file)
+        np.save(os.path.join(tmp_path, "indptr.npy"), indptr)
+        np.save(os.path.join(tmp_path, "doc_ids.npy"), doc_ids)
+        np.save(os.path.join(tmp_path, "tfs.npy"), tfs)
+        np.save(os.path.join(tmp_path, "lengths.npy"), lengths)
+        with open(os.path.join(tmp_path, "chunks.jsonl"), 'w', encoding='utf-8') as file:
+            for chunk in chunks:
+                file.write(json.dumps(chunk) + '\n')
+        os.replace(tmp_path, path)
+
+    def postings(self, term):
+        """Return (doc_ids, tfs) of a term, empty arrays if the segment lacks it"""
+        row = self.rows.get(term)
+        if row is None:
+            return self.doc_ids[:0], self.tfs[:0]
+        start, end = self.indptr[row], self.indptr[row + 1]
+        return self.doc_ids[start:end], self.tfs[start:end]
+
+class RetrievalIndex:
+    """
+    On-disk BM25 index over chunks of filing sections and press releases.
+
+    Each add writes one new segment, so new filings and feed entries are searchable without
+    rebuilding. Corpus statistics are combined across segments at query time, and segments
+    are merged once there are more than MAX_SEGMENTS. Documents are identified by key and a
+    key already indexed is skipped.
+    """
+
+    def __init__(self, index_dir="retrieval_index"):
+        """
+        Args:
+            index_dir (str): Directory holding the catalog and the segments
+        """
+        self.index_dir = index_dir
+        self._segments = None
+
+    def _catalog_path(self):
+        return os.path.join(self.index_dir, "catalog.json")
+
+    def catalog(self):
+        """
+        Returns:
+            dict: {"segments": [names], "keys": [document keys], "next": next segment number}
+        """
+        try:
+            with open(self._catalog_path(), 'r', encoding='utf-8') as file:
+                return json.load(file)
+        except FileNotFoundError:
+            return {"segments": [], "keys": [], "next": 0}
+
+    def _write_catalog(self, catalog):
+        os.makedirs(self.index_dir, exist_ok=True)
+        with open(f"{self._catalog_path()}.tmp", 'w', encoding='utf-8') as file:
+            json.dump(catalog, file)
+        os.replace(f"{self._catalog_path()}.tmp", self._catalog_path())
+
+    def segments(self):
+        if self._segments is None:
+            self._segments = [Segment(os.path.join(self.index_dir, name)) for name in self.catalog()["segments"]]
+        return self._segments
+
+    def add_documents(self, documents):
+        """
+        Chunk and index documents not already in the index.
+
+        Args:
+            documents (iterable): Dicts with key and text, plus any of source, title and other
+                JSON-serializable metadata, which is returned with each matching chunk
+
+        Returns:
+            int: Number of chunks added
+        """
+        catalog = self.catalog()
+        known = set(catalog["keys"])
+
+        chunks, token_lists = [], []
+        for document in documents:
+            if document["key"] in known:
+                continue
+            known.add(document["key"])
+            catalog["keys"].append(document["key"])
+
+            metadata = {name: value for name, value in document.items() if name != "text"}
+            title = document.get("title", "")
+            for number, text in enumerate(chunk_text(document["text"])):
+                chunks.append(dict(metadata, chunk=number, text=text))
+                # The title is indexed with every chunk so each passage is found by its subject
+                token_lists.append(tokenize(f"{title}\n{text}"))
+
+        if not chunks:
+            return 0
+
+        name = f"segment_{catalog['next']:06d}"
+        Segment.write(os.path.join(self.index_dir, name), chunks, token_lists)
+        catalog["segments"].append(name)
+        catalog["next"] += 1
+        self._write_catalog(catalog)
+        self._segments = None
+
+        if len(catalog["segments"]) > MAX_SEGMENTS:
+            self.merge()
+        return len(chunks)
+
+    def merge(self):
+        """Rewrite every segment as one, so queries touch a single set of postings"""
+        catalog = self.catalog()
+        segments = self.segments()
+        if len(segments) < 2:
+            return
+
+        terms = sorted(set().union(*(segment.rows for segment in segments)))
+        bases = np.cumsum([0] + [len(segment.lengths) for segment in segments])
+        indptr = np.zeros(len(terms) + 1, np.int64)
+        doc_parts, tf_parts = [], []
+        for row, term in enumerate(terms):
+            count = 0
+            for base, segment in zip(bases, segments):
+                ids, tfs = segment.postings(term)
+                if len(ids):
+                    doc_parts.append(ids + base)
+                    tf_parts.append(tfs)
+                    count += len(ids)
+            indptr[row + 1] = indptr[row] + count
+
+        name = f"segment_{catalog['next']:06d}"
+        Segment.save(os.path.join(self.index_dir, name), terms, indptr,
+                     np.concatenate(doc_parts).astype(np.int32), np.concatenate(tf_parts).astype(np.float32),
+                     np.concatenate([segment.lengths for segment in segments]),
+                     [chunk for segment in segments for chunk in segment.chunks])
+
+        old = catalog["segments"]
+        catalog["segments"] = [name]
+        catalog["next"] += 1
+        self._write_catalog(catalog)
+        self._segments = None
+        for old_name in old:
+            shutil.rmtree(os.path.join(self.index_dir, old_name), ignore_errors=True)
+
+    def search(self, query, k=10, sources=None):
+        """
+        Rank chunks against a query with BM25.
+
+        Args:
+            query (str): Free-text query
+            k (int): Number of results
+            sources (list, optional): Only return chunks whose source is in this list,
+                e.g. ["10-K"] or ["press_release"]
+
+        Returns:
+            list: Chunk records, best first, each with its score
+        """
+        segments = self.segments()
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not segments or not terms:
+            return []
+
+        bases = np.cumsum([0] + [len(segment.lengths) for segment in segments])
+        lengths = np.concatenate([segment.lengths for segment in segments]).astype(np.float32)
+        total = len(lengths)
+        norm = BM25_K1 * (1 - BM25_B + BM25_B * lengths / max(lengths.mean(), 1.0))
+
+        scores = np.zeros(total, np.float32)
+        for term in terms:
+            postings = [(base, *segment.postings(term)) for base, segment in zip(bases, segments)]
+            df = sum(len(ids) for _, ids, _ in postings)
+            if not df:
+                continue
+            idf = math.log(1 + (total - df + 0.5) / (df + 0.5))
+            for base, ids, tfs in postings:
+                docs = ids + base
+                # A term's postings hold each document once, so fancy-index addition is exact
+                scores[docs] += idf * tfs * (BM25_K1 + 1) / (tfs + norm[docs])
+
+        if sources:
+            mask = np.isin(np.concatenate([segment.sources for segment in segments]), list(sources))
+            scores[~mask] = 0
+
+        candidates = np.flatnonzero(scores)
+        if len(candidates) > k:
+            candidates = candidates[np.argpartition(-scores[candidates], k)[:k]]
+        candidates = candidates[np.argsort(-scores[candidates], kind="stable")]
+
+        results = []
+        for doc in candidates:
+            position = np.searchsorted(bases, doc, side='right') - 1
+            chunk = dict(segments[position].chunks[doc - bases[position]])
+            chunk["score"] = float(scores[doc])
+            results.append(chunk)
+        return results
+
+def filing_documents(file_path, ticker, accession, items=FILING_ITEMS, form="10-K"):
+    """
+    Documents for the given 10-K items of a filing, one per item found.
+
+    Args:
+        file_path (str): Path to the XBRL/HTML filing
+        ticker (str): Company ticker
+        accession (str): Accession number of the filing
+        items (tuple): Item numbers to index, e.g. ("1A",)
+        form (str): Form type, stored as the source of each chunk
+
+    Returns:
+        list: Documents for RetrievalIndex.add_documents
+    """
+    from sections import STANDARD_ITEMS, SectionIndex, clean_section_text
+
+    index = SectionIndex.from_file(file_path)
+    documents = []
+    for item in items:
+        text = clean_section_text(index.section(item))
+        if text:
+            documents.append({"key": f"{ticker.upper()}/{accession}/{item}", "source": form,
+                              "ticker": ticker.upper(), "accession": accession, "item": item,
+                              "title": f"{ticker.upper()} {form} Item {item}. {STANDARD_ITEMS[item]}",
+                              "text": text})
+    return documents
+
+def article_documents(entries):
+    """
+    Documents for press releases from PRWireParser.iter_entries, using the full content
+    when the feed carries it and the summary otherwise.
+
+    Args:
+        entries (iterable): Entry dicts with title, link and content or summary
+
+    Returns:
+        list: Documents for RetrievalIndex.add_documents
+    """
+    from article_cleaner import clean_article_text
+
+    documents = []
+    for entry in entries:
+        text = clean_article_text(entry.get("content") or entry.get("summary") or "")
+        if text and entry.get("link"):
+            documents.append({"key": entry["link"], "source": "press_release", "title": entry.get("title", ""),
+                              "link": entry["link"], "published": entry.get("published", ""), "text": text})
+    return documents
+
+def main(argv=None):
+    # sections.py and the RSS parsers, imported by the document sources, live in directories
+    # that are not packages; importing this module leaves the path to its caller
+    add_source_paths()
+
+    parser = argparse.ArgumentParser(description="Build and search the local retrieval index")
+    parser.add_argument("--index-dir", default="retrieval_index", help="Directory of the index")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    filings_parser = subparsers.add_parser("add-filings", help="Index the 10-K sections under a sec-edgar-filings tree")
+    filings_parser.add_argument("root", help="sec-edgar-filings directory, or a directory containing it")
+    filings_parser.add_argument("--item", action="append", dest="items", help="Item to index, may be repeated (default: 1, 1A, 7)")
+
+    feed_parser = subparsers.add_parser("add-feed", help="Index the press releases of an RSS/Atom feed")
+    feed_parser.add_argument("feed_url", help="Feed URL")
+
+    search_parser = subparsers.add_parser("search", help="Print the best matching chunks")
+    search_parser.add_argument("query", help="Free-text query")
+    search_parser.add_argument("-k", type=int, default=5, help="Number of results")
+    search_parser.add_argument("--source", action="append", dest="sources", help="Restrict to a source, e.g. 10-K")
+    args = parser.parse_args(argv)
+
+    index = RetrievalIndex(args.index_dir)
+    if args.command == "add-filings":
+        from batch import discover_filings
+
+        added = 0
+        for filing in discover_filings(args.root, ["10-K"]):
+            added += index.add_documents(filing_documents(filing["path"], filing["ticker"], filing["accession"],
+                                                          tuple(args.items or FILING_ITEMS)))
+        print(f"Indexed {added} new chunks")
+        return added
+
+    if args.command == "add-feed":
+        from full_rss_article import PRWireParser
+
+        feed = PRWireParser(args.feed_url)
+        if not feed.fetch_feed():
+            return 0
+        added = index.add_documents(article_documents(feed.iter_entries(fields=("title", "link", "published", "summary", "content"))))
+        print(f"Indexed {added} new chunks")
+        return added
+
+    start_time = time.perf_counter()
+    results = index.search(args.query, k=args.k, sources=args.sources)
+    elapsed = (time.perf_counter() - start_time) * 1000
+    for result in results:
+        print(f"{result['score']:7.2f}  {result.get('title', result['key'])} [chunk {result['chunk']}]")
+        print(f"         {result['text'][:200]}\n")
+    print(f"{len(results)} results in {elapsed:.1f} ms")
+    return results
+
+if __name__ == "__main__":
+    main()